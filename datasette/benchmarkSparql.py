@@ -0,0 +1,99 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+benchmarkSparql.py --rdffile <pathToRdfFile> ... [--repeat <n>]
+
+Compare the time taken to extract the learning area hierarchy from the RDFLib graph using
+- the Python traversal in australianCurriculum (parseLearningAreas)
+- the prepared SPARQL queries in src/acSparql.py (first run and memoised run)
+and check both produce the same content descriptions
+"""
+
+import os
+import time
+import argparse
+
+##-- add the ../src folder into include path
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from australianCurriculum import australianCurriculum
+import acSparql
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description="Benchmark SPARQL vs Python extraction of the hierarchy")
+    parser.add_argument(
+        "--rdffile", action="store", type=str, nargs="+", help="Path to the RDF file(s)", required=True)
+    parser.add_argument(
+        "--repeat", action="store", type=int, default=3, help="Number of times to repeat each timing")
+
+    return parser.parse_args()
+
+def best(function, repeat : int) -> float:
+    """
+    Return the best time (seconds) from repeat calls of function
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def contentDescriptions(learningAreas : dict) -> set:
+    """
+    Return a set of (notation, title, elaborations, components) for all content descriptions
+    """
+    cds = set()
+    for learningArea in learningAreas.values():
+        for subject in learningArea.subjects.values():
+            for yearLevel in subject.yearLevels.values():
+                for strand in yearLevel.strands.values():
+                    for parent in [strand] + list(strand.subStrands.values()):
+                        for cd in parent.contentDescriptions.values():
+                            cds.add((str(cd.abbreviation), str(cd.title),
+                                     tuple(sorted(cd.elaborations.keys())),
+                                     tuple(sorted(cd.achievementStandardComponents.keys()))))
+    return cds
+
+if __name__ == "__main__":
+
+    args = parseArgs()
+
+    ac = australianCurriculum()
+    for file in args.rdffile:
+        ac.addRdfFile(file)
+    print(f"Graph with {len(ac.graph)} triples")
+
+    def python():
+        ac.learningAreas = {}
+        ac.parseLearningAreas()
+
+    def sparqlCold():
+        acSparql.memo.clear()
+        acSparql.sparqlLearningAreas(ac)
+
+    def sparqlMemoised():
+        acSparql.sparqlLearningAreas(ac)
+
+    print(f"Python traversal      {best(python, args.repeat):.3f}s")
+    print(f"SPARQL (not memoised) {best(sparqlCold, args.repeat):.3f}s")
+    sparqlMemoised()
+    print(f"SPARQL (memoised)     {best(sparqlMemoised, args.repeat):.3f}s")
+
+    python()
+    same = contentDescriptions(ac.learningAreas) == contentDescriptions(acSparql.sparqlLearningAreas(ac))
+    print(f"Same content descriptions: {same}")
@@ -0,0 +1,57 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+diffReleases.py --old <pathToRdfFile> ... --new <pathToRdfFile> ... [--ignoreDates]
+
+Display the nodes added, removed and modified between two releases of the v9
+Australian Curriculum RDF files. See src/acDiff.py
+"""
+
+import os
+import argparse
+
+##-- add the ../src folder into include path
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from australianCurriculum import australianCurriculum
+from acDiff import diffCurricula, changesSummary
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description="Compare two releases of the Oz Curriculum RDF files")
+    parser.add_argument(
+        "--old", action="store", type=str, nargs="+", help="Path to the old release RDF file(s)", required=True)
+    parser.add_argument(
+        "--new", action="store", type=str, nargs="+", help="Path to the new release RDF file(s)", required=True)
+    parser.add_argument(
+        "--ignoreDates", action="store_true", help="Don't report changes to dateModified")
+
+    return parser.parse_args()
+
+def loadRelease(files) -> australianCurriculum:
+    ac = australianCurriculum()
+    for file in files:
+        ac.addRdfFile(file)
+    return ac
+
+if __name__ == "__main__":
+
+    args = parseArgs()
+
+    ignore = ["dateModified"] if args.ignoreDates else []
+    changes = diffCurricula(loadRelease(args.old), loadRelease(args.new), ignore)
+
+    print(changesSummary(changes))
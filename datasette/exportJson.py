@@ -0,0 +1,60 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+exportJson.py --rdffile <pathToRdfFile> ... [--output <pathToFile>] [--format ndjson|json]
+
+Export the Australian Curriculum objects as NDJSON (one record per node, default) or a
+single nested JSON document. Writes to stdout if --output isn't given. See src/acExport.py
+"""
+
+import os
+import argparse
+
+##-- add the ../src folder into include path
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from australianCurriculum import australianCurriculum
+from acExport import writeNdjson, writeJson
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description="Export Oz Curriculum RDF files as (ND)JSON")
+    parser.add_argument(
+        "--rdffile", action="store", type=str, nargs="+", help="Path to the RDF file(s)", required=True)
+    parser.add_argument(
+        "--output", action="store", default=None, help="Path to the output file (default stdout)")
+    parser.add_argument(
+        "--format", action="store", choices=["ndjson", "json"], default="ndjson", help="Output format")
+
+    return parser.parse_args()
+
+if __name__ == "__main__":
+
+    args = parseArgs()
+
+    ac = australianCurriculum()
+    for file in args.rdffile:
+        ac.addRdfFile(file)
+
+    stream = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8")
+
+    if args.format == "ndjson":
+        writeNdjson(ac, stream)
+    else:
+        writeJson(ac, stream)
+
+    if stream is not sys.stdout:
+        stream.close()
@@ -65,3 +65,44 @@ echo "\nImporting cross_curriculum_priorities CSV"
 sqlite-utils insert oz_curriculum.db cross_curriculum_priorities "../data/v8.4/F-10 CD CCP tagging-Table 1.csv" --csv -d
 sqlite-utils add-foreign-key oz_curriculum.db cross_curriculum_priorities CdCode content_descriptors CdCode
 
+
+#-- SUMMARY tables
+# - datasette facets over the tables above are GROUP BY queries over text columns,
+#   run every time a page is loaded. Pre-materialise the common counts into small
+#   summary tables (with indexes) and point datasette at them via metadata.json
+#   i.e. datasette oz_curriculum.db -m metadata.json --setting suggest_facets off
+echo "\nCreate the summary tables\n"
+sqlite-utils oz_curriculum.db "DROP TABLE IF EXISTS summary_learning_areas"
+sqlite-utils oz_curriculum.db "CREATE TABLE summary_learning_areas AS
+    SELECT LearningArea, Subject, Level, Strand, Substrand,
+        COUNT(DISTINCT CdCode) AS content_descriptors, COUNT(*) AS elaborations
+    FROM learning_areas
+    GROUP BY LearningArea, Subject, Level, Strand, Substrand"
+sqlite-utils oz_curriculum.db "DROP TABLE IF EXISTS summary_general_capabilities"
+sqlite-utils oz_curriculum.db "CREATE TABLE summary_general_capabilities AS
+    SELECT LearningArea, Subject, Level, GC, COUNT(DISTINCT CdCode) AS content_descriptors
+    FROM general_capabilities
+    WHERE GC != ''
+    GROUP BY LearningArea, Subject, Level, GC"
+sqlite-utils oz_curriculum.db "DROP TABLE IF EXISTS summary_cross_curriculum_priorities"
+sqlite-utils oz_curriculum.db "CREATE TABLE summary_cross_curriculum_priorities AS
+    SELECT LearningArea, Subject, Level, CCP, COUNT(DISTINCT CdCode) AS content_descriptors
+    FROM cross_curriculum_priorities
+    WHERE CCP != ''
+    GROUP BY LearningArea, Subject, Level, CCP"
+
+#-- indexes for the summary tables (facets/canned queries) and the columns
+#   used to link back from a summary row to the detail rows
+echo "\nCreate the indexes\n"
+sqlite-utils create-index oz_curriculum.db summary_learning_areas LearningArea Subject Level --if-not-exists
+sqlite-utils create-index oz_curriculum.db summary_general_capabilities GC LearningArea Subject Level --if-not-exists
+sqlite-utils create-index oz_curriculum.db summary_general_capabilities LearningArea Subject Level --if-not-exists
+sqlite-utils create-index oz_curriculum.db summary_cross_curriculum_priorities CCP LearningArea Subject Level --if-not-exists
+sqlite-utils create-index oz_curriculum.db summary_cross_curriculum_priorities LearningArea Subject Level --if-not-exists
+sqlite-utils create-index oz_curriculum.db learning_areas LearningArea Subject Level --if-not-exists
+sqlite-utils create-index oz_curriculum.db elaborations CdCode --if-not-exists
+sqlite-utils create-index oz_curriculum.db general_capabilities GC LearningArea Subject Level --if-not-exists
+sqlite-utils create-index oz_curriculum.db general_capabilities CdCode --if-not-exists
+sqlite-utils create-index oz_curriculum.db cross_curriculum_priorities CCP LearningArea Subject Level --if-not-exists
+sqlite-utils create-index oz_curriculum.db cross_curriculum_priorities CdCode --if-not-exists
+sqlite-utils oz_curriculum.db "ANALYZE"
@@ -0,0 +1,72 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+mapV84toV9.py --v84csv <pathToCsvFile> --rdffile <pathToRdfFile> ... --output <pathToCsvFile> [--k 3]
+
+Generate a scored mapping table (CSV) from v8.4 content description codes (e.g. ACMNA190)
+to v9 content description codes (e.g. AC9M8A01). See src/acMapping.py
+
+The CSV can be added to the datasette database e.g.
+
+    sqlite-utils insert oz_curriculum.db v84_v9_mapping mapping.csv --csv -d
+"""
+
+import os
+import csv
+import time
+import argparse
+
+##-- add the ../src folder into include path
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from australianCurriculum import australianCurriculum
+from acMapping import readV84ContentDescriptions, mapV84ToV9
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description="Map v8.4 content descriptions to v9 content descriptions")
+    parser.add_argument(
+        "--v84csv", action="store", help="Path to a v8.4 CSV file with CdCode and ContentDesc columns",
+        default=os.path.join(os.path.dirname(__file__), '..', 'data', 'v8.4', 'F-10 CD CCP tagging-Table 1.csv'))
+    parser.add_argument(
+        "--rdffile", action="store", type=str, nargs="+", help="Path to the v9 RDF file(s)", required=True)
+    parser.add_argument(
+        "--output", action="store", help="Path to the output CSV file", required=True)
+    parser.add_argument(
+        "--k", action="store", type=int, default=3, help="Number of v9 matches per v8.4 content description")
+
+    return parser.parse_args()
+
+if __name__ == "__main__":
+
+    args = parseArgs()
+
+    ac = australianCurriculum()
+    for file in args.rdffile:
+        ac.addRdfFile(file)
+
+    v84 = readV84ContentDescriptions(args.v84csv)
+
+    start = time.perf_counter()
+    mapping = mapV84ToV9(v84, ac, args.k)
+    print(f"Mapped {len(set(row['v84Code'] for row in mapping))} v8.4 content descriptions "
+          f"({len(mapping)} rows) in {time.perf_counter() - start:.2f} seconds")
+
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        if len(mapping) > 0:
+            writer = csv.DictWriter(f, fieldnames=list(mapping[0].keys()))
+            writer.writeheader()
+            writer.writerows(mapping)
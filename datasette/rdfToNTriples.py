@@ -0,0 +1,56 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+rdfToNTriples.py --rdffile <pathToRdfFile> ... [--outputFolder <pathToFolder>] [--force]
+
+Convert AC RDF/XML files into N-Triples cache files (e.g. MAT.rdf -> MAT.nt), which
+australianCurriculum.addRdfFile loads in parallel. Files are only converted if the cache
+is missing or older than the RDF file, unless --force. See src/acNTriples.py
+"""
+
+import os
+import argparse
+
+##-- add the ../src folder into include path
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from acNTriples import convertRdfFile, cachedNTriples
+
+def parseArgs():
+    parser = argparse.ArgumentParser(description="Convert Oz Curriculum RDF files to N-Triples")
+    parser.add_argument(
+        "--rdffile", action="store", type=str, nargs="+", help="Path to the RDF file(s)", required=True)
+    parser.add_argument(
+        "--outputFolder", action="store", default=None, help="Folder for the N-Triples files (default same as the RDF file)")
+    parser.add_argument(
+        "--force", action="store_true", help="Convert even if the N-Triples file is up to date")
+
+    return parser.parse_args()
+
+if __name__ == "__main__":
+
+    args = parseArgs()
+
+    if args.outputFolder is not None:
+        os.makedirs(args.outputFolder, exist_ok=True)
+
+    for file in args.rdffile:
+        if args.force:
+            ntFile = convertRdfFile(file, args.outputFolder)
+        else:
+            ntFile = cachedNTriples(file, args.outputFolder)
+        print(ntFile)
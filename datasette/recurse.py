@@ -17,16 +17,24 @@
 recurse.py --rdffile <pathToRdfFile>
 
 - Simple test to recurse through the tree structure of an RDF file provided by the Australian Curriuclum v9
+- the walking and display is done by src/acGraphWalker.py (without recursion)
 """
 
 from pprint import pprint 
 
+import os
+import sys
 import argparse
 
 from rdflib import Graph, URIRef, Literal, Namespace
 from rdflib.namespace import RDF
 from rdflib.plugin import register, Serializer, Parser
 
+##-- add the ../src folder into include path 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from acGraphWalker import walkGraph, writeWalk
+
 
 def generateGraphObject(filename):
     """
@@ -51,6 +59,7 @@ def parseArgs():
 
     parser = argparse.ArgumentParser(description="Recurse through an Oz Curriculum RDF file")
     parser.add_argument("--rdffile", action="store", help="Path to the RDF file", required=True)
+    parser.add_argument("--maxDepth", action="store", type=int, default=None, help="Maximum depth to walk")
 
     return parser.parse_args()
 
@@ -81,62 +90,6 @@ def getRootId(g):
 
     return subject
 
-def splitPos(pos):
-    """
-    Given a generator of all predicate_objects split them into info to display and children
-
-    Some of the predicates/objects for the current node are information and some are children of the subject. Split them into two separate arrays returned as a tuple
-
-    (nodeInfo, nodeChilder)
-    """
-
-    nodeInfo = []
-    nodeChildren = []
-    nodeLevels = []
-
-    for p, o in pos:
-        """
-        An object is a child if 
-        - it's predicate is hasChild, or
-        - it's predicate is `hasLevel`
-        """
-#        print(f"predicate {p} object {o}")
-        if p == URIRef("http://purl.org/gem/qualifiers/hasChild"):
-            nodeChildren.append(o)
-        elif p == URIRef("http://purl.org/ASN/schema/core/hasLevel"):
-            nodeLevels.append(o)
-        else:
-            nodeInfo.append((p, o))
-
-    return ( nodeInfo, nodeChildren, nodeLevels)
-
-def displayNode(subjectId, nodeInfo, depth=0):
-    """
-    Display information for the node with subjectId
-    """
-
-    ## remove http://vocabulary.curriculum.edu.au/MRAC/2023/07/ from subjectId
-    id = subjectId.replace("http://vocabulary.curriculum.edu.au/MRAC/2023/07/", "")
-
-    print(f"{'  ' * depth}Node {id}")
-    for (p, o) in nodeInfo:
-#        pprint(entry)
-#        print(f"{' ' * depth} - {p} >>> {o}")
-        if p == URIRef("http://purl.org/ASN/schema/core/statementNotation"):
-            print(f"{'   ' * depth}- statementNotation {o}")
-        elif p == URIRef("http://purl.org/ASN/schema/core/statementLabel"):
-            print(f"{'   ' * depth}- statementLabel {o}")
-        elif p == URIRef("http://purl.org/dc/terms/title"):
-            print(f"{'   ' * depth}- title {o}")
-
-    exclude = [URIRef("http://purl.org/ASN/schema/core/statementNotation"), 
-               URIRef("http://purl.org/ASN/schema/core/statementLabel"),
-               URIRef("http://purl.org/dc/terms/title") ]
-    #-- show the other info nodes
-    for (p, o) in nodeInfo:
-        if p not in exclude:
-            print(f"{'   ' * depth} - other predicate {p} >>> {o}")
-
 def getChildren(pos):
     """
     Given a generator of predicate/objects for a node, return a list with the predicate hasChild
@@ -151,39 +104,21 @@ def getChildren(pos):
 
     return children
 
-def recurseOzCurriculum(g, subjectId, depth=0):
+def recurseOzCurriculum(g, subjectId, maxDepth=None):
     """
     Oz Curriuclum RDF files have a parent/child structure using <hasChild> and <isChildOf> predicates
-    Recurse through the graph from the given subjectId, display some information about each node
+    Walk the graph from the given subjectId, display some information about each node
 
     - g is the graph object
-    - subjectId is the @id of the current node to display and recurse down
-    - depth is the current depth of recursion/descent down the tree
+    - subjectId is the @id of the node to start from
+    - maxDepth optionally limits how far down the tree to go
     """
 
-    #-- get the predicates/objects for this subjectId
-    pos = g.predicate_objects(subject=URIRef(subjectId))
-
-    #-- split them out into information and children
-    ( nodeInfo, nodeChildren, nodeLevels) = splitPos(pos)
-    #-- display the information
-    displayNode(subjectId, nodeInfo, depth)
-
-    #-- recurse down
-    # - first the levels and then the children
-
-    for level in nodeLevels:
-        levelId = str(level)
-        recurseOzCurriculum(g, levelId, depth+1)
-    for child in nodeChildren:
-        childId = str(child)
-        recurseOzCurriculum(g, childId, depth+1)
-
-
+    writeWalk(walkGraph(g, subjectId, maxDepth), sys.stdout)
 
     
 
-def startRecursion(g):
+def startRecursion(g, maxDepth=None):
     """
     Main harness for recursing and display info about an Oz Curriculum RDF file
     """
@@ -191,7 +126,7 @@ def startRecursion(g):
     rootId = getRootId(g)
 #    print(f"Root id {rootId}")
 
-    recurseOzCurriculum(g, rootId)
+    recurseOzCurriculum(g, rootId, maxDepth)
 
 if __name__ == "__main__":
 
@@ -200,5 +135,5 @@ if __name__ == "__main__":
     print(f"---------------------- {args.rdffile} ----------------------")
     g = generateGraphObject(args.rdffile)
 
-    startRecursion( g)
+    startRecursion( g, args.maxDepth)
    
\ No newline at end of file
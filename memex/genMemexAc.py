@@ -14,27 +14,47 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 """
-genMemexAc.py --rdffile <pathToRdfFile>,<pathToRDFFile> --outputFolder <pathToOutputFolder>
+genMemexAc.py --rdffile <pathToRdfFile>,<pathToRDFFile> --outputFolder <pathToOutputFolder> [--related <k>] [--cacheFolder <pathToCacheFolder>] [--memoryReport]
+    [--pipeline] [--ndjson <pathToFile>] [--sqlite <pathToFile>] [--force] [--verbose]
 
 Generate a collection markdown files containing information from one or more Australian Curriculum v9 learning area RDF files 
 
 Format in --outputFolder
 
+--related adds links to the k most related content descriptions from other subjects
+to each content description page (see src/acSimilarity.py), cached in --cacheFolder
+
+--memoryReport prints a breakdown of the memory used by the loaded curriculum (see src/acMemory.py)
+
+A search index (see src/acSearchShards.py) of the content descriptions, elaborations and
+achievement standards written, one JSON shard per learning area, is written to the
+SEARCH_FOLDER of --outputFolder
+
+--pipeline writes the markdown (and optionally --ndjson and --sqlite output) for each learning
+area while the other RDF files are still being parsed (see src/acPipeline.py). Not
+available with --related or --memoryReport, which need the whole curriculum.
+
+The output isn't regenerated if the RDF files, options and the code (this script and the
+src modules) haven't changed since the last run and none of the files it generated have
+been deleted (recorded in BUILD_STAMP in --outputFolder), unless --force. Checking that
+doesn't import rdflib or markdownify, they're only imported when needed. --verbose reports import and startup times.
 
 """
 
 import os
+import sys
+import time
 import argparse
 
-from markdownify import markdownify
+##-- the src modules, add the ../src folder into include path if they aren't installed
+try:
+    import acCli
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+    import acCli
 
-from pprint import pprint
+from acCli import deferredImport
 
-##-- add the ../src folder into include path 
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-
-from australianCurriculum import australianCurriculum 
 from acContentDescription import acContentDescription
 from acYearLevel import acYearLevel
 
@@ -44,6 +64,11 @@ SECONDARY = True
 ##-- specify names of subjects to exclude
 global EXCLUDE_SUBJECTS
 EXCLUDE_SUBJECTS = [ "Design and Technologies"]
+##-- file in the output folder recording the inputs of the last run
+BUILD_STAMP = ".genMemexAc.stamp"
+##-- the learning areas page and the folder for the search index, in the output folder
+LEARNING_AREAS_PAGE = "v9-learning-areas.md"
+SEARCH_FOLDER = "search"
 
 def parseArgs():
     """
@@ -55,15 +80,33 @@ def parseArgs():
         "--rdffile", action="store", type=str, nargs="+", help="Path to the RDF file", required=True)
     parser.add_argument(
         "--outputFolder", action="store", help="Path to the output folder", required=True)
+    parser.add_argument(
+        "--related", action="store", type=int, default=0,
+        help="Number of related content descriptions (from other subjects) to link to")
+    parser.add_argument(
+        "--cacheFolder", action="store", default=None, help="Path to a folder used to cache related content descriptions")
+    parser.add_argument(
+        "--memoryReport", action="store_true", help="Print a report of the memory used by the curriculum")
+    parser.add_argument(
+        "--pipeline", action="store_true", help="Overlap parsing the RDF files with writing the output")
+    parser.add_argument(
+        "--ndjson", action="store", default=None, help="With --pipeline, also write NDJSON to this file")
+    parser.add_argument(
+        "--sqlite", action="store", default=None, help="With --pipeline, also write a SQLite database to this file")
+    parser.add_argument(
+        "--force", action="store_true", help="Regenerate even if the RDF files haven't changed")
+    parser.add_argument(
+        "--verbose", "-v", action="store_true", help="Report import and startup times (on stderr)")
 
     return parser.parse_args()
 
 
-def generateAC(args) -> australianCurriculum:
+def generateAC(args) -> "australianCurriculum":
     """
     Return a complete australianCurriculum object based on the RDF files provided
     """
 
+    australianCurriculum = deferredImport("australianCurriculum").australianCurriculum
     ac = australianCurriculum()
 
     for file in args.rdffile:
@@ -81,23 +124,42 @@ def includeYearLevel( yearLevel: acYearLevel ) -> bool:
     if not SECONDARY:
         return True
 
-    #-- extract a list of any numbers included in yearLevel.title
-    years = [int(s) for s in yearLevel.title.split() if s.isdigit()]
-
-    #-- if no numbers, must be foundation - not secondary
-    if len(years)==0:
+    #-- year levels without any years (e.g. "Options") aren't secondary
+    if yearLevel.yearRange is None:
         return False
 
     #-- return true iff all years are equal to or greater than 7
-    return all(year >= 7 for year in years)
+    return yearLevel.yearRange[0] >= 7
 
-def writeMarkdown( ac ) -> None:
+def writeMarkdown( ac, related = None ) -> None:
     """
     Create the markdown files based on the AC object
+    - related is an optional dict of related content descriptions (see acSimilarity)
+    """
+
+    learningAreasMd = openLearningAreasMarkdown()
+    searchIndex = openSearchIndex()
+
+    for learningArea in ac.learningAreas.values():
+        writeLearningAreaMarkdown( learningArea, learningAreasMd, related, searchIndex )
+
+    closeLearningAreasMarkdown( learningAreasMd )
+    searchIndex.close()
+
+def openSearchIndex():
+    """
+    Return the acSearchIndexWriter for the search index in the output folder
     """
+    acSearchShards = deferredImport("acSearchShards")
 
+    return acSearchShards.acSearchIndexWriter(os.path.join(args.outputFolder, SEARCH_FOLDER))
+
+def openLearningAreasMarkdown():
+    """
+    Open the learning areas markdown file and write its header, return the file
+    """
 
-    learningAreasMd = open(os.path.join(args.outputFolder, "v9-learning-areas.md"), "w")
+    learningAreasMd = open(os.path.join(args.outputFolder, LEARNING_AREAS_PAGE), "w")
 
     learningAreasMd.write("""
 # Learning Areas
@@ -111,37 +173,47 @@ See also: [[australian-curriculum]], [[teaching]]
     In particular, it's an example of leveraging the reprogrammability of digital technologies to orchestrate (gather, weave and augment) a range of technologies (the Australian Curriculum, RDF, Python, Foam etc) for a very specific purpose. In this case specific to an individual teacher. Rather than make do with the generic Australian Curriculum site the same data as been woven into something more useful (for me).
 
 """)
-    
-    for learningArea in ac.learningAreas.values():
-        ## convert learning area title into a safe folder name 
-        learningAreaFolder = learningArea.title.replace(" ", "_")
-        # create the folder if it doesn't exist
-        os.makedirs(os.path.join(args.outputFolder, learningAreaFolder), exist_ok=True)
 
-        learningAreasMd.write(f"## {learningArea.title}\n\n")    
+    return learningAreasMd
 
-        #-- subjects
-        for subject in learningArea.subjects.values():
-            if str(subject.title) in EXCLUDE_SUBJECTS:
+def writeLearningAreaMarkdown( learningArea, learningAreasMd, related = None, searchIndex = None ) -> None:
+    """
+    Write a learning area's section of the learning areas markdown file and its
+    content description files, and (if searchIndex is given) its search index shard
+    """
+    ## convert learning area title into a safe folder name 
+    learningAreaFolder = learningArea.title.replace(" ", "_")
+    # create the folder if it doesn't exist
+    os.makedirs(os.path.join(args.outputFolder, learningAreaFolder), exist_ok=True)
+
+    learningAreasMd.write(f"## {learningArea.title}\n\n")    
+
+    shard = None if searchIndex is None else searchIndex.newShard(learningArea.title)
+
+    #-- subjects
+    for subject in learningArea.subjects.values():
+        if str(subject.title) in EXCLUDE_SUBJECTS:
+            continue
+        learningAreasMd.write(f"### {subject.title}\n\n")
+        if shard is not None:
+            shard.addSubject(subject.title)
+
+        #-- year levels
+        for yearLevel in subject.yearLevels.values():
+            #-- only include year levels if chosen by globals
+            if not includeYearLevel( yearLevel):
                 continue
-            learningAreasMd.write(f"### {subject.title}\n\n")
 
-            #-- year levels
-            for yearLevel in subject.yearLevels.values():
-                #-- only include year levels if chosen by globals
-                if not includeYearLevel( yearLevel):
-                    continue
+            learningAreasMd.write(f"#### {yearLevel.title}\n\n")
 
-                learningAreasMd.write(f"#### {yearLevel.title}\n\n")
-
-                #-- Achievement standard - need to do an accordion?
-                asTitle = str(yearLevel.achievementStandard.title)
-                #-- turn any \n in asTitle into double \n
-                asTitle = asTitle.replace("\n", "\n\n\t")
-                # add a \t to the beginning of each line in asTitle
-                description = markdownify(yearLevel.description).replace("\n", "\n\t")
-                
-                learningAreasMd.write(f""" 
+            #-- Achievement standard - need to do an accordion?
+            asTitle = str(yearLevel.achievementStandard.title)
+            #-- turn any \n in asTitle into double \n
+            asTitle = asTitle.replace("\n", "\n\n\t")
+            # add a \t to the beginning of each line in asTitle
+            description = deferredImport("markdownify").markdownify(yearLevel.description).replace("\n", "\n\t")
+            
+            learningAreasMd.write(f""" 
 
 ??? info "Year level description"
 
@@ -154,24 +226,35 @@ See also: [[australian-curriculum]], [[teaching]]
 
 """)
 
-                for component in yearLevel.achievementStandard.components.values():
-                    learningAreasMd.write(f"\t - _{str(component.abbreviation)}_: {str(component.title)}\n")
+            for component in yearLevel.achievementStandard.components.values():
+                learningAreasMd.write(f"\t - _{str(component.abbreviation)}_: {str(component.title)}\n")
+
+            if shard is not None:
+                shard.add(yearLevel.achievementStandard, LEARNING_AREAS_PAGE)
+
+            #-- strands and sub-strands
+            # Create a folder object for an existing folder for the learning area
+            folder = os.path.join(args.outputFolder, learningAreaFolder)
 
-                #-- strands and sub-strands
-                # Create a folder object for an existing folder for the learning area
-                folder = os.path.join(args.outputFolder, learningAreaFolder)
+            for strand in yearLevel.strands.values():
+                learningAreasMd.write(f"##### {strand.title}\n\n")
 
-                for strand in yearLevel.strands.values():
-                    learningAreasMd.write(f"##### {strand.title}\n\n")
+                #-- if there are substrands, write CDs for them
+                for subStrand in strand.subStrands.values():
+                    learningAreasMd.write(f"###### _{subStrand.title}_\n\n")
 
-                    #-- if there are substrands, write CDs for them
-                    for subStrand in strand.subStrands.values():
-                        learningAreasMd.write(f"###### _{subStrand.title}_\n\n")
+                    writeContentDescriptionMarkdown( subStrand, folder, learningAreasMd, related, shard )
 
-                        writeContentDescriptionMarkdown( subStrand, folder, learningAreasMd )
+                #-- write any content descriptions for the strand
+                writeContentDescriptionMarkdown( strand, folder, learningAreasMd, related, shard )
 
-                    #-- write any content descriptions for the strand
-                    writeContentDescriptionMarkdown( strand, folder, learningAreasMd )
+    if shard is not None:
+        searchIndex.write(shard)
+
+def closeLearningAreasMarkdown( learningAreasMd ) -> None:
+    """
+    Write the footer of the learning areas markdown file and close it
+    """
 
     #-- add wikilink definitions
     learningAreasMd.write("""
@@ -183,9 +266,41 @@ See also: [[australian-curriculum]], [[teaching]]
     #-- close the file
     learningAreasMd.close()
 
-def writeContentDescriptionMarkdown( strand, folder, learningAreasMd ) -> None:
+class markdownSink:
+    """
+    acPipeline sink (see acPipeline.acSink) writing the markdown for each learning area as it is parsed
+    """
+
+    def open(self) -> None:
+        self.learningAreasMd = openLearningAreasMarkdown()
+        self.searchIndex = openSearchIndex()
+
+    def write(self, learningArea) -> None:
+        writeLearningAreaMarkdown( learningArea, self.learningAreasMd, searchIndex=self.searchIndex )
+
+    def close(self) -> None:
+        closeLearningAreasMarkdown( self.learningAreasMd )
+        self.searchIndex.close()
+
+def runMarkdownPipeline( args ) -> None:
+    """
+    Parse the RDF files and write the markdown (plus any NDJSON/SQLite) via acPipeline
+    """
+    asyncio = deferredImport("asyncio")
+    acPipeline = deferredImport("acPipeline")
+
+    sinks = [ markdownSink() ]
+    if args.ndjson is not None:
+        sinks.append(acPipeline.ndjsonSink(args.ndjson))
+    if args.sqlite is not None:
+        sinks.append(acPipeline.sqliteSink(args.sqlite))
+
+    asyncio.run(acPipeline.runPipeline(args.rdffile, sinks))
+
+def writeContentDescriptionMarkdown( strand, folder, learningAreasMd, related = None, shard = None ) -> None:
     """
-    Write the content descriptions for a strand or sub-strand
+    Write the content descriptions for a strand or sub-strand, adding them and their
+    elaborations to the search index shard (if given)
     """
 
     learningAreasMd.write('\n<div class="grid cards" markdown>\n')
@@ -199,11 +314,19 @@ def writeContentDescriptionMarkdown( strand, folder, learningAreasMd ) -> None:
 
 """)
 
-        writeContentDescriptionMdFile( cd, folder )
+        writeContentDescriptionMdFile( cd, folder, related )
+
+        if shard is not None:
+            #-- page path relative to the output folder, with / as the separator
+            page = os.path.relpath(os.path.join(folder, f"{cd.abbreviation}.md"), args.outputFolder)
+            page = page.replace(os.sep, "/")
+            shard.add(cd, page)
+            for elaboration in cd.elaborations.values():
+                shard.add(elaboration, page)
 
     learningAreasMd.write('\n</div>\n')
 
-def writeContentDescriptionMdFile( contentDescription : acContentDescription, folder) -> None:
+def writeContentDescriptionMdFile( contentDescription : acContentDescription, folder, related = None) -> None:
     """
     WRite the content description's markdown file in the given folder/abbreviation
     """
@@ -251,6 +374,12 @@ See also: {seeString}
         for asComponent in asComponents:
             mdFile.write(f"\t- _{asComponent.abbreviation}_ - {asComponent.title}\n")
 
+    relatedCds = [] if related is None else related.get(str(contentDescription.abbreviation), [])
+    if len(relatedCds)>0:
+        mdFile.write('\n??? note "Related content descriptions (other subjects)"\n\n')
+        for notation, score in relatedCds:
+            mdFile.write(f"\t- [[{notation}]] ({score:.2f})\n")
+
         
     mdFile.write("""
 [//begin]: # "Autogenerated link references for markdown compatibility"
@@ -261,13 +390,102 @@ See also: {seeString}
     mdFile.close()
 
 
+def sourceFiles() -> list:
+    """
+    Return the paths of this script and the src modules (ac*.py, australianCurriculum.py)
+    it imports or may import. They're listed rather than imported, checking the stamp
+    doesn't import the parser
+    """
+    folder = os.path.dirname(os.path.abspath(acCli.__file__))
+    modules = [ os.path.join(folder, name) for name in sorted(os.listdir(folder))
+                if name.endswith(".py") and (name.startswith("ac") or name == "australianCurriculum.py") ]
+
+    return [ os.path.abspath(__file__) ] + modules
+
+def buildSignature( args ) -> str:
+    """
+    Return the signature of the RDF files, the options that change the output and the
+    code that generates it (see sourceFiles)
+    """
+    return acCli.filesSignature(
+        list(args.rdffile) + sourceFiles(), args.related, SECONDARY, EXCLUDE_SUBJECTS, args.ndjson, args.sqlite)
+
+def outputFiles( args ) -> list:
+    """
+    Return the paths of the files in the output folder (the pages and the search index)
+    and any --ndjson/--sqlite files
+    """
+    files = [ os.path.join(folder, name) for folder, subFolders, names in os.walk(args.outputFolder)
+              for name in names if name != BUILD_STAMP ]
+    files.extend(fileName for fileName in [ args.ndjson, args.sqlite ] if fileName is not None)
+
+    return sorted(files)
+
+def upToDate( args ) -> bool:
+    """
+    Return true iff the output was generated from the same RDF files and options, and all
+    the files generated still exist
+    """
+    if args.force or args.memoryReport:
+        return False
+    try:
+        with open(os.path.join(args.outputFolder, BUILD_STAMP)) as stamp:
+            lines = stamp.read().splitlines()
+    except FileNotFoundError:
+        return False
+
+    if len(lines) == 0 or lines[0] != buildSignature(args):
+        return False
+    #-- the search index is always generated
+    files = lines[1:] or [ os.path.join(args.outputFolder, SEARCH_FOLDER, "manifest.json") ]
+    return all(os.path.isfile(fileName) for fileName in files)
+
+def writeBuildStamp( args ) -> None:
+    """
+    Write the signature of the inputs followed by the list of files generated
+    """
+    files = outputFiles(args)
+    with open(os.path.join(args.outputFolder, BUILD_STAMP), "w") as stamp:
+        stamp.write("\n".join([ buildSignature(args) ] + files) + "\n")
+
+def generate( args ) -> None:
+    """
+    Generate the markdown (and any other output) for the RDF files
+    """
+
+    if args.pipeline:
+        if args.related > 0 or args.memoryReport:
+            raise ValueError("--pipeline can't be used with --related or --memoryReport")
+        runMarkdownPipeline( args )
+        return
+
+    ac = generateAC(args)
+
+    if args.memoryReport:
+        from acMemory import formatMemoryReport
+        print(formatMemoryReport(ac.memoryReport()))
+
+    related = None
+    if args.related > 0:
+        relatedContentDescriptions = deferredImport("acSimilarity").relatedContentDescriptions
+        related = relatedContentDescriptions(ac, args.related, cacheFolder=args.cacheFolder)
+
+    writeMarkdown( ac, related ) 
+
 if __name__ == "__main__":
 
     args = parseArgs()
 
-    ac = generateAC(args)
+    commandStart = time.perf_counter()
+    skipped = upToDate(args)
+    if not skipped:
+        generate(args)
+        writeBuildStamp(args)
+    end = time.perf_counter()
 
-    writeMarkdown( ac ) 
+    if args.verbose:
+        acCli.reportTimes(commandStart - acCli.START, end - commandStart,
+                          [ "output up to date, nothing generated" if skipped else "output generated" ])
 
 #    print(ac)
 
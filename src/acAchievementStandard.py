@@ -48,11 +48,12 @@ class acAchievementStandard(acNode):
 
         self.components = {}
 
-    def __str__(self) -> str:
-        representation = f"""Achievement standard - {self.abbreviation} - {self.title} modified {self.dateModified}"""
+    def summary(self) -> str:
+        return f"""Achievement standard - {self.abbreviation} - {self.title} modified {self.dateModified}"""
 
-        for component in self.components.keys():
-            representation += f"\n\t\t{self.components[component]}"
+    def dumpParts(self) -> list:
+        return [ ("\n\t\t", component) for component in self.components.values() ]
 
-        return representation
+    def children(self) -> list:
+        return list(self.components.values())
  
\ No newline at end of file
@@ -20,7 +20,7 @@ Implement (data) class for handling an Australian Curriculum achievement standar
 
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 from datetime import datetime
@@ -37,6 +37,12 @@ class acAchievementStandardComponent(acNode):
     dateModified : datetime = None
     nominalYearLevel : str = None
 
+    #-- the acContentDescription objects that address this component (via hasLevel)
+    # keyed on abbreviation of the content description
+    # - not in repr/eq, the content descriptions refer back to the component (the repr
+    #   of a year level would otherwise grow exponentially)
+    contentDescriptions : dict = field(default=None, repr=False, compare=False)
+
     def __init__(self, subjectId, title, abbreviation, dateModified, nominalYearLevel):
         self.subjectId = subjectId
         self.title = title
@@ -44,8 +50,7 @@ class acAchievementStandardComponent(acNode):
         self.dateModified = dateModified
         self.nominalYearLevel = nominalYearLevel
 
+        self.contentDescriptions = {}
 
-    def __str__(self) -> str:
-        representation = f"""AS component - {self.abbreviation} - {self.title} modified {self.dateModified}"""
-
-        return representation
+    def summary(self) -> str:
+        return f"""AS component - {self.abbreviation} - {self.title} modified {self.dateModified}"""
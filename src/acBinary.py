@@ -0,0 +1,353 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acBinary.py
+
+Flat binary snapshot of the AC objects that is opened with mmap, so every process of a
+multi-process server shares the one (read-only) copy of the pages
+
+    writeBinarySnapshot(ac, "v9.acsnap")
+    snapshot = acBinarySnapshot("v9.acsnap")       # constant time, only the header is read
+    cd = snapshot.learningAreas["Mathematics"].subjects["Mathematics"].yearLevels["Year 8"] ...
+
+File format (little endian)
+
+- HEADER - magic, node count, learning area (root) count and the offsets of the sections
+- records - a fixed width RECORD per node: type, year range (-1, -1 for none), tag bits
+  (see acTags.TAG_BITS), parent, (offset, length) in the string pool for each of FIELDS,
+  (start, count) of its children and of its links in the index array
+- index array - unsigned 32 bit node numbers, the children of each node (in order)
+  followed by its links (content description <-> achievement standard component)
+- string pool - the UTF-8 strings, each unique string stored once
+
+The learning areas are nodes 0 .. rootCount-1.
+
+Views
+
+- snapshot.node(n) returns a lazy view of node n, only the record is read when the view is
+  created, strings are read when accessed
+- the view classes have the same attributes as the AC classes (title, strands,
+  contentDescriptions, strand ... ) and the same names (e.g. acContentDescription) so
+  code keyed on the type name (acExport, acQuery, placeInHierarchy) works unchanged
+- values are str rather than RDFLib terms, dicts of children are built when accessed
+- yearRange (and tags for content descriptions and elaborations) are stored, so queries
+  (see acQuery.py) use the ranges normalised when the AC objects were created
+- views are cached per snapshot (per process), nothing else is copied out of the mmap
+"""
+
+import os
+import mmap
+import struct
+from array import array
+
+from acLearningArea import acLearningArea
+from acSubject import acSubject
+from acYearLevel import acYearLevel
+from acAchievementStandard import acAchievementStandard
+from acAchievementStandardComponent import acAchievementStandardComponent
+from acStrand import acStrand
+from acSubStrand import acSubStrand
+from acContentDescription import acContentDescription
+from acElaboration import acElaboration
+from acTags import tagsMask, maskTags
+
+MAGIC = b"ACSNAP02"
+#-- magic, nodeCount, rootCount, recordsOffset, indexesOffset, indexCount, stringsOffset, stringsSize
+HEADER = struct.Struct("<8s7I")
+
+#-- the string fields stored for every node (None if the node doesn't have it)
+FIELDS = [ "subjectId", "title", "abbreviation", "description", "dateModified", "nominalYearLevel" ]
+
+#-- type, yearFrom, yearTo (-1 for no year range), tag bits, parent (-1 for none),
+#   (offset, length) per FIELDS, childStart, childCount, linkStart, linkCount
+RECORD = struct.Struct("<BbbHi" + "II" * len(FIELDS) + "IIII")
+YEAR_RANGE = 1
+TAG_BITS = 3
+PARENT = 4
+FIELD_START = 5
+CHILD_START = FIELD_START + 2 * len(FIELDS)
+
+#-- offset of a None string
+NONE = 0xFFFFFFFF
+
+#-- AC class, attribute referring to the parent, { attribute: (child class name, key field) }
+# for dicts of children and the attribute holding the dict of links (if any)
+TYPES = [
+    ( acLearningArea, None, { "subjects": ("acSubject", "title") }, None ),
+    ( acSubject, "learningArea", { "yearLevels": ("acYearLevel", "title") }, None ),
+    ( acYearLevel, "subject", { "strands": ("acStrand", "title") }, None ),
+    ( acAchievementStandard, None, { "components": ("acAchievementStandardComponent", "abbreviation") }, None ),
+    ( acAchievementStandardComponent, None, {}, "contentDescriptions" ),
+    ( acStrand, "yearLevel", { "subStrands": ("acSubStrand", "title"),
+                               "contentDescriptions": ("acContentDescription", "abbreviation") }, None ),
+    ( acSubStrand, "strand", { "contentDescriptions": ("acContentDescription", "abbreviation") }, None ),
+    ( acContentDescription, "strand", { "elaborations": ("acElaboration", "abbreviation") }, "achievementStandardComponents" ),
+    ( acElaboration, None, {}, None ),
+]
+TYPE_CODES = { cls.__name__: code for code, (cls, parent, dicts, links) in enumerate(TYPES) }
+
+#-- methods of the AC classes (or acNode) that only use attributes, shared by the views
+SHARED_METHODS = [ "placeInHierarchy", "summary", "dumpParts", "dump", "__str__" ]
+
+def nodeLinks(node) -> list:
+    """
+    Return the AC objects linked to node that aren't its children or parent
+    """
+    links = TYPES[TYPE_CODES[type(node).__name__]][3]
+    if links is None:
+        return []
+    return list(getattr(node, links).values())
+
+def writeBinarySnapshot(ac, fileName) -> int:
+    """
+    Write the AC objects of the australianCurriculum object ac to fileName, return the
+    number of nodes written
+    """
+    nodes = []
+    numbers = {}
+    parents = {}
+
+    def addNode(node):
+        if id(node) not in numbers:
+            numbers[id(node)] = len(nodes)
+            nodes.append(node)
+
+    for learningArea in ac.learningAreas.values():
+        addNode(learningArea)
+    for node, nodeParents in ac.nodes():
+        addNode(node)
+        if len(nodeParents) > 0:
+            parents.setdefault(id(node), nodeParents[-1])
+    #-- components only reachable via the content descriptions' links
+    for node in list(nodes):
+        for linked in nodeLinks(node):
+            addNode(linked)
+
+    pool = bytearray()
+    strings = {}
+
+    def stringRef(value):
+        if value is None:
+            return (NONE, 0)
+        value = str(value)
+        ref = strings.get(value)
+        if ref is None:
+            encoded = value.encode("utf-8")
+            ref = strings[value] = (len(pool), len(encoded))
+            pool.extend(encoded)
+        return ref
+
+    indexes = array("I")
+    records = bytearray()
+    for node in nodes:
+        refs = []
+        for field in FIELDS:
+            refs.extend(stringRef(getattr(node, field, None)))
+
+        children = [ numbers[id(child)] for child in node.children() ]
+        childStart = len(indexes)
+        indexes.extend(children)
+        links = [ numbers[id(linked)] for linked in nodeLinks(node) ]
+        linkStart = len(indexes)
+        indexes.extend(links)
+
+        parent = parents.get(id(node))
+        years = getattr(node, "yearRange", None) or (-1, -1)
+        records.extend(RECORD.pack(
+            TYPE_CODES[type(node).__name__], years[0], years[1], tagsMask(getattr(node, "tags", None) or []),
+            -1 if parent is None else numbers[id(parent)], *refs, childStart, len(children), linkStart, len(links)))
+
+    if indexes.itemsize != 4:
+        raise ValueError("array('I') isn't 32 bit on this platform")
+    if struct.pack("=I", 1) != struct.pack("<I", 1):
+        indexes.byteswap()
+
+    recordsOffset = HEADER.size
+    indexesOffset = recordsOffset + len(records)
+    stringsOffset = indexesOffset + len(indexes) * indexes.itemsize
+
+    #-- write then rename, so a process never maps a partly written file
+    with open(fileName + ".tmp", "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(nodes), len(ac.learningAreas), recordsOffset,
+                               indexesOffset, len(indexes), stringsOffset, len(pool)))
+        file.write(records)
+        file.write(indexes.tobytes())
+        file.write(pool)
+    os.replace(fileName + ".tmp", fileName)
+
+    return len(nodes)
+
+class acNodeView:
+    """
+    Lazy view of a node in an acBinarySnapshot, see viewClass for the attributes
+    """
+    __slots__ = ( "snapshot", "number", "record" )
+
+    def __init__(self, snapshot, number : int):
+        self.snapshot = snapshot
+        self.number = number
+        self.record = snapshot.record(number)
+
+    def children(self) -> list:
+        start = self.record[CHILD_START]
+        return [ self.snapshot.node(number) for number in self.snapshot.indexRange(start, self.record[CHILD_START + 1]) ]
+
+    def links(self) -> list:
+        start = self.record[CHILD_START + 2]
+        return [ self.snapshot.node(number) for number in self.snapshot.indexRange(start, self.record[CHILD_START + 3]) ]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}View({getattr(self, 'abbreviation', None) or self.title!r})"
+
+def stringProperty(position : int):
+    def get(self):
+        return self.snapshot.string(self.record[position], self.record[position + 1])
+    return property(get)
+
+def parentProperty():
+    def get(self):
+        parent = self.record[PARENT]
+        return None if parent < 0 else self.snapshot.node(parent)
+    return property(get)
+
+def yearRangeProperty():
+    def get(self):
+        years = self.record[YEAR_RANGE:YEAR_RANGE + 2]
+        return None if years[0] < 0 else years
+    return property(get)
+
+def tagsProperty():
+    def get(self):
+        return maskTags(self.record[TAG_BITS])
+    return property(get)
+
+def dictProperty(childType : str, keyField : str):
+    def get(self):
+        return { getattr(child, keyField): child for child in self.children()
+                 if type(child).__name__ == childType }
+    return property(get)
+
+def linksProperty(keyField : str):
+    def get(self):
+        return { getattr(linked, keyField): linked for linked in self.links() }
+    return property(get)
+
+def viewClass(cls, parentAttribute, dicts : dict, linksAttribute) -> type:
+    """
+    Return a view class (named like cls) with the same attributes as the AC class cls
+    """
+    fieldNames = set(cls.__dataclass_fields__.keys())
+    namespace = { "__slots__": (), "__module__": __name__ }
+
+    for position, field in enumerate(FIELDS):
+        if field in fieldNames:
+            namespace[field] = stringProperty(FIELD_START + 2 * position)
+    namespace["yearRange"] = yearRangeProperty()
+    if "tags" in fieldNames:
+        namespace["tags"] = tagsProperty()
+    if parentAttribute is not None:
+        namespace[parentAttribute] = parentProperty()
+    for attribute, (childType, keyField) in dicts.items():
+        namespace[attribute] = dictProperty(childType, keyField)
+    if linksAttribute is not None:
+        namespace[linksAttribute] = linksProperty("abbreviation")
+    if cls is acYearLevel:
+        namespace["achievementStandard"] = property(
+            lambda self: next((child for child in self.children() if type(child).__name__ == "acAchievementStandard"), None))
+    for method in SHARED_METHODS:
+        for klass in cls.__mro__[:-1]:
+            if method in klass.__dict__:
+                namespace[method] = klass.__dict__[method]
+                break
+
+    return type(cls.__name__, (acNodeView,), namespace)
+
+#-- type code -> view class
+VIEW_CLASSES = [ viewClass(*definition) for definition in TYPES ]
+
+class acBinarySnapshot:
+    """
+    A binary snapshot (see writeBinarySnapshot) opened read-only with mmap
+    """
+
+    def __init__(self, fileName):
+        self.file = open(fileName, "rb")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        ( magic, self.nodeCount, self.rootCount, self.recordsOffset, self.indexesOffset,
+          self.indexCount, self.stringsOffset, self.stringsSize ) = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{fileName} isn't an AC binary snapshot")
+
+        #-- number -> view
+        self.views = {}
+        self._learningAreas = None
+
+    def close(self) -> None:
+        self.views = {}
+        self.buffer.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def record(self, number : int) -> tuple:
+        if number < 0 or number >= self.nodeCount:
+            raise IndexError(f"no node {number}")
+        return RECORD.unpack_from(self.buffer, self.recordsOffset + number * RECORD.size)
+
+    def indexRange(self, start : int, count : int) -> tuple:
+        return struct.unpack_from(f"<{count}I", self.buffer, self.indexesOffset + start * 4)
+
+    def string(self, offset : int, length : int) -> str:
+        if offset == NONE:
+            return None
+        start = self.stringsOffset + offset
+        return self.buffer[start:start + length].decode("utf-8")
+
+    def node(self, number : int) -> acNodeView:
+        view = self.views.get(number)
+        if view is None:
+            record = self.record(number)
+            view = self.views[number] = VIEW_CLASSES[record[0]](self, number)
+        return view
+
+    @property
+    def learningAreas(self) -> dict:
+        """
+        dict of the learning area views keyed on title (as australianCurriculum.learningAreas)
+        """
+        if self._learningAreas is None:
+            self._learningAreas = { view.title: view for view in
+                                    (self.node(number) for number in range(self.rootCount)) }
+        return self._learningAreas
+
+    def nodes(self):
+        """
+        Generator yielding (node, parents) for every node (see australianCurriculum.nodes)
+        """
+        stack = [ (learningArea, ()) for learningArea in reversed(self.learningAreas.values()) ]
+        while stack:
+            node, parents = stack.pop()
+            yield node, parents
+
+            childParents = parents + (node,)
+            for child in reversed(node.children()):
+                stack.append((child, childParents))
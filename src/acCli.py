@@ -0,0 +1,225 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acCli.py
+
+The ac console command (see pyproject.toml), fast to start so editors etc. can call it often
+
+    ac find --rdffile MAT.rdf TEC.rdf --notationPrefix AC9M8N
+    ac export --rdffile MAT.rdf --format ndjson --output mat.ndjson
+    ac snapshot --rdffile MAT.rdf TEC.rdf
+    ac validate --rdffile MAT.rdf TEC.rdf --json
+    ac --verbose find ...         # report import and startup times (stderr)
+
+Design
+
+- only the standard library is imported at start up, everything else is imported when
+  a command needs it (deferredImport records how long each took)
+- the RDF files are loaded once and saved as a binary snapshot (see acBinary.py) in the
+  cache folder, named by a hash of the files' paths, sizes and modification times
+- a cache hit opens the snapshot with mmap and never imports rdflib, only a miss imports
+  australianCurriculum (and rdflib) to parse the files
+"""
+
+import time
+
+#-- start of the command, for the --verbose times
+START = time.perf_counter()
+
+import os
+import sys
+import hashlib
+import argparse
+import importlib
+
+#-- default folder for the binary snapshots
+CACHE_FOLDER = os.path.join(os.path.expanduser("~"), ".cache", "australianCurriculum")
+SNAPSHOT_SUFFIX = ".acsnap"
+
+#-- module name -> seconds taken by deferredImport
+importTimes = {}
+
+def deferredImport(name : str):
+    """
+    Import (if not already imported) and return the module name, recording the time taken
+    """
+    module = sys.modules.get(name)
+    if module is None:
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        importTimes[name] = time.perf_counter() - start
+    return module
+
+def filesSignature(fileNames, *extra) -> str:
+    """
+    Return a hash of the paths, sizes and modification times of fileNames (and any extra
+    values), which changes whenever one of the files does
+    """
+    signature = hashlib.sha1()
+    for fileName in fileNames:
+        status = os.stat(fileName)
+        signature.update(f"{os.path.abspath(fileName)}\0{status.st_size}\0{status.st_mtime_ns}\n".encode("utf-8"))
+    for value in extra:
+        signature.update(f"{value!r}\n".encode("utf-8"))
+
+    return signature.hexdigest()
+
+def snapshotFileName(fileNames, cacheFolder : str = CACHE_FOLDER) -> str:
+    """
+    Return the path of the binary snapshot for the RDF fileNames
+    """
+    return os.path.join(cacheFolder, f"ac-{filesSignature(fileNames)[:16]}{SNAPSHOT_SUFFIX}")
+
+def openCurriculum(args, force : bool = False):
+    """
+    Return an acBinarySnapshot of args.rdffile, from the cache if possible. Sets
+    args.cacheHit
+    """
+    acBinary = deferredImport("acBinary")
+
+    snapshotFile = snapshotFileName(args.rdffile, args.cacheFolder)
+    args.snapshotFile = snapshotFile
+    args.cacheHit = os.path.isfile(snapshotFile) and not force
+    if args.cacheHit:
+        try:
+            return acBinary.acBinarySnapshot(snapshotFile)
+        except ValueError:
+            #-- written in an older format (see acBinary.MAGIC), rebuild it
+            args.cacheHit = False
+
+    australianCurriculum = deferredImport("australianCurriculum").australianCurriculum
+
+    ac = australianCurriculum()
+    for fileName in args.rdffile:
+        ac.addRdfFile(fileName)
+    os.makedirs(args.cacheFolder, exist_ok=True)
+    acBinary.writeBinarySnapshot(ac, snapshotFile)
+
+    return acBinary.acBinarySnapshot(snapshotFile)
+
+def findCommand(args) -> None:
+    acQuery = deferredImport("acQuery")
+
+    snapshot = openCurriculum(args)
+    filters = { name: getattr(args, name) for name in acQuery.FILTERS if getattr(args, name) is not None }
+
+    for count, node in enumerate(acQuery.acCurriculumIndex(snapshot).find(**filters)):
+        if args.limit is not None and count >= args.limit:
+            break
+        print(f"{getattr(node, 'abbreviation', None) or ''}\t{type(node).__name__}\t{node.title}")
+
+def exportCommand(args) -> None:
+    acExport = deferredImport("acExport")
+
+    snapshot = openCurriculum(args)
+    write = acExport.writeNdjson if args.format == "ndjson" else acExport.writeJson
+    if args.output is None:
+        write(snapshot, sys.stdout)
+    else:
+        with open(args.output, "w", encoding="utf-8") as stream:
+            write(snapshot, stream)
+
+def snapshotCommand(args) -> None:
+    snapshot = openCurriculum(args, args.force)
+    print(args.snapshotFile)
+    snapshot.close()
+
+def validateCommand(args) -> int:
+    """
+    Parse the RDF files (the checks need the graph, not a snapshot) and report any issues,
+    exit status 1 if there are some
+    """
+    australianCurriculum = deferredImport("australianCurriculum").australianCurriculum
+
+    ac = australianCurriculum()
+    for fileName in args.rdffile:
+        ac.addRdfFile(fileName)
+    report = ac.validate()
+    print(report.toJson() if args.json else report)
+
+    return 0 if report.ok else 1
+
+def parseArgs(argv=None):
+    parser = argparse.ArgumentParser(prog="ac", description="Query the Australian Curriculum RDF files")
+    parser.add_argument(
+        "--verbose", "-v", action="store_true", help="Report import and startup times (on stderr)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def addCommand(name, function, help):
+        command = commands.add_parser(name, help=help)
+        command.set_defaults(function=function)
+        command.add_argument(
+            "--rdffile", action="store", type=str, nargs="+", help="Path to the RDF file(s)", required=True)
+        command.add_argument(
+            "--cacheFolder", action="store", default=CACHE_FOLDER, help=f"Folder for the snapshots (default {CACHE_FOLDER})")
+        return command
+
+    find = addCommand("find", findCommand, "List the AC objects matching the filters")
+    find.add_argument("--learningArea", action="store", default=None)
+    find.add_argument("--subject", action="store", default=None)
+    find.add_argument("--strand", action="store", default=None)
+    find.add_argument("--subStrand", action="store", default=None)
+    find.add_argument("--yearFrom", action="store", type=int, default=None, help="Foundation is 0")
+    find.add_argument("--yearTo", action="store", type=int, default=None)
+    find.add_argument("--nodeType", action="store", default=None, help="e.g. acContentDescription")
+    find.add_argument("--notationPrefix", action="store", default=None, help="e.g. AC9M8")
+    find.add_argument("--limit", action="store", type=int, default=None, help="Maximum number of results")
+
+    export = addCommand("export", exportCommand, "Write the AC objects as JSON")
+    export.add_argument("--format", action="store", choices=[ "ndjson", "json" ], default="ndjson")
+    export.add_argument("--output", action="store", default=None, help="Output file (default stdout)")
+
+    snapshot = addCommand("snapshot", snapshotCommand, "Build (if needed) the snapshot and print its path")
+    snapshot.add_argument("--force", action="store_true", help="Rebuild even if the snapshot exists")
+
+    validate = addCommand("validate", validateCommand, "Check the RDF files for orphans, duplicate notations etc.")
+    validate.add_argument("--json", action="store_true", help="Write the report as JSON")
+
+    return parser.parse_args(argv)
+
+def reportTimes(startup : float, command : float, notes : list = None) -> None:
+    """
+    Print (to stderr) the startup and command times, the deferred imports and any notes
+    """
+    def ms(seconds):
+        return f"{seconds * 1000:.1f} ms"
+
+    report = [ f"startup {ms(startup)} (acCli import to command)" ]
+    for name, seconds in importTimes.items():
+        report.append(f"import {name} {ms(seconds)}")
+    report.append(f"rdflib imported: {'yes' if 'rdflib' in sys.modules else 'no'}")
+    report.extend(notes or [])
+    report.append(f"command {ms(command)}, total {ms(startup + command)}")
+
+    print("\n".join(report), file=sys.stderr)
+
+def main(argv=None) -> int:
+    args = parseArgs(argv)
+
+    commandStart = time.perf_counter()
+    status = args.function(args)
+    end = time.perf_counter()
+
+    if args.verbose:
+        notes = []
+        if hasattr(args, "cacheHit"):
+            notes.append(f"snapshot {args.snapshotFile} ({'hit' if args.cacheHit else 'built'})")
+        reportTimes(commandStart - START, end - commandStart, notes)
+
+    return status or 0
+
+if __name__ == "__main__":
+    sys.exit(main())
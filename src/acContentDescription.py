@@ -45,6 +45,7 @@ class acContentDescription(acNode):
 
     elaborations : dict = None # keyed on abbreviation of the contentDescription node
     achievementStandardComponents : dict = None # keyed on abbreviation of the contentDescription node
+    tags : frozenset = None # tag codes of the content description and its elaborations (see acTags.py)
     
     def __init__(self, subjectId, title, abbreviation, dateModified, nominalYearLevel, strand=None):
 
@@ -57,14 +58,20 @@ class acContentDescription(acNode):
 
         self.elaborations = {}
         self.achievementStandardComponents = {}
+        self.tags = frozenset()
 
-    def __str__(self) -> str:
-        representation = f"""- content descriptor {self.abbreviation} - {self.title} modified {self.dateModified}"""
+    def summary(self) -> str:
+        return f"""- content descriptor {self.abbreviation} - {self.title} modified {self.dateModified}"""
 
-        for elaboration in self.elaborations.keys():
-            representation += f"\n\t\t\t\t- elaboration {self.elaborations[elaboration]}"
+    def dumpParts(self) -> list:
+        return [ ("\n\t\t\t\t- elaboration ", elaboration) for elaboration in self.elaborations.values() ]
 
-        return representation
+    def children(self) -> list:
+        """
+        Elaborations are the only children, achievement standard components
+        are children of the year level's achievement standard
+        """
+        return list(self.elaborations.values())
 
     def placeInHierarchy(self) -> dict:
         """
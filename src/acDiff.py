@@ -0,0 +1,195 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acDiff.py
+
+Identify what changed between two releases of the Australian Curriculum e.g. the
+MRAC/2023/07 RDF files and a later release.
+
+    oldTree = acMerkleTree(oldAc)
+    newTree = acMerkleTree(newAc)
+    changes = diffCurricula(oldTree, newTree)
+    changes["modified"] -> [ { "path": "Mathematics / ... / AC9M8A01", "fields": { "title": (old, new) } } ... ]
+
+Design
+
+- acMerkleTree calculates (once) a hash for every node from its own fields plus the
+  hashes of its children
+- nodes are identified by their type and notation (or title) not the subjectId, the
+  URIs embed the release
+- diffCurricula compares the two trees top-down and skips any subtree whose hash is
+  unchanged, so the cost is proportional to the size of the change
+"""
+
+import hashlib
+
+#-- the node attributes compared (if the node has them)
+FIELDS = [ "title", "abbreviation", "description", "dateModified", "nominalYearLevel" ]
+
+def nodeFields(node, ignore=()) -> dict:
+    """
+    Return a dict of the string values of the FIELDS the node has
+    """
+    fields = {}
+    for field in FIELDS:
+        if field in ignore or not hasattr(node, field):
+            continue
+        value = getattr(node, field)
+        fields[field] = None if value is None else str(value)
+
+    return fields
+
+def nodeKey(node) -> tuple:
+    """
+    Return the key identifying node amongst its siblings, across releases
+    """
+    notation = getattr(node, "abbreviation", None)
+    name = notation if notation is not None else getattr(node, "title", None)
+    return (type(node).__name__, str(name))
+
+def childMap(children : list) -> dict:
+    """
+    Return a dict of children keyed on nodeKey, any duplicate keys get a numeric suffix
+    """
+    keyed = {}
+    for child in children:
+        key = nodeKey(child)
+        suffix = 1
+        while key in keyed:
+            suffix += 1
+            key = (key[0], f"{nodeKey(child)[1]}#{suffix}")
+        keyed[key] = child
+
+    return keyed
+
+class acMerkleTree:
+    """
+    Hash of every node (own fields + children's hashes) of an australianCurriculum object
+    """
+
+    def __init__(self, ac, ignore=()):
+        """
+        ignore is an optional list of FIELDS not to compare (e.g. "dateModified")
+        """
+        self.ac = ac
+        self.ignore = tuple(ignore)
+        #-- id(node) -> hash of the node's own fields
+        self.fieldHashes = {}
+        #-- id(node) -> hash of the node's fields and all its descendants
+        self.hashes = {}
+        #-- key the learning areas the same way as the other nodes
+        self.roots = childMap(ac.learningAreas.values())
+
+        #-- post-order (children before parents) using an explicit stack
+        for root in self.roots.values():
+            stack = [ (root, False) ]
+            while stack:
+                node, childrenDone = stack.pop()
+                if childrenDone:
+                    self.hashNode(node)
+                    continue
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children())
+
+    def hashNode(self, node) -> None:
+        fields = nodeFields(node, self.ignore)
+        fieldHash = hashlib.sha1(repr((type(node).__name__, sorted(fields.items()))).encode("utf-8")).digest()
+
+        digest = hashlib.sha1(fieldHash)
+        for key, child in sorted(childMap(node.children()).items()):
+            digest.update(repr(key).encode("utf-8"))
+            digest.update(self.hashes[id(child)])
+
+        self.fieldHashes[id(node)] = fieldHash
+        self.hashes[id(node)] = digest.digest()
+
+    def hash(self) -> str:
+        """
+        Return a hex hash for the whole curriculum
+        """
+        digest = hashlib.sha1()
+        for key, root in sorted(self.roots.items()):
+            digest.update(repr(key).encode("utf-8"))
+            digest.update(self.hashes[id(root)])
+
+        return digest.hexdigest()
+
+def diffCurricula(old, new, ignore=()) -> dict:
+    """
+    Compare two curricula (acMerkleTree or australianCurriculum objects) and return a dict
+    with lists of "added", "removed" and "modified" nodes. Each is a dict with
+    - path - " / " separated keys (notation or title) from the learning area down
+    - nodeType - AC class name
+    - node - the AC object (from new, or from old for removed)
+    - fields - for modified nodes, dict of field name: (old value, new value)
+    Added and removed subtrees are only reported at their top node.
+    """
+    if not isinstance(old, acMerkleTree):
+        old = acMerkleTree(old, ignore)
+    if not isinstance(new, acMerkleTree):
+        new = acMerkleTree(new, ignore)
+
+    changes = { "added": [], "removed": [], "modified": [] }
+
+    stack = [ ((), old.roots, new.roots) ]
+    while stack:
+        path, oldChildren, newChildren = stack.pop()
+
+        for key, oldNode in oldChildren.items():
+            if key not in newChildren:
+                changes["removed"].append(changeRecord(path + (key[1],), oldNode))
+
+        for key, newNode in newChildren.items():
+            nodePath = path + (key[1],)
+            oldNode = oldChildren.get(key)
+            if oldNode is None:
+                changes["added"].append(changeRecord(nodePath, newNode))
+                continue
+
+            #-- identical subtree, nothing more to do
+            if old.hashes[id(oldNode)] == new.hashes[id(newNode)]:
+                continue
+
+            if old.fieldHashes[id(oldNode)] != new.fieldHashes[id(newNode)]:
+                oldFields = nodeFields(oldNode, old.ignore)
+                newFields = nodeFields(newNode, new.ignore)
+                fields = { field: (oldFields.get(field), newFields.get(field))
+                           for field in sorted(set(oldFields) | set(newFields))
+                           if oldFields.get(field) != newFields.get(field) }
+                record = changeRecord(nodePath, newNode)
+                record["fields"] = fields
+                changes["modified"].append(record)
+
+            stack.append((nodePath, childMap(oldNode.children()), childMap(newNode.children())))
+
+    return changes
+
+def changeRecord(path : tuple, node) -> dict:
+    return { "path": " / ".join(path), "nodeType": type(node).__name__, "node": node }
+
+def changesSummary(changes : dict) -> str:
+    """
+    Return a human readable summary of the output of diffCurricula
+    """
+    lines = []
+    for kind in ["added", "removed", "modified"]:
+        lines.append(f"{kind}: {len(changes[kind])}")
+        for record in changes[kind]:
+            lines.append(f"  - {record['nodeType']} {record['path']}")
+            for field, (oldValue, newValue) in record.get("fields", {}).items():
+                lines.append(f"      {field}: {oldValue!r} -> {newValue!r}")
+
+    return "\n".join(lines)
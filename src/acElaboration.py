@@ -35,6 +35,7 @@ class acElaboration(acNode):
     abbreviation: str = None
     dateModified : datetime = None
     nominalYearLevel : str = None
+    tags : frozenset = None # codes of the general capabilities/cross-curriculum priorities (see acTags.py)
 
     def __init__(self, subjectId, title, abbreviation, dateModified, nominalYearLevel):
 
@@ -43,8 +44,7 @@ class acElaboration(acNode):
         self.abbreviation = abbreviation
         self.dateModified = dateModified
         self.nominalYearLevel = nominalYearLevel
+        self.tags = frozenset()
 
-    def __str__(self) -> str:
-        representation = f"""- elaboration {self.abbreviation} - {self.title} modified {self.dateModified}"""
-
-        return representation
+    def summary(self) -> str:
+        return f"""- elaboration {self.abbreviation} - {self.title} modified {self.dateModified}"""
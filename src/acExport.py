@@ -0,0 +1,119 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acExport.py
+
+Export the AC objects held by an australianCurriculum object as JSON, written
+incrementally to any (text) file-like object
+
+    writeNdjson(ac, stream) - one JSON record per node per line (NDJSON)
+    writeJson(ac, stream) - a single nested JSON document (records with "children")
+
+Each record has the node's id (the subjectId), parentId, nodeType and its fields. Output
+starts immediately and memory use doesn't grow with the size of the curriculum.
+
+orjson is used to encode records if it is installed, otherwise the standard json module.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+#-- the node attributes included in records (if the node has them)
+FIELDS = [ "abbreviation", "title", "description", "dateModified", "nominalYearLevel" ]
+
+jsonEncoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+def encode(record : dict) -> str:
+    """
+    Return record as a compact JSON string
+    """
+    if orjson is not None:
+        return orjson.dumps(record).decode("utf-8")
+    return jsonEncoder.encode(record)
+
+def nodeRecord(node, parent=None) -> dict:
+    """
+    Return a dict (of strings) representing node, parent is the node's parent (if any)
+    """
+    record = {
+        "id": str(node.subjectId),
+        "parentId": None if parent is None else str(parent.subjectId),
+        "nodeType": type(node).__name__,
+    }
+    for field in FIELDS:
+        if hasattr(node, field):
+            value = getattr(node, field)
+            record[field] = None if value is None else str(value)
+
+    #-- links that aren't parent/child
+    components = getattr(node, "achievementStandardComponents", None)
+    if components is not None:
+        record["achievementStandardComponentIds"] = [ str(component.subjectId) for component in components.values() ]
+
+    return record
+
+def writeNdjson(ac, stream) -> int:
+    """
+    Write one JSON record per line for every node in ac, return the number of records
+    """
+    count = 0
+    for node, parents in ac.nodes():
+        parent = parents[-1] if len(parents) > 0 else None
+        stream.write(encode(nodeRecord(node, parent)))
+        stream.write("\n")
+        count += 1
+
+    return count
+
+def writeJson(ac, stream) -> int:
+    """
+    Write a single JSON document {"learningAreas": [ record ... ]} where each record has a
+    "children" list of records. Return the number of records written
+    """
+    count = 0
+    stream.write('{"learningAreas":[')
+
+    #-- entries are (node, parent, isFirstSibling) or None to close a node
+    stack = [ (learningArea, None, index == 0)
+              for index, learningArea in reversed(list(enumerate(ac.learningAreas.values()))) ]
+
+    while stack:
+        item = stack.pop()
+        if item is None:
+            stream.write("]}")
+            continue
+
+        node, parent, first = item
+        if not first:
+            stream.write(",")
+
+        #-- the record without its closing brace, followed by the children
+        stream.write(encode(nodeRecord(node, parent))[:-1])
+        stream.write(',"children":[')
+        count += 1
+
+        stack.append(None)
+        children = node.children()
+        for index in range(len(children) - 1, -1, -1):
+            stack.append((children[index], node, index == 0))
+
+    stream.write("]}\n")
+
+    return count
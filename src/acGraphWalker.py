@@ -0,0 +1,155 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acGraphWalker.py
+
+Walk the parent/child (hasChild) and hasLevel structure of an AC RDFLib graph from a
+given node, without recursion. Used by australianCurriculum.walkTheGraph and
+datasette/recurse.py
+
+    for depth, node, info in walkGraph(graph, rootId, maxDepth=3):
+        ...
+
+    writeWalk(walkGraph(graph, rootId), sys.stdout)
+
+Design
+
+- an explicit stack, so the depth of the tree is not limited by the recursion limit
+- a generator yielding (depth, node, info) events, info is the list of (predicate, object)
+  for the node that aren't hasChild/hasLevel
+- cycle detection - a node that is already on the path from the root is not walked again
+  (optionally, with unique=True, no node is walked more than once)
+- optional limits on depth and on the statementLabel of the nodes walked
+- writeWalk formats the events (same format as the original recurse.py) and writes them
+  to a stream in large chunks
+"""
+
+from rdflib import URIRef
+
+HAS_CHILD = URIRef("http://purl.org/gem/qualifiers/hasChild")
+HAS_LEVEL = URIRef("http://purl.org/ASN/schema/core/hasLevel")
+STATEMENT_NOTATION = URIRef("http://purl.org/ASN/schema/core/statementNotation")
+STATEMENT_LABEL = URIRef("http://purl.org/ASN/schema/core/statementLabel")
+TITLE = URIRef("http://purl.org/dc/terms/title")
+
+#-- the predicates displayed first (and by name) by writeWalk
+DISPLAY_FIRST = { STATEMENT_NOTATION: "statementNotation", STATEMENT_LABEL: "statementLabel", TITLE: "title" }
+
+#-- prefix removed from node ids by writeWalk
+ID_PREFIX = "http://vocabulary.curriculum.edu.au/MRAC/2023/07/"
+
+#-- number of lines writeWalk buffers before writing
+BUFFER_LINES = 1000
+
+def splitPos(pos) -> tuple:
+    """
+    Given a generator of all predicate_objects split them into a tuple of lists
+    (nodeInfo, nodeChildren, nodeLevels)
+    """
+    nodeInfo = []
+    nodeChildren = []
+    nodeLevels = []
+
+    for p, o in pos:
+        if p == HAS_CHILD:
+            nodeChildren.append(o)
+        elif p == HAS_LEVEL:
+            nodeLevels.append(o)
+        else:
+            nodeInfo.append((p, o))
+
+    return ( nodeInfo, nodeChildren, nodeLevels )
+
+def walkGraph(graph, root, maxDepth : int = None, labels=None, unique : bool = False):
+    """
+    Generator yielding (depth, node, info) for root and all the nodes below it
+    - levels (hasLevel) are walked before children (hasChild)
+    - maxDepth - don't walk nodes deeper than this (root is depth 0)
+    - labels - only walk nodes (other than root) whose statementLabel is in labels
+    - unique - walk each node at most once (otherwise only cycles are prevented)
+    """
+    if labels is not None:
+        labels = set(str(label) for label in labels)
+
+    visited = set()
+    #-- the nodes on the path from the root to the current node
+    path = set()
+    #-- entries are (depth, node) or (None, node) to mark leaving node
+    stack = [ (0, URIRef(root)) ]
+
+    while stack:
+        depth, node = stack.pop()
+        if depth is None:
+            path.discard(node)
+            continue
+
+        if node in path or (unique and node in visited):
+            continue
+
+        ( nodeInfo, nodeChildren, nodeLevels ) = splitPos(graph.predicate_objects(subject=node))
+
+        if depth > 0 and labels is not None:
+            label = next((str(o) for p, o in nodeInfo if p == STATEMENT_LABEL), None)
+            if label not in labels:
+                continue
+
+        visited.add(node)
+        yield depth, node, nodeInfo
+
+        if maxDepth is not None and depth >= maxDepth:
+            continue
+
+        path.add(node)
+        stack.append((None, node))
+        #-- reversed so levels then children are popped in their original order
+        for child in reversed(nodeLevels + nodeChildren):
+            stack.append((depth + 1, child))
+
+def formatNode(depth : int, node, nodeInfo : list) -> list:
+    """
+    Return a list of lines describing a node
+    """
+    id = str(node).replace(ID_PREFIX, "")
+
+    lines = [ f"{'  ' * depth}Node {id}" ]
+    for (p, o) in nodeInfo:
+        if p in DISPLAY_FIRST:
+            lines.append(f"{'   ' * depth}- {DISPLAY_FIRST[p]} {o}")
+
+    for (p, o) in nodeInfo:
+        if p not in DISPLAY_FIRST:
+            lines.append(f"{'   ' * depth} - other predicate {p} >>> {o}")
+
+    return lines
+
+def writeWalk(events, stream, bufferLines : int = BUFFER_LINES) -> int:
+    """
+    Write the (depth, node, info) events from walkGraph to stream, buffering
+    bufferLines lines between writes. Return the number of nodes written.
+    """
+    count = 0
+    buffer = []
+    for depth, node, nodeInfo in events:
+        buffer.extend(formatNode(depth, node, nodeInfo))
+        count += 1
+        if len(buffer) >= bufferLines:
+            stream.write("\n".join(buffer) + "\n")
+            buffer = []
+
+    if len(buffer) > 0:
+        stream.write("\n".join(buffer) + "\n")
+
+    return count
@@ -48,12 +48,12 @@ class acLearningArea(acNode):
 
         self.subjects = {}
 
-    def __str__(self) -> str:
-        #-- create a string representation of the dateModified date object
-        representation = f"""\tLearning Area {self.title} ({self.abbreviation}) modified {self.dateModified}"""
+    def summary(self) -> str:
+        return f"""\tLearning Area {self.title} ({self.abbreviation}) modified {self.dateModified}"""
 
-        for subject in self.subjects.keys():
-            representation += f"\n\t{self.subjects[subject]}"
+    def dumpParts(self) -> list:
+        return [ ("\n\t", subject) for subject in self.subjects.values() ]
 
-        return representation
+    def children(self) -> list:
+        return list(self.subjects.values())
  
\ No newline at end of file
@@ -0,0 +1,189 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acMapping.py
+
+Map v8.4 content descriptions (e.g. ACMNA190 from the v8.4 CSV files) to the v9
+content descriptions (e.g. AC9M8A01) held in an australianCurriculum object.
+
+    v84 = readV84ContentDescriptions("../data/v8.4/F-10 CD CCP tagging-Table 1.csv")
+    mapping = mapV84ToV9(v84, ac, k=3)
+
+Design
+
+- blocking: v8.4 content descriptions are only compared with v9 content descriptions
+  from the same learning area with overlapping years
+- scoring (per learning area) is vectorised
+  - text - cosine similarity of TF-IDF vectors (see acSimilarity.tfidfMatrix) of the
+    content description text
+  - hierarchy - same subject plus cosine similarity of the strand/sub-strand titles
+  - score = TEXT_WEIGHT * text + (1 - TEXT_WEIGHT) * hierarchy
+- the result is a list of dicts (a scored mapping table), up to k v9 content
+  descriptions for each v8.4 content description
+"""
+
+from dataclasses import dataclass
+
+import csv
+
+import numpy as np
+
+from acQuery import yearRange
+from acSimilarity import tfidfMatrix
+
+TEXT_WEIGHT = 0.8
+#-- v8.4 subjects/strands aren't always the same as v9, only a partial contribution
+SUBJECT_WEIGHT = 0.5
+
+@dataclass
+class v84ContentDescription:
+    code : str = None
+    text : str = None
+    learningArea : str = None
+    subject : str = None
+    level : str = None
+    strand : str = None
+    subStrand : str = None
+
+def readV84ContentDescriptions(fileName : str) -> list:
+    """
+    Return a list of v84ContentDescription from a v8.4 CSV file with (at least) the columns
+    LearningArea, Subject, Level, Strand, Substrand, CdCode, ContentDesc
+    (e.g. "F-10 CD CCP tagging-Table 1.csv" or "F-10 CD Elb-Table 1.csv")
+
+    Each CdCode is only included once
+    """
+    contentDescriptions = {}
+    with open(fileName, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            code = row["CdCode"]
+            if code == "" or code in contentDescriptions:
+                continue
+            contentDescriptions[code] = v84ContentDescription(
+                code, row["ContentDesc"], row["LearningArea"], row["Subject"], row["Level"],
+                row["Strand"], row["Substrand"])
+
+    return list(contentDescriptions.values())
+
+def mapV84ToV9(v84 : list, ac, k : int = 3, minScore : float = 0.1) -> list:
+    """
+    Return a list of dicts, one for each of the (up to) k best v9 content descriptions
+    for each v8.4 content description with a score of at least minScore
+    """
+    #-- group both sides by learning area
+    v9ByLearningArea = {}
+    for entry in ac.index.findEntries(nodeType="acContentDescription"):
+        v9ByLearningArea.setdefault(entry.learningArea, []).append(entry)
+
+    v84ByLearningArea = {}
+    for cd in v84:
+        if cd.learningArea in v9ByLearningArea:
+            v84ByLearningArea.setdefault(cd.learningArea, []).append(cd)
+
+    mapping = []
+    for learningArea, v84Cds in v84ByLearningArea.items():
+        mapping.extend(mapLearningArea(v84Cds, v9ByLearningArea[learningArea], k, minScore))
+
+    return mapping
+
+def mapLearningArea(v84Cds : list, v9Entries : list, k : int, minScore : float) -> list:
+    """
+    Map the v8.4 content descriptions to the v9 content descriptions (acIndexEntry) from
+    a single learning area
+    """
+    n84 = len(v84Cds)
+
+    #-- shared vocabulary for both versions
+    text = tfidfMatrix([cd.text for cd in v84Cds] + [str(entry.node.title) for entry in v9Entries])
+    text84, text9 = text.rows(slice(None, n84)), text.rows(slice(n84, None))
+    strands = tfidfMatrix(
+        [f"{cd.strand} {cd.subStrand}" for cd in v84Cds] +
+        [f"{entry.strand} {entry.subStrand or ''}" for entry in v9Entries])
+    strands84, strands9 = strands.rows(slice(None, n84)), strands.rows(slice(n84, None))
+
+    subjects = {}
+    subject84 = np.array([subjects.setdefault(cd.subject, len(subjects)) for cd in v84Cds])
+    subject9 = np.array([subjects.setdefault(entry.subject, len(subjects)) for entry in v9Entries])
+
+    #-- block by year, v8.4 rows without a year (e.g. "Options") are compared with all years
+    years84 = [yearRange(cd.level) for cd in v84Cds]
+    years9 = [entry.yearRange for entry in v9Entries]
+    blocks = {}
+    for row, years in enumerate(years84):
+        for year in (range(years[0], years[1] + 1) if years is not None else [None]):
+            blocks.setdefault(year, ([], []))[0].append(row)
+    for column, years in enumerate(years9):
+        if years is None:
+            continue
+        for year in range(years[0], years[1] + 1):
+            blocks.setdefault(year, ([], []))[1].append(column)
+    allColumns = [ column for column, years in enumerate(years9) if years is not None ]
+    if None in blocks:
+        blocks[None] = (blocks[None][0], allColumns)
+
+    #-- best score for each (row, column) pair, pairs may appear in more than one block
+    best = {}
+    for year, (rows, columns) in blocks.items():
+        if len(rows) == 0 or len(columns) == 0:
+            continue
+        rows = np.array(rows)
+        columns = np.array(columns)
+
+        textScores = text84.rows(rows).timesTranspose(text9.rows(columns))
+        hierarchyScores = (
+            SUBJECT_WEIGHT * (subject84[rows, None] == subject9[None, columns]) +
+            (1 - SUBJECT_WEIGHT) * strands84.rows(rows).timesTranspose(strands9.rows(columns)))
+        scores = TEXT_WEIGHT * textScores + (1 - TEXT_WEIGHT) * hierarchyScores
+
+        blockK = min(k, len(columns))
+        top = np.argpartition(-scores, blockK - 1, axis=1)[:, :blockK]
+        topScores = np.take_along_axis(scores, top, axis=1)
+        topText = np.take_along_axis(textScores, top, axis=1)
+        topHierarchy = np.take_along_axis(hierarchyScores, top, axis=1)
+
+        for i, row in enumerate(rows):
+            for j in range(blockK):
+                if topScores[i, j] < minScore:
+                    continue
+                pair = (int(row), int(columns[top[i, j]]))
+                if pair not in best or best[pair][0] < topScores[i, j]:
+                    best[pair] = (float(topScores[i, j]), float(topText[i, j]), float(topHierarchy[i, j]))
+
+    #-- keep the k best for each v8.4 content description
+    byRow = {}
+    for (row, column), scores in best.items():
+        byRow.setdefault(row, []).append((scores, column))
+
+    mapping = []
+    for row in sorted(byRow.keys()):
+        cd = v84Cds[row]
+        for rank, (scores, column) in enumerate(sorted(byRow[row], reverse=True)[:k], start=1):
+            entry = v9Entries[column]
+            mapping.append({
+                "v84Code": cd.code,
+                "v9Code": entry.notation,
+                "rank": rank,
+                "score": round(scores[0], 4),
+                "textScore": round(scores[1], 4),
+                "hierarchyScore": round(scores[2], 4),
+                "learningArea": cd.learningArea,
+                "v84Subject": cd.subject,
+                "v9Subject": entry.subject,
+                "v84Level": cd.level,
+                "v9YearLevel": entry.yearLevel,
+            })
+
+    return mapping
@@ -0,0 +1,137 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acMemory.py
+
+Report the memory retained by an australianCurriculum object, broken down by
+
+- strings - the title, description, abbreviation and nominalYearLevel values of the AC objects
+- nodes - the AC objects themselves (and their dicts of children), by type, including the
+  achievement standard components only linked from content descriptions
+- parentReferences - (estimated) cost of the references from a node back to its parent
+  (e.g. acContentDescription.strand)
+- indexes - query, text and hasLevel indexes, and the achievementStandardComponents dict
+  (the components themselves are nodes)
+- graph - the RDFLib graph
+- other - anything else held by the australianCurriculum object
+
+    report = memoryReport(ac)      # or ac.memoryReport()
+    print(formatMemoryReport(report))
+
+Design
+
+- sizes are calculated with Pympler's asizeof, using a single Asizer so every object is
+  counted once, in the first category (in the order above) that reaches it. The categories
+  add up to the total.
+- strings are shared with the RDFLib graph (the Literals are the graph's objects), so
+  graphStandalone is also reported - the size of the graph if it were held on its own
+- a parent reference is a single dict entry in the node, PARENT_REFERENCE_BYTES each
+"""
+
+import struct
+
+from pympler.asizeof import Asizer, asizeof, flatsize
+
+#-- the node attributes counted as strings (if the node has them)
+STRING_FIELDS = [ "title", "description", "abbreviation", "nominalYearLevel" ]
+
+#-- the node attributes that refer back to the node's parent
+PARENT_FIELDS = [ "learningArea", "subject", "yearLevel", "strand" ]
+
+#-- a dict entry is a hash, a key pointer and a value pointer
+PARENT_REFERENCE_BYTES = 3 * struct.calcsize("P")
+
+#-- the australianCurriculum attributes counted as indexes
+INDEX_ATTRIBUTES = [ "index", "textIndex", "hasLevel", "isLevelOf", "achievementStandardComponents" ]
+
+def memoryReport(ac) -> dict:
+    """
+    Return a dict (suitable for JSON) describing the memory (bytes) retained by the
+    australianCurriculum object ac
+    """
+    #-- every AC object once, the components linked only from content descriptions aren't
+    #   yielded by nodes()
+    nodes = { id(node): node for node, parents in ac.nodes() }
+    for component in (ac.achievementStandardComponents or {}).values():
+        nodes.setdefault(id(component), component)
+    nodes = list(nodes.values())
+    sizer = Asizer()
+
+    #-- strings
+    strings = [ getattr(node, field) for node in nodes for field in STRING_FIELDS
+                if getattr(node, field, None) is not None ]
+    stringBytes = sizer.asizeof(*strings)
+    uniqueStrings = len(set(str(value) for value in strings))
+
+    #-- nodes, each excluding the other nodes it refers to
+    sizer.exclude_objs(*nodes)
+    nodeTypes = {}
+    parentReferences = 0
+    for node in nodes:
+        nodeType = nodeTypes.setdefault(type(node).__name__, { "count": 0, "bytes": 0 })
+        nodeType["count"] += 1
+        nodeType["bytes"] += flatsize(node) + sizer.asizeof(node.__dict__)
+        parentReferences += sum(1 for field in PARENT_FIELDS if getattr(node, field, None) is not None)
+
+    indexes = [ getattr(ac, name) for name in INDEX_ATTRIBUTES if getattr(ac, name, None) is not None ]
+    indexBytes = sizer.asizeof(*indexes)
+
+    graphBytes = 0 if ac.graph is None else sizer.asizeof(ac.graph)
+
+    otherBytes = sizer.asizeof(ac)
+
+    nodeBytes = sum(nodeType["bytes"] for nodeType in nodeTypes.values())
+    return {
+        "total": stringBytes + nodeBytes + indexBytes + graphBytes + otherBytes,
+        "strings": { "count": len(strings), "unique": uniqueStrings, "bytes": stringBytes },
+        "nodes": { "count": len(nodes), "bytes": nodeBytes, "types": nodeTypes },
+        "parentReferences": { "count": parentReferences, "bytes": parentReferences * PARENT_REFERENCE_BYTES },
+        "indexes": indexBytes,
+        "graph": graphBytes,
+        "graphStandalone": 0 if ac.graph is None else asizeof(ac.graph),
+        "triples": 0 if ac.graph is None else len(ac.graph),
+        "other": otherBytes,
+    }
+
+def formatMemoryReport(report : dict) -> str:
+    """
+    Return a human readable version of the output of memoryReport
+    """
+    def mb(size):
+        return f"{size / 1024 / 1024:8.2f} MB"
+
+    strings = report["strings"]
+    nodes = report["nodes"]
+    parentReferences = report["parentReferences"]
+
+    def line(label, size, note=""):
+        return f"{label:<34}{mb(size)}  {note}".rstrip()
+
+    lines = [
+        line("total", report["total"]),
+        line("graph", report["graph"], f"({report['triples']} triples, {mb(report['graphStandalone']).strip()} on its own)"),
+        line("strings", strings["bytes"], f"({strings['count']} values, {strings['unique']} unique)"),
+        line("nodes", nodes["bytes"], f"({nodes['count']} objects)"),
+    ]
+    for name, nodeType in sorted(nodes["types"].items(), key=lambda item: -item[1]["bytes"]):
+        lines.append(line(f"  {name}", nodeType["bytes"], f"({nodeType['count']})"))
+    lines.extend([
+        line("  parent references", parentReferences["bytes"], f"({parentReferences['count']}, included in nodes)"),
+        line("indexes", report["indexes"]),
+        line("other", report["other"]),
+    ])
+
+    return "\n".join(lines)
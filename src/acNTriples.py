@@ -0,0 +1,193 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acNTriples.py
+
+Convert AC RDF/XML files (once) into N-Triples cache files and load those in
+parallel
+
+    ntFile = convertRdfFile("MAT.rdf", "cache")       # cache/MAT.nt
+    ntFile = cachedNTriples("MAT.rdf", "cache")       # convert only if missing/out of date
+    loadNTriples(graph, [ "cache/MAT.nt", "cache/TEC.nt" ], workers=4)
+
+australianCurriculum.addRdfFile loads files ending in NTRIPLES_SUFFIX with loadNTriples.
+See also datasette/rdfToNTriples.py
+
+Design
+
+- RDF/XML parsing is sequential and RDFLib's slowest format. N-Triples is one triple per
+  line, so a file can be split into byte ranges (CHUNK_BYTES, ending on a line boundary)
+  that are parsed independently by worker processes (ProcessPoolExecutor)
+- the chunks of all the files are parsed by the one pool, the triples are then added to
+  the graph in the parent process
+- lines are in the order the RDF/XML parser produced the triples, not sorted - the order
+  of the AC objects (e.g. the elaborations of a content description) follows the order the
+  triples were added to the graph, so a sorted file would change it
+- blank nodes are skolemized when converting so their labels mean the same thing in every
+  chunk (the AC RDF files don't have any)
+- files smaller than CHUNK_BYTES, or workers=1, are parsed in process
+"""
+
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from rdflib import Graph, BNode, Literal
+from rdflib.plugins.parsers.ntriples import W3CNTriplesParser
+
+NTRIPLES_SUFFIX = ".nt"
+
+#-- (approximate) size of the byte range parsed by each worker task
+CHUNK_BYTES = 1024 * 1024
+
+def ntriplesTerm(term) -> str:
+    """
+    Return term in N-Triples syntax. Literals are quoted here, n3() would use Turtle's
+    triple quoted strings for values with new lines
+    """
+    if not isinstance(term, Literal):
+        return term.n3()
+
+    quoted = '"' + str(term).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"').replace("\r", "\\r") + '"'
+    if term.language:
+        return f"{quoted}@{term.language}"
+    if term.datatype:
+        return f"{quoted}^^<{term.datatype}>"
+    return quoted
+
+def ntriplesLine(triple) -> str:
+    """
+    Return the N-Triples line for triple, blank nodes are skolemized
+    """
+    return " ".join(ntriplesTerm(term.skolemize() if isinstance(term, BNode) else term)
+                    for term in triple) + " .\n"
+
+def convertRdfFile(rdfFile, outputFolder=None) -> str:
+    """
+    Convert the RDF/XML rdfFile into an N-Triples file (same name with NTRIPLES_SUFFIX)
+    in outputFolder (default the folder of rdfFile). Return the path of the N-Triples file
+    """
+    graph = orderedGraph()
+    graph.parse(rdfFile, format="xml")
+
+    #-- unique lines, in the order parsed
+    lines = dict.fromkeys(ntriplesLine(triple) for triple in graph.ordered)
+
+    ntFile = cacheFileName(rdfFile, outputFolder)
+    #-- write then rename, so a partly written file is never used
+    with open(ntFile + ".tmp", "w", encoding="utf-8") as file:
+        for line in lines:
+            file.write(line)
+    os.replace(ntFile + ".tmp", ntFile)
+
+    return ntFile
+
+def cacheFileName(rdfFile, outputFolder=None) -> str:
+    if outputFolder is None:
+        outputFolder = os.path.dirname(rdfFile)
+    baseName = os.path.splitext(os.path.basename(rdfFile))[0]
+    return os.path.join(outputFolder, baseName + NTRIPLES_SUFFIX)
+
+def cachedNTriples(rdfFile, outputFolder=None) -> str:
+    """
+    Return the path of the N-Triples cache for rdfFile, converting it if the cache doesn't
+    exist or is older than rdfFile
+    """
+    ntFile = cacheFileName(rdfFile, outputFolder)
+    if not os.path.isfile(ntFile) or os.path.getmtime(ntFile) < os.path.getmtime(rdfFile):
+        convertRdfFile(rdfFile, outputFolder)
+
+    return ntFile
+
+def chunkRanges(fileName, chunkBytes : int = CHUNK_BYTES) -> list:
+    """
+    Return a list of (start, end) byte ranges covering fileName, each ending at the end of a line
+    """
+    size = os.path.getsize(fileName)
+    ranges = []
+    with open(fileName, "rb") as file:
+        start = 0
+        while start < size:
+            file.seek(min(start + chunkBytes, size))
+            file.readline()
+            end = min(file.tell(), size)
+            ranges.append((start, end))
+            start = end
+
+    return ranges
+
+class orderedGraph(Graph):
+    """
+    Graph that also keeps a list of the triples in the order they were added
+    """
+    def __init__(self):
+        super().__init__()
+        self.ordered = []
+
+    def add(self, triple):
+        self.ordered.append(triple)
+        return super().add(triple)
+
+class tripleSink(list):
+    """
+    W3CNTriplesParser sink collecting a list of (subject, predicate, object)
+    """
+    def triple(self, subject, predicate, object) -> None:
+        self.append((subject, predicate, object))
+
+def parseChunk(fileName, start : int, end : int) -> list:
+    """
+    Return the list of triples in bytes start to end of the N-Triples fileName
+    (run in the worker processes)
+    """
+    with open(fileName, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    triples = tripleSink()
+    W3CNTriplesParser(sink=triples).parse(io.BytesIO(data))
+
+    return triples
+
+def loadNTriples(graph, fileNames, workers : int = None, chunkBytes : int = CHUNK_BYTES) -> int:
+    """
+    Parse one or more N-Triples files into graph, splitting them into chunks parsed by
+    up to workers processes (default os.cpu_count()). Return the number of triples parsed
+    """
+    if isinstance(fileNames, (str, os.PathLike)):
+        fileNames = [ fileNames ]
+
+    tasks = [ (str(fileName), start, end) for fileName in fileNames
+              for start, end in chunkRanges(fileName, chunkBytes) ]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(tasks) <= 1:
+        results = ( parseChunk(*task) for task in tasks )
+        return addTriples(graph, results)
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        results = executor.map(parseChunk, *zip(*tasks))
+        return addTriples(graph, results)
+
+def addTriples(graph, results) -> int:
+    count = 0
+    for triples in results:
+        graph.addN((subject, predicate, object, graph) for subject, predicate, object in triples)
+        count += len(triples)
+
+    return count
@@ -17,32 +17,110 @@
 acNode.py
 
 Base class for all the other classes used to encapsulate information about particular types of AC nodes
+
+dump() writes a node and its descendants as text to any file-like object as it goes
+(str() of a node uses it), each class provides
+- summary() - the node's own line
+- dumpParts() - the text and (prefix, child) pairs that follow it
 """
 
 from dataclasses import dataclass
 from typing import Any
 
+import io
+import sys
 from datetime import datetime
 
+#-- format of the dateModified property
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+#-- formats of the dcterms:modified values, there's a bit of variety in the AC rdf files,
+#   and the dateModified property's own format (e.g. from a binary snapshot)
+DATE_FORMATS = [ "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S.%f%z", DATE_FORMAT ]
+
+def parseDate(value) -> datetime:
+    """
+    Convert the string value (e.g. 2021-09-28T09:27:45+00:00) into a datetime object,
+    None if it isn't in one of the DATE_FORMATS
+    """
+    #-- fromisoformat is much faster than strptime and handles the ISO formats
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        pass
+    for format in DATE_FORMATS:
+        try:
+            return datetime.strptime(str(value), format)
+        except ValueError:
+            pass
+    return None
+
 @dataclass
 class acNode:
     dateModified : datetime 
 
+    #-- (min, max) integer years (Foundation is 0) the node applies to, see acQuery.setYearRanges
+    yearRange = None
+
     @property
     def dateModified(self):
         """
         Return the dateModified as a string
         """
-        return self._dateModified.strftime("%Y-%m-%d %H:%M:%S")
+        return self._dateModified.strftime(DATE_FORMAT)
 
     @dateModified.setter
     def dateModified(self, value):
         """
         Convert the string value (e.g. 2021-09-28T09:27:45+00:00) into a datetime object
         """
-        try:
-            self._dateModified = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z") 
-        except: 
-            # there's a bit of variety in the AC rdf files
-            self._dateModified = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+        self._dateModified = parseDate(value)
+        if self._dateModified is None:
+            raise ValueError(f"Unparseable dateModified {value}")
+
+    def children(self) -> list:
+        """
+        Return a list of the AC objects that are children of this node
+        - over-ridden by the classes that have children (leaf nodes have none)
+        """
+        return []
+
+    def summary(self) -> str:
+        """
+        Return the node's own line of a dump
+        """
+        return f"{self.abbreviation} - {self.title} modified {self.dateModified}"
+
+    def dumpParts(self) -> list:
+        """
+        Return what follows the node's line in a dump - strings, and (prefix, child) tuples
+        for the children. Over-ridden by the classes that have children
+        """
+        return []
+
+    def dump(self, stream=None, depth : int = None, fields : list = None) -> None:
+        """
+        Write the node and its descendants to stream (default sys.stdout)
+        - depth - how many levels of descendants to include (default all, 0 for just the node)
+        - fields - the attributes shown on each node's line (default the class's summary())
+        """
+        if stream is None:
+            stream = sys.stdout
+
+        if fields is None:
+            stream.write(self.summary())
+        else:
+            stream.write(" - ".join(str(getattr(self, field, None)) for field in fields))
+
+        for part in self.dumpParts():
+            if isinstance(part, str):
+                stream.write(part)
+            elif depth is None or depth > 0:
+                prefix, child = part
+                stream.write(prefix)
+                child.dump(stream, None if depth is None else depth - 1, fields)
+
+    def __str__(self) -> str:
+        stream = io.StringIO()
+        self.dump(stream)
+        return stream.getvalue()
 
@@ -0,0 +1,211 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acPipeline.py
+
+asyncio pipeline that overlaps parsing the AC RDF files with generating output from them
+
+    sinks = [ ndjsonSink("ac.ndjson"), sqliteSink("ac.db"), mySink ]
+    learningAreas = asyncio.run(runPipeline([ "MAT.rdf", "TEC.rdf" ], sinks))
+
+Design
+
+- each RDF file is parsed (by its own australianCurriculum object) in a worker process,
+  at most `workers` at a time, and its learning area(s) are passed on in file order
+- every sink has its own bounded asyncio.Queue (queueSize) and consumer task. A learning
+  area is put on every queue, so parsing waits (backpressure) when the slowest sink is
+  queueSize learning areas behind
+- sink methods (open, write, close) are blocking and run in threads (asyncio.to_thread),
+  so the sinks run concurrently with each other and with the parsing
+- so total time tends towards the slowest stage rather than the sum of the stages
+
+A sink is any object with the acSink methods (subclasses of acSink must implement
+write, open and close default to doing nothing). ndjsonSink and sqliteSink are provided,
+memex/genMemexAc.py has a markdown sink.
+
+Output that needs all the learning areas at once (e.g. acSimilarity's related content
+descriptions) can't be streamed this way.
+"""
+
+import os
+import asyncio
+from abc import ABC, abstractmethod
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from acExport import nodeRecord, encode, FIELDS
+
+#-- default maximum number of learning areas waiting on each sink's queue
+QUEUE_SIZE = 2
+
+def parseRdfFile(fileName) -> dict:
+    """
+    Return the learning areas (dict keyed on title) from a single RDF file
+    (run in the worker processes)
+    """
+    from australianCurriculum import australianCurriculum
+
+    ac = australianCurriculum()
+    ac.addRdfFile(fileName)
+    return ac.learningAreas
+
+def subtreeNodes(node):
+    """
+    Generator yielding (node, parent) for node and all its descendants
+    """
+    stack = [ (node, None) ]
+    while stack:
+        node, parent = stack.pop()
+        yield node, parent
+        for child in reversed(node.children()):
+            stack.append((child, node))
+
+class acSink(ABC):
+    """
+    Abstract base class for pipeline sinks, each method is called in a worker thread
+    """
+
+    def open(self) -> None:
+        pass
+
+    @abstractmethod
+    def write(self, learningArea) -> None:
+        """
+        Output a single (complete) acLearningArea
+        """
+
+    def close(self) -> None:
+        pass
+
+class ndjsonSink(acSink):
+    """
+    Write a JSON record (see acExport) per node to fileName
+    """
+
+    def __init__(self, fileName):
+        self.fileName = fileName
+        self.stream = None
+
+    def open(self) -> None:
+        self.stream = open(self.fileName, "w", encoding="utf-8")
+
+    def write(self, learningArea) -> None:
+        for node, parent in subtreeNodes(learningArea):
+            self.stream.write(encode(nodeRecord(node, parent)))
+            self.stream.write("\n")
+
+    def close(self) -> None:
+        self.stream.close()
+
+class sqliteSink(acSink):
+    """
+    Write a row (see acExport.nodeRecord) per node to the nodes table of the SQLite
+    database fileName, replaced if it already exists
+    """
+    COLUMNS = [ "id", "parentId", "nodeType" ] + FIELDS
+
+    def __init__(self, fileName):
+        self.fileName = fileName
+        self.connection = None
+
+    def open(self) -> None:
+        #-- the connection is used by the sink's consumer, not always the same thread
+        self.connection = sqlite3.connect(self.fileName, check_same_thread=False)
+        self.connection.execute("DROP TABLE IF EXISTS nodes")
+        columns = ", ".join(f"{column} TEXT" for column in self.COLUMNS[1:])
+        self.connection.execute(f"CREATE TABLE nodes (id TEXT PRIMARY KEY, {columns})")
+
+    def write(self, learningArea) -> None:
+        rows = []
+        for node, parent in subtreeNodes(learningArea):
+            record = nodeRecord(node, parent)
+            rows.append([ record.get(column) for column in self.COLUMNS ])
+
+        placeholders = ", ".join("?" for column in self.COLUMNS)
+        #-- a node (e.g. a shared component) may appear more than once
+        self.connection.executemany(f"INSERT OR REPLACE INTO nodes VALUES ({placeholders})", rows)
+        self.connection.commit()
+
+    def close(self) -> None:
+        self.connection.execute("CREATE INDEX IF NOT EXISTS nodes_parentId ON nodes(parentId)")
+        self.connection.commit()
+        self.connection.close()
+
+async def consume(sink : acSink, queue : asyncio.Queue) -> None:
+    """
+    Write the learning areas on queue to sink until None is received
+    """
+    await asyncio.to_thread(sink.open)
+    while True:
+        learningArea = await queue.get()
+        if learningArea is None:
+            break
+        await asyncio.to_thread(sink.write, learningArea)
+    await asyncio.to_thread(sink.close)
+
+async def put(queue : asyncio.Queue, item, consumer : asyncio.Task) -> None:
+    """
+    Put item on queue, raising the consumer's exception if it fails first (rather than
+    waiting forever for space on its queue)
+    """
+    putTask = asyncio.ensure_future(queue.put(item))
+    await asyncio.wait({ putTask, consumer }, return_when=asyncio.FIRST_COMPLETED)
+    if not putTask.done():
+        putTask.cancel()
+        consumer.result()
+
+async def runPipeline(fileNames, sinks, queueSize : int = QUEUE_SIZE, workers : int = None,
+                      processes : bool = True) -> dict:
+    """
+    Parse the RDF fileNames and write each learning area to all the sinks as soon as it
+    is parsed. Return the dict of all the learning areas (keyed on title)
+    - workers - maximum number of files parsed at once (default os.cpu_count())
+    - processes - parse in worker processes, otherwise threads (no parallel parsing, but
+      nothing needs to be pickled)
+    """
+    loop = asyncio.get_running_loop()
+    queues = [ asyncio.Queue(maxsize=queueSize) for sink in sinks ]
+    consumers = [ asyncio.create_task(consume(sink, queue)) for sink, queue in zip(sinks, queues) ]
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    learningAreas = {}
+    executorClass = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    try:
+        with executorClass(max_workers=workers) as executor:
+            #-- only parse up to workers files ahead of the sinks
+            fileNames = list(fileNames)
+            pending = []
+            nextFile = 0
+            while nextFile < len(fileNames) or len(pending) > 0:
+                while nextFile < len(fileNames) and len(pending) < workers:
+                    pending.append(loop.run_in_executor(executor, parseRdfFile, fileNames[nextFile]))
+                    nextFile += 1
+
+                for title, learningArea in (await pending.pop(0)).items():
+                    learningAreas[title] = learningArea
+                    for queue, consumer in zip(queues, consumers):
+                        await put(queue, learningArea, consumer)
+
+        for queue, consumer in zip(queues, consumers):
+            await put(queue, None, consumer)
+        await asyncio.gather(*consumers)
+    finally:
+        for consumer in consumers:
+            consumer.cancel()
+
+    return learningAreas
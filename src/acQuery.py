@@ -0,0 +1,449 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acQuery.py
+
+Structured query API over the AC objects held by an australianCurriculum object.
+
+Rather than every consumer nesting loops over learningAreas -> subjects -> yearLevels
+-> strands -> subStrands -> contentDescriptions, acCurriculumIndex is updated as RDF
+files are added (and removed) and then supports
+
+    ac.find(learningArea="Mathematics", yearFrom=7, yearTo=8, nodeType="acContentDescription")
+    ac.explain(learningArea="Mathematics", yearFrom=7, yearTo=8, nodeType="acContentDescription")
+
+Design
+
+- every node is recorded once as an acIndexEntry (node + its place in the hierarchy),
+  keyed on its subjectId
+- a small number of composite indexes (dicts keyed on tuples of entry fields) map to
+  lists of entries
+- add(learningAreas) and remove(subjectIds) only touch the entries of those nodes and the
+  lists they're in. The lists are replaced rather than appended to, so replaced() can
+  share the untouched ones with a copy (e.g. acWatch swaps in an updated copy while the
+  original is being read). Entries are kept in hierarchy order (learning areas in the
+  order given to replaced), so find() yields the same order as an index built afresh
+- find() picks the index with the fewest candidate entries for the given filters,
+  applies the remaining filters lazily and yields the matching nodes
+- notation prefix queries use a sorted list of notations and bisect
+- year ranges are normalised to (min, max) integers when the AC objects are created
+  (setYearRanges), the year indexes hold each entry under every year of its range (there
+  are at most 13 years) so an overlap query only looks up the years it spans
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+import re
+import copy
+from bisect import bisect_left
+from itertools import product
+
+#-- the names of the fields that can be used to filter in find()
+FILTERS = [ "learningArea", "subject", "yearFrom", "yearTo", "strand", "subStrand",
+            "nodeType", "notationPrefix" ]
+
+#-- the composite indexes, each is a tuple of acIndexEntry fields used as the key
+#   - "year" is special, the entry is added under each year in its year range
+INDEXES = {
+    "type": ("nodeType",),
+    "learningArea+type": ("learningArea", "nodeType"),
+    "subject+type": ("learningArea", "subject", "nodeType"),
+    "strand+type": ("learningArea", "subject", "strand", "nodeType"),
+    "subStrand+type": ("learningArea", "subject", "strand", "subStrand", "nodeType"),
+    "year+type": ("year", "nodeType"),
+    "learningArea+year+type": ("learningArea", "year", "nodeType"),
+    "subject+year+type": ("learningArea", "subject", "year", "nodeType"),
+}
+
+#-- map from hierarchy class names to the acIndexEntry field holding the title
+CONTEXT_FIELDS = {
+    "acLearningArea": "learningArea",
+    "acSubject": "subject",
+    "acYearLevel": "yearLevel",
+    "acStrand": "strand",
+    "acSubStrand": "subStrand",
+}
+
+def yearRange(title) -> tuple:
+    """
+    Convert a year level title into a (min, max) tuple of integer years (Foundation is 0)
+    e.g. "Foundation Year" -> (0, 0), "Years 7 and 8" -> (7, 8), "Foundation to Year 2" -> (0, 2)
+
+    Return None if the title contains no years (e.g. "Options")
+    """
+    if title is None:
+        return None
+
+    title = str(title)
+    years = [int(year) for year in re.findall(r"\d+", title)]
+    if "Foundation" in title:
+        years.append(0)
+
+    if len(years) == 0:
+        return None
+
+    return (min(years), max(years))
+
+def setYearRanges(nodes) -> None:
+    """
+    Set the yearRange (min, max) of each node in nodes, (node, parents) tuples in hierarchy
+    order (see australianCurriculum.nodes), when the AC objects are created
+    - the union of the range of the node's nominalYearLevel and that of its year level
+      (e.g. a "Years 9 and 10" band whose nominalYearLevel is "Year 10" is (9, 10))
+    - None above the year levels, or if neither has any years
+    """
+    for node, parents in nodes:
+        ranges = [ yearRange(getattr(node, "nominalYearLevel", None)) ]
+        if type(node).__name__ == "acYearLevel":
+            ranges.append(yearRange(node.title))
+        else:
+            ranges.extend(ancestor.yearRange for ancestor in parents
+                          if type(ancestor).__name__ == "acYearLevel")
+
+        ranges = [ years for years in ranges if years is not None ]
+        node.yearRange = None
+        if len(ranges) > 0:
+            node.yearRange = (min(years[0] for years in ranges), max(years[1] for years in ranges))
+
+def hierarchyNodes(learningAreas):
+    """
+    Generator yielding (node, parents) for the learning areas and every AC object below
+    them, in hierarchy order (see australianCurriculum.nodes)
+    """
+    stack = [ (learningArea, ()) for learningArea in reversed(list(learningAreas)) ]
+
+    while stack:
+        node, parents = stack.pop()
+        yield node, parents
+
+        childParents = parents + (node,)
+        for child in reversed(node.children()):
+            stack.append((child, childParents))
+
+def subtreeNodes(learningAreas):
+    """
+    Generator yielding (node, parents) as hierarchyNodes, each node followed by the
+    achievement standard components it's linked to (e.g. via hasLevel)
+    """
+    for node, parents in hierarchyNodes(learningAreas):
+        yield node, parents
+        for component in getattr(node, "achievementStandardComponents", {}).values():
+            yield component, parents + (node,)
+
+@dataclass
+class acIndexEntry:
+    node : Any = None
+    nodeType : str = None # class name of the node e.g. acContentDescription
+    learningArea : str = None # titles of the node's place in the hierarchy
+    subject : str = None
+    yearLevel : str = None
+    strand : str = None
+    subStrand : str = None
+    notation : str = None
+    yearRange : tuple = None # (min, max) integer years, None if not within a year level
+
+class acCurriculumIndex:
+    """
+    Composite indexes over all the nodes of an australianCurriculum object
+    """
+
+    def __init__(self, ac=None):
+        #-- str(subjectId) -> acIndexEntry
+        self.entries = {}
+        self.indexes = { name: {} for name in INDEXES.keys() }
+        #-- sorted list of (notation, str(subjectId))
+        self.notations = []
+        self.nodeTypes = set()
+        self.years = set()
+
+        if ac is not None:
+            self.addEntries(self.createEntry(node, parents) for node, parents in ac.nodes())
+
+    def add(self, learningAreas) -> None:
+        """
+        Add the entries for learningAreas and all the AC objects below them, replacing
+        any existing entries for the same nodes
+        """
+        self.addEntries(self.createEntry(node, parents) for node, parents in hierarchyNodes(learningAreas))
+
+    def remove(self, subjectIds) -> None:
+        """
+        Remove the entries of the nodes with the given subjectIds
+        """
+        removed = {}
+        for subjectId in subjectIds:
+            entry = self.entries.pop(str(subjectId), None)
+            if entry is not None:
+                removed[id(entry)] = entry
+        if len(removed) == 0:
+            return
+
+        for name, fields in INDEXES.items():
+            index = self.indexes[name]
+            keys = set(key for entry in removed.values() for key in self.entryKeys(entry, fields))
+            for key in keys:
+                bucket = [ entry for entry in index.get(key, []) if id(entry) not in removed ]
+                if len(bucket) > 0:
+                    index[key] = bucket
+                else:
+                    index.pop(key, None)
+
+        self.notations = [ item for item in self.notations if item[1] in self.entries ]
+        self.nodeTypes = set(key[0] for key in self.indexes["type"].keys())
+        self.years = set(key[0] for key in self.indexes["year+type"].keys())
+
+    def replaced(self, removeSubjectIds, learningAreas, order=None) -> "acCurriculumIndex":
+        """
+        Return a new index with removeSubjectIds removed and learningAreas added, leaving
+        this one unchanged (it may be queried meanwhile). The entries and the lists of
+        entries that aren't affected are shared. order is the titles of all the learning
+        areas, in order, when the added ones don't go at the end
+        """
+        index = copy.copy(self)
+        index.entries = dict(self.entries)
+        index.indexes = { name: dict(buckets) for name, buckets in self.indexes.items() }
+        index.nodeTypes = set(self.nodeTypes)
+        index.years = set(self.years)
+
+        index.remove(removeSubjectIds)
+        added = index.addEntries(self.createEntry(node, parents) for node, parents in hierarchyNodes(learningAreas))
+        if order is not None:
+            index.reorder(order, added)
+
+        return index
+
+    def reorder(self, order, entries) -> None:
+        """
+        Put the entries, and the lists holding the given entries, back in hierarchy order
+        with the learning areas in the order of the titles in order
+        """
+        positions = { title: position for position, title in enumerate(order) }
+
+        def position(entry):
+            return positions.get(entry.learningArea, len(positions))
+
+        #-- sorted is stable, the entries of each learning area are already in hierarchy order
+        for name, fields in INDEXES.items():
+            index = self.indexes[name]
+            for key in set(key for entry in entries for key in self.entryKeys(entry, fields)):
+                index[key] = sorted(index[key], key=position)
+        self.entries = dict(sorted(self.entries.items(), key=lambda item: position(item[1])))
+
+    def createEntry(self, node, parents) -> acIndexEntry:
+        """
+        Create the acIndexEntry for node given the list of its parents (root first)
+        """
+        entry = acIndexEntry(node=node, nodeType=type(node).__name__)
+
+        for ancestor in list(parents) + [node]:
+            field = CONTEXT_FIELDS.get(type(ancestor).__name__)
+            if field is not None:
+                setattr(entry, field, str(ancestor.title))
+
+        if getattr(node, "abbreviation", None) is not None:
+            entry.notation = str(node.abbreviation)
+        #-- normalised when the node was created (and stored in binary snapshots)
+        if hasattr(node, "yearRange"):
+            entry.yearRange = node.yearRange
+        else:
+            entry.yearRange = yearRange(entry.yearLevel)
+
+        return entry
+
+    def entryKeys(self, entry : acIndexEntry, fields : tuple) -> list:
+        """
+        Return the keys entry is held under in the index with the given fields
+        """
+        if "year" not in fields:
+            return [ tuple(getattr(entry, field) for field in fields) ]
+        if entry.yearRange is None:
+            return []
+
+        return [ tuple(year if field == "year" else getattr(entry, field) for field in fields)
+                 for year in range(entry.yearRange[0], entry.yearRange[1] + 1) ]
+
+    def addEntries(self, entries) -> list:
+        """
+        Add the acIndexEntry objects in entries, each list of entries they're added to
+        is replaced (once) rather than appended to. Return the list of entries added
+        """
+        entries = { str(entry.node.subjectId): entry for entry in entries }
+        self.remove([ subjectId for subjectId in entries.keys() if subjectId in self.entries ])
+        self.entries.update(entries)
+
+        for name, fields in INDEXES.items():
+            additions = {}
+            for entry in entries.values():
+                for key in self.entryKeys(entry, fields):
+                    additions.setdefault(key, []).append(entry)
+            index = self.indexes[name]
+            for key, added in additions.items():
+                index[key] = index.get(key, []) + added
+
+        for entry in entries.values():
+            self.nodeTypes.add(entry.nodeType)
+            if entry.yearRange is not None:
+                self.years.update(range(entry.yearRange[0], entry.yearRange[1] + 1))
+
+        #-- merging two sorted runs
+        self.notations = sorted(self.notations + [ (entry.notation, subjectId)
+                                                   for subjectId, entry in entries.items()
+                                                   if entry.notation is not None ])
+
+        return list(entries.values())
+
+    def find(self, **filters):
+        """
+        Lazily yield the nodes that match all the given filters (see FILTERS)
+        """
+        for entry in self.findEntries(**filters):
+            yield entry.node
+
+    def findEntries(self, **filters):
+        """
+        Lazily yield the acIndexEntry objects matching all the given filters
+        """
+        filters = self.normaliseFilters(filters)
+        plan = self.plan(filters)
+
+        seen = set() if plan["dedupe"] else None
+        for entry in plan["candidates"]():
+            if seen is not None:
+                if id(entry) in seen:
+                    continue
+                seen.add(id(entry))
+            if self.matches(entry, filters):
+                yield entry
+
+    def explain(self, **filters) -> dict:
+        """
+        Return a dict describing how find() would satisfy the given filters
+        """
+        filters = self.normaliseFilters(filters)
+        plan = self.plan(filters)
+
+        return {
+            "index": plan["index"],
+            "keys": plan["keys"],
+            "candidates": plan["cost"],
+            "totalNodes": len(self.entries),
+            "filters": filters,
+        }
+
+    def normaliseFilters(self, filters : dict) -> dict:
+        """
+        Check for unknown filters, drop those that are None and convert nodeType
+        classes into class names
+        """
+        unknown = [name for name in filters.keys() if name not in FILTERS]
+        if len(unknown) > 0:
+            raise ValueError(f"Unknown filter(s) {unknown} - expected one of {FILTERS}")
+
+        filters = { name: value for name, value in filters.items() if value is not None }
+        if "nodeType" in filters and isinstance(filters["nodeType"], type):
+            filters["nodeType"] = filters["nodeType"].__name__
+
+        #-- a single ended year range is open at the other end
+        if "yearFrom" in filters or "yearTo" in filters:
+            filters.setdefault("yearFrom", min(self.years, default=0))
+            filters.setdefault("yearTo", max(self.years, default=0))
+
+        return filters
+
+    def plan(self, filters : dict) -> dict:
+        """
+        Choose the cheapest way to generate candidate entries for filters
+
+        Return a dict with the name of the index used, the number of keys looked up,
+        the number of candidate entries (cost) and a function returning the candidates
+        """
+        #-- default is a full scan
+        best = {
+            "index": "fullScan", "keys": 0, "cost": len(self.entries), "dedupe": False,
+            "candidates": lambda: iter(self.entries.values())
+        }
+
+        for name, fields in INDEXES.items():
+            keys = self.indexKeys(fields, filters)
+            if keys is None:
+                continue
+            index = self.indexes[name]
+            buckets = [index[key] for key in keys if key in index]
+            cost = sum(len(bucket) for bucket in buckets)
+            if cost < best["cost"]:
+                best = {
+                    "index": name, "keys": len(keys), "cost": cost,
+                    #-- entries within a year range appear under more than one year
+                    "dedupe": "year" in fields and len(keys) > 1,
+                    "candidates": lambda buckets=buckets: (entry for bucket in buckets for entry in bucket)
+                }
+
+        if "notationPrefix" in filters:
+            prefix = filters["notationPrefix"]
+            start = bisect_left(self.notations, (prefix,))
+            end = start
+            while end < len(self.notations) and self.notations[end][0].startswith(prefix):
+                end += 1
+            if end - start < best["cost"]:
+                best = {
+                    "index": "notation", "keys": 1, "cost": end - start, "dedupe": False,
+                    "candidates": lambda: (self.entries[subjectId] for _, subjectId in self.notations[start:end])
+                }
+
+        return best
+
+    def indexKeys(self, fields : tuple, filters : dict) -> list:
+        """
+        Return the list of keys to look up in an index with the given fields, or None
+        if the index can't be used for these filters
+        - a missing nodeType expands to all node types
+        - year expands to all years in the yearFrom/yearTo range
+        """
+        values = []
+        for field in fields:
+            if field == "year":
+                if "yearFrom" not in filters:
+                    return None
+                values.append(range(filters["yearFrom"], filters["yearTo"] + 1))
+            elif field == "nodeType":
+                values.append([filters["nodeType"]] if "nodeType" in filters else sorted(self.nodeTypes))
+            elif field in filters:
+                values.append([filters[field]])
+            else:
+                return None
+
+        return list(product(*values))
+
+    def matches(self, entry : acIndexEntry, filters : dict) -> bool:
+        """
+        Return true iff the entry satisfies all the filters
+        """
+        for name in ["learningArea", "subject", "strand", "subStrand", "nodeType"]:
+            if name in filters and getattr(entry, name) != filters[name]:
+                return False
+
+        if "yearFrom" in filters:
+            if entry.yearRange is None:
+                return False
+            if entry.yearRange[1] < filters["yearFrom"] or entry.yearRange[0] > filters["yearTo"]:
+                return False
+
+        if "notationPrefix" in filters:
+            if entry.notation is None or not entry.notation.startswith(filters["notationPrefix"]):
+                return False
+
+        return True
@@ -0,0 +1,212 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acSearchShards.py
+
+Prebuilt search index for a static site (e.g. the memex markdown), one JSON shard per
+learning area plus a manifest, so a browser only loads the shards it searches
+
+    writer = acSearchIndexWriter("memex/search")
+    shard = writer.newShard("Mathematics")
+    shard.add(contentDescription, "Mathematics/AC9M7N01.md")
+    writer.write(shard)
+    writer.close()                                  # writes manifest.json
+
+    searchShards("memex/search", "negative numbers", learningAreas=["Mathematics"])
+
+Files
+
+- manifest.json - the version, the tokenizer (regular expressions, so the browser splits
+  queries the same way), the BM25 parameters, docFields and for each shard its learning
+  area, file, subjects, year range and number of documents and tokens
+- <learning area>.json - pages (list of page paths, relative to the site), docs (a list
+  per document of the docFields values) and postings (token -> flat list of document
+  number, term frequency pairs)
+
+Design
+
+- documents are tokenised once at build time with acTextIndex.defaultTokenizer
+- each document points to the page it appears on by number, a page is stored once per shard
+- BM25 needs the document lengths (in docs), the number of documents and the document
+  frequencies (length of the postings) so all the statistics are per shard
+- searchShards is the reference implementation of the browser side
+"""
+
+import os
+import re
+import json
+from math import log
+
+from acTextIndex import defaultTokenizer, nodeText, K1, B
+
+VERSION = 1
+MANIFEST = "manifest.json"
+#-- the values stored for each document, in order
+DOC_FIELDS = [ "notation", "nodeType", "page", "length", "text" ]
+#-- how defaultTokenizer splits text, for the browser
+TOKENIZER = { "remove": r"<[^>]+>", "lowerCase": True, "token": r"[a-z0-9]+" }
+
+def shardFileName(learningArea : str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", str(learningArea)) + ".json"
+
+class acSearchShard:
+    """
+    The documents and postings of one learning area
+    """
+
+    def __init__(self, learningArea : str, tokenizer=None):
+        self.learningArea = str(learningArea)
+        self.tokenizer = tokenizer if tokenizer is not None else defaultTokenizer
+
+        self.pages = []
+        #-- page -> number
+        self.pageNumbers = {}
+        self.docs = []
+        #-- token -> [ docNumber, frequency, docNumber, frequency ... ]
+        self.postings = {}
+        self.subjects = []
+        self.yearRange = None
+
+    def add(self, node, page : str) -> None:
+        """
+        Add the text of the AC object node, found on page (path relative to the site)
+        """
+        pageNumber = self.pageNumbers.get(page)
+        if pageNumber is None:
+            pageNumber = self.pageNumbers[page] = len(self.pages)
+            self.pages.append(page)
+
+        text = nodeText(node)
+        tokens = self.tokenizer(text)
+        docNumber = len(self.docs)
+        self.docs.append([ str(getattr(node, "abbreviation", None) or ""), type(node).__name__,
+                           pageNumber, len(tokens), text ])
+
+        frequencies = {}
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + 1
+        for token, frequency in frequencies.items():
+            self.postings.setdefault(token, []).extend((docNumber, frequency))
+
+        years = getattr(node, "yearRange", None)
+        if years is not None:
+            self.yearRange = years if self.yearRange is None else (
+                min(self.yearRange[0], years[0]), max(self.yearRange[1], years[1]))
+
+    def addSubject(self, subject : str) -> None:
+        if str(subject) not in self.subjects:
+            self.subjects.append(str(subject))
+
+    def asDict(self) -> dict:
+        return {
+            "version": VERSION,
+            "learningArea": self.learningArea,
+            "pages": self.pages,
+            "docs": self.docs,
+            "totalLength": sum(doc[3] for doc in self.docs),
+            "postings": self.postings,
+        }
+
+class acSearchIndexWriter:
+    """
+    Write shards (see acSearchShard) to folder, and the manifest when closed
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.shards = []
+        os.makedirs(folder, exist_ok=True)
+
+    def newShard(self, learningArea : str, tokenizer=None) -> acSearchShard:
+        return acSearchShard(learningArea, tokenizer)
+
+    def write(self, shard : acSearchShard) -> dict:
+        """
+        Write the shard's file, return its manifest entry
+        """
+        fileName = shardFileName(shard.learningArea)
+        with open(os.path.join(self.folder, fileName), "w", encoding="utf-8") as file:
+            json.dump(shard.asDict(), file, ensure_ascii=False, separators=(",", ":"))
+
+        entry = {
+            "learningArea": shard.learningArea,
+            "file": fileName,
+            "subjects": shard.subjects,
+            "yearRange": None if shard.yearRange is None else list(shard.yearRange),
+            "docs": len(shard.docs),
+            "tokens": len(shard.postings),
+        }
+        self.shards.append(entry)
+        return entry
+
+    def close(self) -> None:
+        manifest = {
+            "version": VERSION,
+            "tokenizer": TOKENIZER,
+            "bm25": { "k1": K1, "b": B },
+            "docFields": DOC_FIELDS,
+            "shards": self.shards,
+        }
+        with open(os.path.join(self.folder, MANIFEST), "w", encoding="utf-8") as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=1)
+
+def searchShards(folder, query : str, k : int = 10, learningAreas=None) -> list:
+    """
+    Return the top k (score, learning area, doc dict, page) matching all the tokens of
+    query, loading only the shards of learningAreas (default all)
+    """
+    with open(os.path.join(folder, MANIFEST), encoding="utf-8") as file:
+        manifest = json.load(file)
+
+    tokens = defaultTokenizer(query)
+    results = []
+    for entry in manifest["shards"]:
+        if learningAreas is not None and entry["learningArea"] not in learningAreas:
+            continue
+        with open(os.path.join(folder, entry["file"]), encoding="utf-8") as file:
+            shard = json.load(file)
+
+        docs = shard["docs"]
+        if len(docs) == 0 or len(tokens) == 0:
+            continue
+        averageLength = shard["totalLength"] / len(docs)
+        if averageLength == 0:
+            continue
+
+        scores = None
+        for token in set(tokens):
+            postings = shard["postings"].get(token, [])
+            documentFrequency = len(postings) // 2
+            idf = log(1 + (len(docs) - documentFrequency + 0.5) / (documentFrequency + 0.5))
+            tokenScores = {}
+            for position in range(0, len(postings), 2):
+                docNumber, frequency = postings[position], postings[position + 1]
+                length = docs[docNumber][3]
+                tokenScores[docNumber] = idf * frequency * (K1 + 1) / (
+                    frequency + K1 * (1 - B + B * length / averageLength))
+
+            if scores is None:
+                scores = tokenScores
+            else:
+                scores = { docNumber: score + tokenScores[docNumber]
+                           for docNumber, score in scores.items() if docNumber in tokenScores }
+
+        for docNumber, score in scores.items():
+            doc = dict(zip(manifest["docFields"], docs[docNumber]))
+            results.append((score, entry["learningArea"], doc, shard["pages"][doc["page"]]))
+
+    results.sort(key=lambda result: -result[0])
+    return results[:k]
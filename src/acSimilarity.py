@@ -0,0 +1,257 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acSimilarity.py
+
+Identify "related" content descriptions across subjects (e.g. Mathematics content
+descriptions that cover similar ground to Technologies content descriptions)
+
+    related = relatedContentDescriptions(ac, k=5, cacheFolder="cache")
+    related["AC9M8A01"] -> [ ("AC9TDI8P04", 0.31), ... ]
+
+Design
+
+- each content description is a document made up of its title and its elaborations
+- documents are converted into a sparse (CSR, NumPy arrays) TF-IDF matrix with L2
+  normalised rows, the dense documents x terms matrix is never built
+  - terms appearing in only one document (or in most documents) are dropped as they
+    can't help identify related documents
+- cosine similarities are calculated a block of rows at a time: each non-zero of the
+  block is multiplied with the documents sharing its term (the transposed CSR matrix)
+  and the products summed with bincount. argpartition is used to get the top k for
+  each row, no per-pair Python loop
+- results are cached as JSON in cacheFolder, keyed by a hash of the content descriptions
+  and parameters, so repeated runs (memex generation etc.) don't recalculate
+"""
+
+from dataclasses import dataclass
+
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from acTextIndex import defaultTokenizer
+
+#-- number of rows of the similarity matrix calculated at once
+BLOCK_SIZE = 512
+#-- drop terms that appear in more than this proportion of documents
+MAX_DOCUMENT_FREQUENCY = 0.5
+
+def contentDescriptionDocuments(ac) -> list:
+    """
+    Return a list of (contentDescription, subjectTitle, text) for every content description
+    in the australianCurriculum object ac
+    """
+    documents = []
+    for entry in ac.index.findEntries(nodeType="acContentDescription"):
+        cd = entry.node
+        text = " ".join([str(cd.title)] + [str(elaboration.title) for elaboration in cd.elaborations.values()])
+        documents.append((cd, entry.subject, text))
+
+    return documents
+
+def curriculumHash(documents : list, k : int, crossSubjectOnly : bool) -> str:
+    """
+    Return a hash identifying the content descriptions (and parameters) used
+    """
+    digest = hashlib.sha1(f"{k} {crossSubjectOnly}".encode("utf-8"))
+    for cd, subject, text in sorted(documents, key=lambda document: str(document[0].abbreviation)):
+        digest.update(f"\n{cd.abbreviation}\t{subject}\t{text}".encode("utf-8"))
+
+    return digest.hexdigest()
+
+@dataclass
+class acCsrMatrix:
+    """
+    Compressed sparse row matrix, the non-zero values of row i are data[indptr[i]:indptr[i + 1]]
+    in columns indices[indptr[i]:indptr[i + 1]] (ascending)
+    """
+    indptr : np.ndarray = None
+    indices : np.ndarray = None
+    data : np.ndarray = None
+    shape : tuple = (0, 0)
+
+    def rowNumbers(self) -> np.ndarray:
+        """
+        Return the row number of each non-zero value
+        """
+        return np.repeat(np.arange(self.shape[0], dtype=np.int64), np.diff(self.indptr))
+
+    def rows(self, rows) -> "acCsrMatrix":
+        """
+        Return a new matrix of the given rows (a slice or array of row numbers)
+        """
+        rows = np.arange(self.shape[0], dtype=np.int64)[rows]
+        starts = self.indptr[rows]
+        counts = self.indptr[rows + 1] - starts
+        positions = spans(starts, counts)
+
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return acCsrMatrix(indptr, self.indices[positions], self.data[positions], (len(rows), self.shape[1]))
+
+    def transpose(self) -> "acCsrMatrix":
+        order = np.argsort(self.indices, kind="stable")
+        indptr = np.zeros(self.shape[1] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=self.shape[1]), out=indptr[1:])
+        return acCsrMatrix(indptr, self.rowNumbers()[order], self.data[order], (self.shape[1], self.shape[0]))
+
+    def timesTranspose(self, other : "acCsrMatrix", otherTransposed : "acCsrMatrix" = None) -> np.ndarray:
+        """
+        Return the dense (float32) product of this matrix and the transpose of other (e.g.
+        the cosine similarities of their rows). otherTransposed is other.transpose(), if
+        already calculated
+        """
+        if otherTransposed is None:
+            otherTransposed = other.transpose()
+        rowCount, columnCount = self.shape[0], other.shape[0]
+
+        #-- each non-zero (row, term) pairs with the rows of other that have the term
+        starts = otherTransposed.indptr[self.indices]
+        counts = otherTransposed.indptr[self.indices + 1] - starts
+        positions = spans(starts, counts)
+        flat = np.repeat(self.rowNumbers(), counts) * columnCount + otherTransposed.indices[positions]
+        weights = np.repeat(self.data, counts) * otherTransposed.data[positions]
+
+        product = np.bincount(flat, weights=weights, minlength=rowCount * columnCount)
+        return product.reshape(rowCount, columnCount).astype(np.float32)
+
+def spans(starts : np.ndarray, counts : np.ndarray) -> np.ndarray:
+    """
+    Return the concatenation of range(start, start + count) for each start and count
+    """
+    total = int(counts.sum())
+    offsets = np.repeat(np.cumsum(counts) - counts - starts, counts)
+    return np.arange(total, dtype=np.int64) - offsets
+
+def tfidfMatrix(texts : list, tokenizer=defaultTokenizer) -> acCsrMatrix:
+    """
+    Return a (documents x terms) float32 TF-IDF acCsrMatrix with L2 normalised rows
+    """
+    vocabulary = {}
+    documentIds = []
+    termIds = []
+    for documentId, text in enumerate(texts):
+        for token in tokenizer(text):
+            termIds.append(vocabulary.setdefault(token, len(vocabulary)))
+            documentIds.append(documentId)
+
+    documentCount = len(texts)
+    termCount = len(vocabulary)
+    if documentCount == 0 or termCount == 0:
+        return acCsrMatrix(np.zeros(documentCount + 1, dtype=np.int64), np.zeros(0, dtype=np.int64),
+                           np.zeros(0, dtype=np.float32), (documentCount, 0))
+
+    documentIds = np.asarray(documentIds, dtype=np.int64)
+    termIds = np.asarray(termIds, dtype=np.int64)
+
+    #-- the unique (document, term) pairs, sorted by document then term, and their counts
+    pairs, counts = np.unique(documentIds * termCount + termIds, return_counts=True)
+    pairDocuments, pairTerms = pairs // termCount, pairs % termCount
+
+    #-- drop the terms that can't help, renumbering the rest (in the same order)
+    documentFrequency = np.bincount(pairTerms, minlength=termCount)
+    keep = (documentFrequency > 1) & (documentFrequency <= max(2, MAX_DOCUMENT_FREQUENCY * documentCount))
+    newTermIds = np.cumsum(keep) - 1
+    documentFrequency = documentFrequency[keep]
+
+    kept = keep[pairTerms]
+    pairDocuments = pairDocuments[kept]
+    pairTerms = newTermIds[pairTerms[kept]]
+
+    idf = np.log((1 + documentCount) / (1 + documentFrequency)).astype(np.float32) + 1
+    data = np.log1p(counts[kept].astype(np.float32)) * idf[pairTerms]
+
+    norms = np.sqrt(np.bincount(pairDocuments, weights=data * data, minlength=documentCount))
+    norms[norms == 0] = 1
+    data = (data / norms[pairDocuments]).astype(np.float32)
+
+    indptr = np.zeros(documentCount + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pairDocuments, minlength=documentCount), out=indptr[1:])
+
+    return acCsrMatrix(indptr, pairTerms, data, (documentCount, int(keep.sum())))
+
+def topKSimilar(matrix : acCsrMatrix, groups : np.ndarray, k : int, crossSubjectOnly : bool) -> tuple:
+    """
+    Return (indexes, scores) arrays (documents x k) of the k most similar documents for
+    each document. If crossSubjectOnly, documents in the same group are excluded.
+    Entries with a score of 0 (or less) are not related, their index is -1.
+    """
+    documentCount = matrix.shape[0]
+    k = min(k, max(documentCount - 1, 0))
+    indexes = np.full((documentCount, k), -1, dtype=np.int64)
+    scores = np.zeros((documentCount, k), dtype=np.float32)
+    if k == 0:
+        return indexes, scores
+
+    transposed = matrix.transpose()
+    for start in range(0, documentCount, BLOCK_SIZE):
+        end = min(start + BLOCK_SIZE, documentCount)
+        similarity = matrix.rows(slice(start, end)).timesTranspose(matrix, transposed)
+
+        #-- exclude self and (optionally) the same subject
+        similarity[np.arange(end - start), np.arange(start, end)] = -np.inf
+        if crossSubjectOnly:
+            similarity[groups[start:end, None] == groups[None, :]] = -np.inf
+
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        topScores = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-topScores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        topScores = np.take_along_axis(topScores, order, axis=1)
+
+        related = topScores > 0
+        indexes[start:end] = np.where(related, top, -1)
+        scores[start:end] = np.where(related, topScores, 0)
+
+    return indexes, scores
+
+def relatedContentDescriptions(ac, k : int = 5, crossSubjectOnly : bool = True, cacheFolder : str = None) -> dict:
+    """
+    Return a dict keyed on content description notation, each value is a list of up to k
+    (notation, score) tuples of the most related content descriptions (best first)
+    """
+    documents = contentDescriptionDocuments(ac)
+    key = curriculumHash(documents, k, crossSubjectOnly)
+
+    cacheFile = None
+    if cacheFolder is not None:
+        cacheFile = os.path.join(cacheFolder, f"related-{key}.json")
+        if os.path.isfile(cacheFile):
+            with open(cacheFile) as f:
+                return { notation: [tuple(pair) for pair in pairs] for notation, pairs in json.load(f).items() }
+
+    matrix = tfidfMatrix([text for cd, subject, text in documents])
+
+    subjects = {}
+    groups = np.array([subjects.setdefault(subject, len(subjects)) for cd, subject, text in documents], dtype=np.int64)
+
+    indexes, scores = topKSimilar(matrix, groups, k, crossSubjectOnly)
+
+    notations = [str(cd.abbreviation) for cd, subject, text in documents]
+    related = {}
+    for row, notation in enumerate(notations):
+        related[notation] = [ (notations[index], round(float(score), 4))
+                              for index, score in zip(indexes[row], scores[row]) if index >= 0 ]
+
+    if cacheFile is not None:
+        os.makedirs(cacheFolder, exist_ok=True)
+        with open(cacheFile, "w") as f:
+            json.dump(related, f)
+
+    return related
@@ -0,0 +1,245 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acSnapshot.py
+
+Read-only snapshots of an australianCurriculum object that can be shared by any number of
+sessions/threads (e.g. streamlit sessions) without locks or copies, and a process wide
+registry of snapshots keyed by version
+
+    snapshot = getSnapshot("v9", lambda: australianCurriculum("MAT.rdf"))
+    snapshot = loadSnapshot([ "MAT.rdf", "TEC.rdf" ])    # version from the file names/mtimes
+    snapshot.learningAreas["Mathematics"] ...
+    snapshot.find(notationPrefix="AC9M8"), snapshot.search("algorithm")
+
+Design
+
+- freezeCurriculum(ac) freezes the AC objects in place (or a deep copy) - every object's
+  class is swapped for a frozen subclass (e.g. acContentDescription -> frozenAcContentDescription)
+  whose __setattr__/__delattr__ raise dataclasses.FrozenInstanceError, and every dict of
+  children becomes a read-only MappingProxyType. isinstance checks and attribute access
+  are unchanged, and the classes of the mutable objects are untouched
+- the snapshot keeps the query and text indexes (which are only read) but not the RDFLib
+  graph, anything lazily computed is computed before the snapshot is shared
+- the registry only locks while building a snapshot, getting an existing one doesn't
+- the frozen classes are module attributes (created on import for the AC classes) and
+  pickle their read-only dicts as dicts, so frozen objects can be sent to other processes
+"""
+
+import os
+import copy
+import threading
+from types import MappingProxyType
+from dataclasses import FrozenInstanceError
+
+from acLearningArea import acLearningArea
+from acSubject import acSubject
+from acYearLevel import acYearLevel
+from acAchievementStandard import acAchievementStandard
+from acAchievementStandardComponent import acAchievementStandardComponent
+from acStrand import acStrand
+from acSubStrand import acSubStrand
+from acContentDescription import acContentDescription
+from acElaboration import acElaboration
+from acQuery import hierarchyNodes
+
+#-- node attributes holding dicts of other AC objects
+DICT_FIELDS = [ "subjects", "yearLevels", "strands", "subStrands", "contentDescriptions",
+                "elaborations", "components", "achievementStandardComponents" ]
+
+#-- AC class -> frozen subclass
+frozenClasses = {}
+
+def frozenSetattr(self, name, value):
+    raise FrozenInstanceError(f"cannot assign to field '{name}' of a curriculum snapshot")
+
+def frozenDelattr(self, name):
+    raise FrozenInstanceError(f"cannot delete field '{name}' of a curriculum snapshot")
+
+def frozenGetstate(self) -> dict:
+    #-- MappingProxyType can't be pickled
+    return { name: dict(value) if isinstance(value, MappingProxyType) else value
+             for name, value in self.__dict__.items() }
+
+def frozenSetstate(self, state : dict) -> None:
+    for field in DICT_FIELDS:
+        if isinstance(state.get(field), dict):
+            state[field] = MappingProxyType(state[field])
+    self.__dict__.update(state)
+
+def frozenClass(cls) -> type:
+    """
+    Return the frozen subclass of the AC class cls, registered as an attribute of this
+    module (so it can be pickled)
+    """
+    frozen = frozenClasses.get(cls)
+    if frozen is None:
+        name = f"frozen{cls.__name__[0].upper()}{cls.__name__[1:]}"
+        frozen = type(name, (cls,), {
+            "__setattr__": frozenSetattr,
+            "__delattr__": frozenDelattr,
+            "__getstate__": frozenGetstate,
+            "__setstate__": frozenSetstate,
+            "__module__": __name__,
+            "__qualname__": name,
+        })
+        frozenClasses[cls] = frozen
+        globals()[name] = frozen
+
+    return frozen
+
+#-- created on import so they can be unpickled in a process that hasn't frozen anything
+for cls in [ acLearningArea, acSubject, acYearLevel, acAchievementStandard, acAchievementStandardComponent,
+             acStrand, acSubStrand, acContentDescription, acElaboration ]:
+    frozenClass(cls)
+
+def freezeNode(node) -> None:
+    for field in DICT_FIELDS:
+        value = node.__dict__.get(field)
+        if isinstance(value, dict):
+            node.__dict__[field] = MappingProxyType(value)
+    node.__class__ = frozenClass(type(node))
+
+class acCurriculumSnapshot:
+    """
+    Read-only view of an australianCurriculum object (see freezeCurriculum)
+    """
+
+    def __init__(self, ac, version=None):
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "learningAreas", MappingProxyType(ac.learningAreas))
+        object.__setattr__(self, "index", ac.index)
+        object.__setattr__(self, "textIndex", ac.textIndex)
+        object.__setattr__(self, "componentsById", MappingProxyType(dict(ac.achievementStandardComponents or {})))
+
+    def __setattr__(self, name, value):
+        frozenSetattr(self, name, value)
+
+    def __delattr__(self, name):
+        frozenDelattr(self, name)
+
+    def nodes(self):
+        """
+        Generator yielding (node, parents) for every AC object (see australianCurriculum.nodes)
+        """
+        return hierarchyNodes(self.learningAreas.values())
+
+    def find(self, **filters):
+        return self.index.find(**filters)
+
+    def explain(self, **filters) -> dict:
+        return self.index.explain(**filters)
+
+    def search(self, query : str, k : int = 10, nodeType = None) -> list:
+        return self.textIndex.search(query, k, nodeType)
+
+    def contentDescriptionsFor(self, component) -> list:
+        if not hasattr(component, "contentDescriptions"):
+            component = self.componentsById.get(component)
+        if component is None:
+            return []
+        return list(component.contentDescriptions.values())
+
+def freezeCurriculum(ac, version=None, copyFirst : bool = False) -> acCurriculumSnapshot:
+    """
+    Return a read-only acCurriculumSnapshot of the australianCurriculum object ac.
+    The AC objects are frozen in place (ac shouldn't be used to add more files) unless
+    copyFirst, in which case a deep copy is frozen and ac is unchanged
+    """
+    if copyFirst:
+        #-- the graph isn't part of the snapshot, don't copy it
+        original = ac
+        graph, graphs = original.graph, original.graphs
+        original.graph, original.graphs = None, {}
+        try:
+            ac = copy.deepcopy(original)
+        finally:
+            original.graph, original.graphs = graph, graphs
+
+    #-- the components linked only from content descriptions aren't yielded by nodes()
+    nodes = [ node for learningArea in ac.learningAreas.values()
+              for node, parents in ac.subtreeNodes(learningArea) ]
+    nodes.extend((ac.achievementStandardComponents or {}).values())
+    for node in nodes:
+        if type(node) not in frozenClasses.values():
+            freezeNode(node)
+
+    #-- compute anything lazily calculated by the indexes
+    ac.textIndex.expandPrefix("")
+
+    return acCurriculumSnapshot(ac, version)
+
+#-- version -> acCurriculumSnapshot
+registry = {}
+registryLock = threading.Lock()
+#-- version -> lock held while that version is built
+buildLocks = {}
+
+def getSnapshot(version, loader=None) -> acCurriculumSnapshot:
+    """
+    Return the snapshot registered for version. If there isn't one and loader is given,
+    loader() (returning an australianCurriculum object) is called once (even if many threads
+    ask at the same time), frozen and registered. Return None if there's no snapshot or loader
+    """
+    snapshot = registry.get(version)
+    if snapshot is not None or loader is None:
+        return snapshot
+
+    with registryLock:
+        buildLock = buildLocks.setdefault(version, threading.Lock())
+
+    with buildLock:
+        snapshot = registry.get(version)
+        if snapshot is None:
+            snapshot = freezeCurriculum(loader(), version)
+            registerSnapshot(version, snapshot)
+
+    return snapshot
+
+def registerSnapshot(version, snapshot : acCurriculumSnapshot) -> None:
+    with registryLock:
+        registry[version] = snapshot
+
+def releaseSnapshot(version) -> None:
+    """
+    Remove version from the registry (sessions already using it keep their reference)
+    """
+    with registryLock:
+        registry.pop(version, None)
+        buildLocks.pop(version, None)
+
+def filesVersion(fileNames) -> tuple:
+    """
+    Return a version key for a list of RDF files - their absolute paths and modification times
+    """
+    return tuple((os.path.abspath(fileName), os.path.getmtime(fileName)) for fileName in fileNames)
+
+def loadSnapshot(fileNames, **options) -> acCurriculumSnapshot:
+    """
+    Return the (shared) snapshot of the given RDF files, loading them if necessary.
+    options are passed to australianCurriculum() e.g. store="acHierarchy"
+    """
+    def loader():
+        from australianCurriculum import australianCurriculum
+
+        ac = australianCurriculum(**options)
+        for fileName in fileNames:
+            ac.addRdfFile(fileName)
+        ac.graph = None
+        ac.graphs = {}
+        return ac
+
+    return getSnapshot(filesVersion(fileNames), loader)
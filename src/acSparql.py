@@ -0,0 +1,271 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acSparql.py
+
+Declarative (SPARQL) alternative to the hand-written triple lookups australianCurriculum
+uses to extract the learning area -> ... -> elaboration hierarchy from the RDFLib graph.
+
+    learningAreas = sparqlLearningAreas(ac)
+
+Design
+
+- a single prepared query (prepareQuery, parsed once per process) is run once for
+  each predicate of interest (PREDICATES) with the predicate bound via initBindings
+  - this proved ~2.5 times faster with RDFLib than one query with an OPTIONAL per predicate
+- the results are grouped in bulk by statementLabel, by parent and by hasLevel,
+  rather than querying the graph once per node
+- the grouped results are memoised per graph and graph version (australianCurriculum.graphVersion
+  increases each time an RDF file is parsed), held weakly so they go with the graph
+- the AC objects are then built from the grouped results, the same structure as
+  australianCurriculum.parseLearningAreas
+
+See datasette/benchmarkSparql.py for a comparison with the Python traversal
+"""
+
+import weakref
+
+from rdflib import URIRef
+from rdflib.plugins.sparql import prepareQuery
+
+from acLearningArea import acLearningArea
+from acYearLevel import acYearLevel
+from acSubject import acSubject
+from acAchievementStandard import acAchievementStandard
+from acAchievementStandardComponent import acAchievementStandardComponent
+from acStrand import acStrand
+from acSubStrand import acSubStrand
+from acContentDescription import acContentDescription
+from acElaboration import acElaboration
+from acQuery import setYearRanges
+from acTags import tagSet, TAG_PREDICATES
+
+PREDICATE_QUERY = prepareQuery("""
+    SELECT ?node ?value
+    WHERE {
+        ?node ?predicate ?value .
+    }""")
+
+#-- the keys used for node info (same as australianCurriculum.extractNodeInfo) and
+#   the matching predicates
+PREDICATES = {
+    'statementLabel': URIRef("http://purl.org/ASN/schema/core/statementLabel"),
+    'title': URIRef("http://purl.org/dc/terms/title"),
+    'statementNotation': URIRef("http://purl.org/ASN/schema/core/statementNotation"),
+    'description': URIRef("http://purl.org/dc/terms/description"),
+    'modified': URIRef("http://purl.org/dc/terms/modified"),
+    'nominalYearLevel': URIRef("https://www.esa.edu.au/nominalYearLevel"),
+}
+IS_CHILD_OF = URIRef("http://purl.org/gem/qualifiers/isChildOf")
+HAS_LEVEL = URIRef("http://purl.org/ASN/schema/core/hasLevel")
+
+#-- graph -> (weakref to the graph, graphVersion, results of extractNodes), entries go
+#   when the graph is garbage collected. Graphs compare equal by identifier, so the weakref
+#   checks the entry is for this graph object
+memo = weakref.WeakKeyDictionary()
+
+class acSparqlNodes:
+    """
+    The grouped results of running PREDICATE_QUERY for each predicate
+    """
+
+    def __init__(self):
+        #-- node -> dict of info (same keys as australianCurriculum.extractNodeInfo)
+        self.info = {}
+        #-- statementLabel -> list of nodes
+        self.byLabel = {}
+        #-- parent node -> list of child nodes
+        self.children = {}
+        #-- node -> list of hasLevel objects
+        self.levels = {}
+        #-- node -> list of the GC/CCP elements it refers to (see acTags.py)
+        self.tagElements = {}
+
+    def tags(self, node) -> frozenset:
+        return tagSet(self.tagElements.get(node, []))
+
+    def childrenWithLabel(self, parent, label=None) -> list:
+        """
+        Return the children of parent, optionally only those with statementLabel == label
+        """
+        return [ child for child in self.children.get(parent, [])
+                 if label is None or str(self.info[child]['statementLabel']) == label ]
+
+def extractNodes(graph, version=None) -> acSparqlNodes:
+    """
+    Run the prepared queries against graph and group the results. Results are memoised
+    for the graph and version (pass None to always re-run)
+    """
+    if version is not None:
+        cached = memo.get(graph)
+        if cached is not None and cached[0]() is graph and cached[1] == version:
+            return cached[2]
+
+    nodes = acSparqlNodes()
+
+    #-- only nodes with a statementLabel are AC nodes
+    for node, label in predicateValues(graph, PREDICATES['statementLabel']):
+        if node not in nodes.info:
+            nodes.info[node] = { key: None for key in PREDICATES.keys() }
+            nodes.info[node]['statementLabel'] = label
+            nodes.byLabel.setdefault(str(label), []).append(node)
+
+    for key, predicate in PREDICATES.items():
+        if key == 'statementLabel':
+            continue
+        for node, value in predicateValues(graph, predicate):
+            info = nodes.info.get(node)
+            #-- first value wins
+            if info is not None and info[key] is None:
+                info[key] = value
+
+    for node, parent in predicateValues(graph, IS_CHILD_OF):
+        if node in nodes.info:
+            nodes.children.setdefault(parent, []).append(node)
+
+    for node, level in predicateValues(graph, HAS_LEVEL):
+        nodes.levels.setdefault(node, []).append(level)
+
+    for predicate in TAG_PREDICATES:
+        for node, element in predicateValues(graph, URIRef(predicate)):
+            nodes.tagElements.setdefault(node, []).append(element)
+
+    if version is not None:
+        memo[graph] = (weakref.ref(graph), version, nodes)
+
+    return nodes
+
+def predicateValues(graph, predicate) -> list:
+    """
+    Return a list of (node, value) for all triples with the given predicate
+    """
+    return [ (row.node, row.value) for row in graph.query(PREDICATE_QUERY, initBindings={ "predicate": predicate }) ]
+
+def sparqlLearningAreas(ac) -> dict:
+    """
+    Return a dict of acLearningArea objects (keyed on title) built from the graph of the
+    australianCurriculum object ac using the prepared SPARQL queries
+    """
+    nodes = extractNodes(ac.graph, ac.graphVersion)
+    info = nodes.info
+
+    learningAreas = {}
+    #-- acAchievementStandardComponent objects keyed on node, shared with the content descriptions
+    components = {}
+    for learningAreaNode in nodes.byLabel.get("Learning Area", []):
+        laInfo = info[learningAreaNode]
+        learningArea = acLearningArea(
+            learningAreaNode, laInfo['title'], laInfo['modified'], laInfo['statementNotation'])
+        learningAreas[str(laInfo['title'])] = learningArea
+
+        for subjectNode in nodes.childrenWithLabel(learningAreaNode, "Subject"):
+            sInfo = info[subjectNode]
+            subject = acSubject(
+                subjectNode, sInfo['title'], sInfo['statementNotation'], sInfo['modified'], learningArea)
+            learningArea.subjects[str(sInfo['title'])] = subject
+
+            for yearLevelNode in nodes.childrenWithLabel(subjectNode):
+                yInfo = info[yearLevelNode]
+                yearLevel = acYearLevel(
+                    yearLevelNode, yInfo['title'], yInfo['statementNotation'], yInfo['modified'],
+                    yInfo['description'], subject)
+                subject.yearLevels[yInfo['title']] = yearLevel
+
+                buildAchievementStandards(nodes, yearLevel, components)
+                buildStrands(nodes, yearLevel, components)
+
+    if len(learningAreas) == 0:
+        raise ValueError("No learning areas found")
+
+    setYearRanges(ac.nodes(learningAreas.values()))
+
+    return learningAreas
+
+def buildAchievementStandards(nodes : acSparqlNodes, yearLevel : acYearLevel, components : dict) -> None:
+    info = nodes.info
+    for asNode in nodes.childrenWithLabel(yearLevel.subjectId, "Achievement Standard"):
+        asInfo = info[asNode]
+        achievementStandard = acAchievementStandard(
+            asNode, asInfo['title'], asInfo['statementNotation'], asInfo['modified'], asInfo['nominalYearLevel'])
+        yearLevel.achievementStandard = achievementStandard
+
+        for componentNode in nodes.childrenWithLabel(asNode, "Achievement Standard Component"):
+            cInfo = info[componentNode]
+            component = acAchievementStandardComponent(
+                componentNode, cInfo['title'], cInfo['statementNotation'], cInfo['modified'], cInfo['nominalYearLevel'])
+            achievementStandard.components[str(cInfo['statementNotation'])] = component
+            components[componentNode] = component
+
+def buildStrands(nodes : acSparqlNodes, yearLevel : acYearLevel, components : dict) -> None:
+    info = nodes.info
+    for strandNode in nodes.childrenWithLabel(yearLevel.subjectId, "Strand"):
+        sInfo = info[strandNode]
+        strand = acStrand(
+            strandNode, sInfo['title'], sInfo['statementNotation'], sInfo['modified'],
+            sInfo['nominalYearLevel'], yearLevel)
+        yearLevel.strands[str(sInfo['title'])] = strand
+
+        subStrandNodes = nodes.childrenWithLabel(strandNode, "Sub-Strand")
+        if len(subStrandNodes) == 0:
+            buildContentDescriptions(nodes, strand, components)
+            continue
+
+        for subStrandNode in subStrandNodes:
+            ssInfo = info[subStrandNode]
+            subStrand = acSubStrand(
+                subStrandNode, ssInfo['title'], ssInfo['statementNotation'], str(ssInfo['modified']),
+                ssInfo['nominalYearLevel'], strand)
+            strand.subStrands[str(ssInfo['title'])] = subStrand
+
+            buildContentDescriptions(nodes, subStrand, components)
+
+def buildContentDescriptions(nodes : acSparqlNodes, strand, components : dict) -> None:
+    """
+    strand is either an acStrand or acSubStrand object
+    """
+    info = nodes.info
+    for cdNode in nodes.childrenWithLabel(strand.subjectId, "Content Description"):
+        cdInfo = info[cdNode]
+        contentDescription = acContentDescription(
+            cdNode, cdInfo['title'], cdInfo['statementNotation'], str(cdInfo['modified']),
+            cdInfo['nominalYearLevel'], strand)
+        strand.contentDescriptions[str(cdInfo['statementNotation'])] = contentDescription
+
+        for elaborationNode in nodes.childrenWithLabel(cdNode, "Elaboration"):
+            eInfo = info[elaborationNode]
+            elaboration = acElaboration(
+                elaborationNode, eInfo['title'], eInfo['statementNotation'], str(eInfo['modified']),
+                eInfo['nominalYearLevel'])
+            elaboration.tags = nodes.tags(elaborationNode)
+            contentDescription.elaborations[str(eInfo['statementNotation'])] = elaboration
+
+        #-- as australianCurriculum.parseContentDescriptionExtras, including the elaborations' tags
+        contentDescription.tags = nodes.tags(cdNode).union(
+            *(elaboration.tags for elaboration in contentDescription.elaborations.values()))
+
+        for componentNode in nodes.levels.get(cdNode, []):
+            component = components.get(componentNode)
+            if component is None:
+                cInfo = info.get(componentNode)
+                if cInfo is None or str(cInfo['statementLabel']) != "Achievement Standard Component":
+                    continue
+                component = acAchievementStandardComponent(
+                    componentNode, cInfo['title'], cInfo['statementNotation'], str(cInfo['modified']),
+                    cInfo['nominalYearLevel'])
+                components[componentNode] = component
+
+            contentDescription.achievementStandardComponents[str(component.abbreviation)] = component
+            component.contentDescriptions[str(contentDescription.abbreviation)] = contentDescription
@@ -0,0 +1,213 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acStats.py
+
+Instrumentation of the loading (addRdfFile) of an australianCurriculum object
+
+    ac = australianCurriculum(instrument=True)   # or ac.enableStats(memory=True, log=True)
+    ac.addRdfFile("MAT.rdf")
+    pprint(ac.stats())
+    ac.disableStats()
+
+Reports
+- per phase (PHASES) - number of calls, total (inclusive) wall time and, optionally,
+  peak memory allocated during the phase (tracemalloc, bytes above the memory in use
+  when the phase started)
+- the number of lookups made on the RDFLib graph, by method (lookups made internally
+  by RDFLib e.g. value() calling objects() are not counted)
+- the number of AC objects, by type
+- optionally, a structured (JSON) log message (logger "australianCurriculum.stats")
+  after each file is added
+
+Design
+
+- nothing is changed unless instrumentation is enabled, the phases are then wrapped at
+  the instance level (the class methods are untouched) so there's no cost when disabled
+- graph lookups are counted by wrapping the methods of the graph instance
+- enabling again changes the memory/log options of the existing statistics, disabling
+  removes the wrappers and stops tracemalloc (if it was started for the statistics)
+"""
+
+import time
+import weakref
+import json
+import logging
+import tracemalloc
+from functools import wraps
+
+#-- the australianCurriculum methods timed
+PHASES = [ "addRdfFile", "generateGraphObject", "getRoot", "parseGraph", "buildLevelIndex",
+           "parseLearningAreas", "parseLearningAreasSubjects", "parseYearLevel",
+           "parseYearLevelAchievementStandards", "parseYearLevelStrands",
+           "parseContentDescriptionExtras", "extractNodeInfo", "buildIndexes" ]
+
+#-- phases called too often to track memory
+NO_MEMORY_PHASES = [ "extractNodeInfo" ]
+
+#-- the RDFLib graph methods counted as lookups
+LOOKUPS = [ "value", "subjects", "objects", "predicates", "predicate_objects",
+            "subject_objects", "subject_predicates", "triples", "query" ]
+
+logger = logging.getLogger("australianCurriculum.stats")
+
+class acLoadStats:
+    """
+    Statistics gathered while loading an australianCurriculum object
+    """
+
+    def __init__(self, memory : bool = False, log : bool = False):
+        self.memory = False
+        self.log = False
+        #-- True if tracemalloc was started for these statistics
+        self.startedTracing = False
+
+        #-- phase name -> { "calls", "seconds", "peakMemory" }
+        self.phases = {}
+        #-- graph method -> number of calls
+        self.lookups = {}
+        #-- stack of [ memory at start, running peak memory ] for the phases in progress
+        self.active = []
+        #-- > 0 while inside a graph lookup
+        self.lookupDepth = 0
+        #-- weak references to the graphs whose lookups are wrapped
+        self.instrumentedGraphs = []
+
+        self.configure(memory, log)
+
+    def configure(self, memory : bool = False, log : bool = False) -> None:
+        """
+        Set whether peak memory is tracked (starting tracemalloc if needed) and whether
+        the statistics are logged, for subsequent phases
+        """
+        self.memory = memory
+        self.log = log
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.startedTracing = True
+
+    def instrument(self, ac) -> None:
+        """
+        Wrap the PHASES of the australianCurriculum object ac (and its graph, if any)
+        """
+        for name in PHASES:
+            setattr(ac, name, self.wrapPhase(name, getattr(ac, name)))
+
+        if ac.graph is not None:
+            self.instrumentGraph(ac.graph)
+
+    def uninstrument(self, ac) -> None:
+        """
+        Remove the wrappers added by instrument (and instrumentGraph), stop tracemalloc
+        if it was started for these statistics
+        """
+        for name in PHASES:
+            ac.__dict__.pop(name, None)
+        for reference in self.instrumentedGraphs:
+            graph = reference()
+            if graph is not None:
+                for name in LOOKUPS:
+                    graph.__dict__.pop(name, None)
+        self.instrumentedGraphs = []
+
+        if self.startedTracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.startedTracing = False
+
+    def instrumentGraph(self, graph) -> None:
+        if any(reference() is graph for reference in self.instrumentedGraphs):
+            return
+        for name in LOOKUPS:
+            setattr(graph, name, self.wrapLookup(name, getattr(graph, name)))
+        self.instrumentedGraphs.append(weakref.ref(graph))
+
+    def wrapLookup(self, name : str, method):
+        lookups = self.lookups
+
+        @wraps(method)
+        def counted(*args, **kwargs):
+            if self.lookupDepth > 0:
+                return method(*args, **kwargs)
+            lookups[name] = lookups.get(name, 0) + 1
+            self.lookupDepth += 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.lookupDepth -= 1
+
+        return counted
+
+    def wrapPhase(self, name : str, method):
+        @wraps(method)
+        def timed(*args, **kwargs):
+            #-- memory may be enabled (or tracemalloc stopped) between calls
+            trackMemory = self.memory and name not in NO_MEMORY_PHASES and tracemalloc.is_tracing()
+            if trackMemory:
+                self.enterMemory()
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                phase = self.phases.setdefault(name, { "calls": 0, "seconds": 0.0, "peakMemory": None })
+                phase["calls"] += 1
+                phase["seconds"] += seconds
+                if trackMemory:
+                    peak = self.exitMemory()
+                    phase["peakMemory"] = max(peak, phase["peakMemory"] or 0)
+
+        return timed
+
+    def enterMemory(self) -> None:
+        #-- fold the peak so far into the enclosing phase before resetting it
+        current, peak = tracemalloc.get_traced_memory()
+        if len(self.active) > 0:
+            self.active[-1][1] = max(self.active[-1][1], peak)
+        tracemalloc.reset_peak()
+        self.active.append([current, current])
+
+    def exitMemory(self) -> int:
+        """
+        Return the peak memory (bytes) allocated during the phase just finished, above
+        the memory in use when it started
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        start, runningPeak = self.active.pop()
+        peak = max(peak, runningPeak)
+        if len(self.active) > 0:
+            self.active[-1][1] = max(self.active[-1][1], peak)
+
+        return peak - start
+
+    def asDict(self, ac) -> dict:
+        """
+        Return the statistics as a dict (suitable for JSON)
+        """
+        nodes = {}
+        for node, parents in ac.nodes():
+            nodeType = type(node).__name__
+            nodes[nodeType] = nodes.get(nodeType, 0) + 1
+
+        return {
+            "phases": { name: dict(phase) for name, phase in self.phases.items() },
+            "graphLookups": dict(self.lookups, total=sum(self.lookups.values())),
+            "nodes": nodes,
+            "triples": 0 if ac.graph is None else len(ac.graph),
+        }
+
+    def logStats(self, ac, fileName) -> None:
+        if self.log:
+            logger.info(json.dumps({ "event": "addRdfFile", "file": str(fileName), **self.asDict(ac) }))
@@ -0,0 +1,315 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acStore.py
+
+A lean RDFLib store tuned to the way australianCurriculum uses the graph
+
+    graph = Graph(store=acHierarchyStore())
+    graph = Graph(store="acHierarchy")          # registered as an RDFLib store plugin
+    ac = australianCurriculum(store="acHierarchy")
+
+The parse path only looks triples up by subject (extractNodeInfo, the walker) and finds
+the children of a node via isChildOf (or its levels via hasLevel). RDFLib's default
+Memory store keeps three generic indexes (spo, pos, osp) plus context information for
+every triple. acHierarchyStore keeps
+
+- terms - every RDF term is stored once and replaced by an integer id
+- properties - subject id -> { predicate id -> object id or list of object ids }
+- reverse - for REVERSE_PREDICATES only, predicate id -> { object id -> list of subject ids }
+
+Any other lookup with the subject unbound (e.g. subject_objects(predicate)) is answered
+by scanning properties - correct but slower than the Memory store.
+
+It isn't context or formula aware (a single graph), and like a dict it mustn't be
+modified while the results of triples() are being iterated.
+
+acUnionStore is a read-only store presenting a list of graphs (e.g. the per-file
+partitions of australianCurriculum) as a single graph, a triple in more than one graph
+is returned once. Its length is counted once per partition (each partition's triples
+that aren't in an earlier one) and reused until the partitions before it change.
+"""
+
+import weakref
+
+from rdflib import URIRef
+from rdflib import plugin
+from rdflib.store import Store
+from rdflib.graph import ModificationException
+from rdflib.plugins.stores.memory import Memory
+
+#-- the predicates indexed object -> subjects
+REVERSE_PREDICATES = [
+    URIRef("http://purl.org/gem/qualifiers/isChildOf"),
+    URIRef("http://purl.org/ASN/schema/core/hasLevel"),
+    URIRef("http://purl.org/ASN/schema/core/isLevelOf"),
+    URIRef("http://purl.org/ASN/schema/core/statementLabel"),
+    URIRef("http://purl.org/ASN/schema/core/statementNotation"),
+]
+
+class acHierarchyStore(Store):
+    """
+    RDFLib store with integer encoded terms, a subject -> properties table and
+    reverse adjacency lists for REVERSE_PREDICATES
+    """
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(self, configuration=None, identifier=None):
+        super().__init__(configuration)
+        self.identifier = identifier
+
+        #-- id -> term and term -> id
+        self.terms = []
+        self.termIds = {}
+        #-- subject id -> { predicate id -> object id | [ object id, ... ] }
+        self.properties = {}
+        #-- predicate id -> { object id -> [ subject id, ... ] }
+        self.reverse = { self.encode(predicate): {} for predicate in REVERSE_PREDICATES }
+        self.count = 0
+
+        self.prefixes = {}
+        self.namespaceUris = {}
+
+    def encode(self, term) -> int:
+        """
+        Return the id for term, adding it if necessary
+        """
+        id = self.termIds.get(term)
+        if id is None:
+            id = len(self.terms)
+            self.terms.append(term)
+            self.termIds[term] = id
+        return id
+
+    def add(self, triple, context, quoted=False) -> None:
+        subject, predicate, object = triple
+        sId = self.encode(subject)
+        pId = self.encode(predicate)
+        oId = self.encode(object)
+
+        predicates = self.properties.get(sId)
+        if predicates is None:
+            predicates = self.properties[sId] = {}
+
+        #-- most subjects have a single object for a predicate, only use a list when needed
+        objects = predicates.get(pId)
+        if objects is None:
+            predicates[pId] = oId
+        elif type(objects) is list:
+            if oId in objects:
+                return
+            objects.append(oId)
+        elif objects == oId:
+            return
+        else:
+            predicates[pId] = [ objects, oId ]
+
+        reverse = self.reverse.get(pId)
+        if reverse is not None:
+            reverse.setdefault(oId, []).append(sId)
+
+        self.count += 1
+        Store.add(self, triple, context, quoted)
+
+    def remove(self, triple_pattern, context=None) -> None:
+        for (subject, predicate, object), contexts in list(self.triples(triple_pattern)):
+            sId = self.termIds[subject]
+            pId = self.termIds[predicate]
+            oId = self.termIds[object]
+
+            predicates = self.properties[sId]
+            objects = predicates[pId]
+            if type(objects) is list and len(objects) > 1:
+                objects.remove(oId)
+            else:
+                del predicates[pId]
+                if len(predicates) == 0:
+                    del self.properties[sId]
+
+            reverse = self.reverse.get(pId)
+            if reverse is not None:
+                reverse[oId].remove(sId)
+
+            self.count -= 1
+
+    def objectIds(self, predicates : dict, pId : int):
+        objects = predicates.get(pId)
+        if objects is None:
+            return ()
+        if type(objects) is list:
+            return objects
+        return (objects,)
+
+    def triples(self, triple_pattern, context=None):
+        """
+        Generator of ((subject, predicate, object), contexts) matching triple_pattern
+        """
+        subject, predicate, object = triple_pattern
+        terms = self.terms
+        termIds = self.termIds
+        noContexts = iter(())
+
+        #-- a bound term that isn't in the store can't match
+        for term in triple_pattern:
+            if term is not None and term not in termIds:
+                return
+        pId = None if predicate is None else termIds[predicate]
+        oId = None if object is None else termIds[object]
+
+        if subject is not None:
+            predicates = self.properties.get(termIds[subject])
+            if predicates is None:
+                return
+            pIds = predicates.keys() if pId is None else [ pId ]
+            for p in pIds:
+                for o in self.objectIds(predicates, p):
+                    if oId is None or o == oId:
+                        yield (subject, terms[p], terms[o]), noContexts
+            return
+
+        reverse = self.reverse.get(pId)
+        if reverse is not None and oId is not None:
+            for s in reverse.get(oId, ()):
+                yield (terms[s], predicate, object), noContexts
+            return
+
+        #-- scan
+        for s, predicates in self.properties.items():
+            pIds = predicates.keys() if pId is None else [ pId ]
+            for p in pIds:
+                for o in self.objectIds(predicates, p):
+                    if oId is None or o == oId:
+                        yield (terms[s], terms[p], terms[o]), noContexts
+
+    def __len__(self, context=None) -> int:
+        return self.count
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def bind(self, prefix, namespace, override=True) -> None:
+        #-- same behaviour as RDFLib's Memory store
+        boundNamespace = self.namespaceUris.get(prefix)
+        boundPrefix = self.prefixes.get(namespace)
+        if boundPrefix is None:
+            boundPrefix = self.prefixes.get(boundNamespace)
+
+        if override:
+            if boundPrefix is not None:
+                del self.namespaceUris[boundPrefix]
+            if boundNamespace is not None:
+                del self.prefixes[boundNamespace]
+            self.prefixes[namespace] = prefix
+            self.namespaceUris[prefix] = namespace
+        else:
+            self.prefixes[namespace if boundNamespace is None else boundNamespace] = \
+                prefix if boundPrefix is None else boundPrefix
+            self.namespaceUris[prefix if boundPrefix is None else boundPrefix] = \
+                namespace if boundNamespace is None else boundNamespace
+
+    def namespace(self, prefix):
+        return self.namespaceUris.get(prefix)
+
+    def prefix(self, namespace):
+        return self.prefixes.get(namespace)
+
+    def namespaces(self):
+        for prefix, namespace in list(self.namespaceUris.items()):
+            yield prefix, namespace
+
+class acUnionStore(Store):
+    """
+    Read-only RDFLib store over the union of a list of graphs. partitions is replaced
+    (not modified) to change the graphs, so a query sees either the old or new list
+    """
+    context_aware = False
+    formula_aware = False
+    transaction_aware = False
+    graph_aware = False
+
+    def __init__(self, partitions=None, identifier=None):
+        super().__init__()
+        self.identifier = identifier
+        self.partitions = list(partitions or [])
+        #-- namespace bindings are kept separately from the partitions
+        self.namespaceStore = Memory()
+        #-- (weakref to the graph, its length, number of its triples not in an earlier
+        #   partition) for the partitions last counted by __len__
+        self.counted = []
+
+    def add(self, triple, context, quoted=False) -> None:
+        raise ModificationException()
+
+    def remove(self, triple_pattern, context=None) -> None:
+        raise ModificationException()
+
+    def triples(self, triple_pattern, context=None):
+        partitions = self.partitions
+        noContexts = iter(())
+        for position, graph in enumerate(partitions):
+            earlier = partitions[:position]
+            for triple in graph.triples(triple_pattern):
+                #-- only the first partition with the triple returns it
+                if any(triple in other for other in earlier):
+                    continue
+                yield triple, noContexts
+
+    def __len__(self, context=None) -> int:
+        """
+        Return the number of distinct triples, only the partitions after those unchanged
+        since the last call are counted
+        """
+        partitions = self.partitions
+        lengths = [ len(graph) for graph in partitions ]
+
+        counted = self.counted
+        unchanged = 0
+        while (unchanged < min(len(counted), len(partitions)) and counted[unchanged][0]() is partitions[unchanged]
+               and counted[unchanged][1] == lengths[unchanged]):
+            unchanged += 1
+
+        counted = counted[:unchanged]
+        for position in range(unchanged, len(partitions)):
+            graph = partitions[position]
+            earlier = partitions[:position]
+            distinct = lengths[position]
+            if len(earlier) > 0:
+                distinct = sum(1 for triple in graph.triples((None, None, None))
+                               if not any(triple in other for other in earlier))
+            counted.append((weakref.ref(graph), lengths[position], distinct))
+        self.counted = counted
+
+        return sum(distinct for graph, length, distinct in counted)
+
+    def contexts(self, triple=None):
+        return iter(())
+
+    def bind(self, prefix, namespace, override=True) -> None:
+        self.namespaceStore.bind(prefix, namespace, override)
+
+    def namespace(self, prefix):
+        return self.namespaceStore.namespace(prefix)
+
+    def prefix(self, namespace):
+        return self.namespaceStore.prefix(namespace)
+
+    def namespaces(self):
+        return self.namespaceStore.namespaces()
+
+plugin.register("acHierarchy", Store, "acStore", "acHierarchyStore")
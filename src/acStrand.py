@@ -55,13 +55,15 @@ class acStrand(acNode):
         self.subStrands = {}
         self.contentDescriptions = {}
 
-    def __str__(self) -> str:
-        representation = f"""- strand {self.abbreviation} - {self.title} modified {self.dateModified}"""
+    def summary(self) -> str:
+        return f"""- strand {self.abbreviation} - {self.title} modified {self.dateModified}"""
 
-        for subStrand in self.subStrands.keys():
-            representation += f"\n\t\t- subStrand {self.subStrands[subStrand]}"
+    def dumpParts(self) -> list:
+        return ([ ("\n\t\t- subStrand ", subStrand) for subStrand in self.subStrands.values() ] +
+                [ ("\n\t\t\t ", cd) for cd in self.contentDescriptions.values() ])
 
-        for cd in self.contentDescriptions.keys():
-            representation += f"\n\t\t\t {self.contentDescriptions[cd]}"
-
-        return representation
+    def children(self) -> list:
+        """
+        Sub-strands (if any) followed by any content descriptions added directly to the strand
+        """
+        return list(self.subStrands.values()) + list(self.contentDescriptions.values())
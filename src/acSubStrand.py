@@ -53,10 +53,8 @@ class acSubStrand(acNode):
 
         self.contentDescriptions = {}
 
-    def __str__(self) -> str:
-        representation = f"""{self.abbreviation} - {self.title} modified {self.dateModified}"""
+    def dumpParts(self) -> list:
+        return [ ("\n\t\t\t", cd) for cd in self.contentDescriptions.values() ]
 
-        for cd in self.contentDescriptions.keys():
-            representation += f"\n\t\t\t{self.contentDescriptions[cd]}"
-
-        return representation
+    def children(self) -> list:
+        return list(self.contentDescriptions.values())
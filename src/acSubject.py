@@ -49,11 +49,11 @@ class acSubject(acNode):
 
         self.yearLevels = {}
 
-    def __str__(self) -> str:
+    def summary(self) -> str:
+        return f"""Subject - {self.title} ({self.abbreviation}) modified {self.dateModified}"""
 
-        representation = f"""Subject - {self.title} ({self.abbreviation}) modified {self.dateModified}"""
+    def dumpParts(self) -> list:
+        return [ ("\n\t", yearLevel) for yearLevel in self.yearLevels.values() ]
 
-        for yearLevelTitle in self.yearLevels.keys():
-            representation += f"\n\t{self.yearLevels[yearLevelTitle]}"
-        
-        return representation
+    def children(self) -> list:
+        return list(self.yearLevels.values())
@@ -0,0 +1,115 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acTagIndex.py
+
+Bitset index of the general capability and cross-curriculum priority tags (see acTags.py)
+of all the content descriptions
+
+    ac.findTagged(allTags=["Critical and Creative Thinking", "Sustainability"],
+                  learningArea="Mathematics", yearFrom=8, yearTo=8)
+    ac.tagIndex.counts()          # number of content descriptions with each tag
+
+Design
+
+- one row per content description in NumPy arrays - a uint16 with one bit per tag, year
+  range and learning area/subject codes - so a filter is a handful of vectorised
+  comparisons and bitwise operations over all the rows
+- built when first used after RDF files are added (ac.tagIndex), this module (and NumPy)
+  is only imported then
+"""
+
+import numpy as np
+
+from acTags import TAG_BITS, tagsMask
+
+#-- value of yearMin/yearMax for content descriptions without a year range
+NO_YEAR = -1
+
+class acTagIndex:
+    """
+    Bitset index of the tags of all the content descriptions of an australianCurriculum object
+    """
+
+    def __init__(self, ac):
+        entries = list(ac.index.findEntries(nodeType="acContentDescription"))
+        self.contentDescriptions = [ entry.node for entry in entries ]
+
+        #-- title -> code for the learning area and subject columns
+        self.learningAreaCodes = {}
+        self.subjectCodes = {}
+
+        count = len(entries)
+        self.bits = np.zeros(count, dtype=np.uint16)
+        self.yearMin = np.full(count, NO_YEAR, dtype=np.int8)
+        self.yearMax = np.full(count, NO_YEAR, dtype=np.int8)
+        self.learningArea = np.zeros(count, dtype=np.int16)
+        self.subject = np.zeros(count, dtype=np.int16)
+
+        for row, entry in enumerate(entries):
+            self.bits[row] = tagsMask(getattr(entry.node, "tags", None) or ())
+            if entry.yearRange is not None:
+                self.yearMin[row], self.yearMax[row] = entry.yearRange
+            self.learningArea[row] = self.learningAreaCodes.setdefault(entry.learningArea, len(self.learningAreaCodes))
+            self.subject[row] = self.subjectCodes.setdefault((entry.learningArea, entry.subject), len(self.subjectCodes))
+
+    def mask(self, allTags=(), anyTags=(), noTags=(), learningArea=None, subject=None,
+             yearFrom=None, yearTo=None):
+        """
+        Return a NumPy boolean array, True for the content descriptions
+        - with all of allTags, at least one of anyTags (if given) and none of noTags
+          (tag codes or names, see TAGS)
+        - in learningArea/subject (titles) and overlapping the years yearFrom to yearTo
+        """
+        selected = np.ones(len(self.contentDescriptions), dtype=bool)
+
+        required = tagsMask(allTags)
+        if required:
+            selected &= (self.bits & required) == required
+        if len(anyTags) > 0:
+            selected &= (self.bits & tagsMask(anyTags)) != 0
+        excluded = tagsMask(noTags)
+        if excluded:
+            selected &= (self.bits & excluded) == 0
+
+        if learningArea is not None:
+            selected &= self.learningArea == self.learningAreaCodes.get(learningArea, -1)
+        if subject is not None:
+            codes = [ code for (area, title), code in self.subjectCodes.items()
+                      if title == subject and (learningArea is None or area == learningArea) ]
+            selected &= np.isin(self.subject, codes)
+        if yearFrom is not None or yearTo is not None:
+            selected &= self.yearMin != NO_YEAR
+            if yearFrom is not None:
+                selected &= self.yearMax >= yearFrom
+            if yearTo is not None:
+                selected &= self.yearMin <= yearTo
+
+        return selected
+
+    def select(self, **filters) -> list:
+        """
+        Return the list of content descriptions matching the filters (see mask)
+        """
+        return [ self.contentDescriptions[row] for row in np.flatnonzero(self.mask(**filters)) ]
+
+    def counts(self, selected=None) -> dict:
+        """
+        Return a dict of tag code -> number of content descriptions with the tag (only those
+        True in the boolean array selected, if given)
+        """
+        bits = self.bits if selected is None else self.bits[selected]
+        return { code: int(np.count_nonzero(bits & bit)) for code, bit in TAG_BITS.items() }
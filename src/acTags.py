@@ -0,0 +1,94 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acTags.py
+
+General capability (GC) and cross-curriculum priority (CCP) tags of the content
+descriptions, see acTagIndex.py for the bitset index used to filter on them
+
+    contentDescription.tags       # e.g. frozenset({"CCT", "N"})
+    tagBit("Sustainability")      # the tag's bit in acTagIndex
+
+Tags
+
+- in the v9 RDF, content descriptions and elaborations refer to GC elements via
+  asn:skillEmbodied and to CCP elements via asn:crossSubjectReference, the capability or
+  priority is the code in the element's URI (e.g. .../GC/CCT/<uuid> or .../CCP/S/<uuid>)
+- acElaboration.tags is the set of codes of the elaboration, acContentDescription.tags
+  the codes of the content description and all its elaborations (see TAGS)
+
+Only the standard library is used, so parsing doesn't import NumPy
+"""
+
+import re
+
+#-- tag code -> (kind, name), the position in TAGS is the tag's bit
+TAGS = {
+    "CCT": ("GC", "Critical and Creative Thinking"),
+    "DL": ("GC", "Digital Literacy"),
+    "EU": ("GC", "Ethical Understanding"),
+    "IU": ("GC", "Intercultural Understanding"),
+    "L": ("GC", "Literacy"),
+    "N": ("GC", "Numeracy"),
+    "PSC": ("GC", "Personal and Social Capability"),
+    "A_TSI": ("CCP", "Aboriginal and Torres Strait Islander Histories and Cultures"),
+    "AA": ("CCP", "Asia and Australia's Engagement with Asia"),
+    "S": ("CCP", "Sustainability"),
+}
+TAG_BITS = { code: 1 << position for position, code in enumerate(TAGS.keys()) }
+
+#-- the predicates referring to GC and CCP elements
+TAG_PREDICATES = [
+    "http://purl.org/ASN/schema/core/skillEmbodied",
+    "http://purl.org/ASN/schema/core/crossSubjectReference",
+]
+TAG_URI = re.compile(r"/(GC|CCP)/([A-Za-z_]+)/")
+
+def tagCode(uri) -> str:
+    """
+    Return the tag code (key of TAGS) of a GC/CCP element URI, None if it isn't one
+    """
+    match = TAG_URI.search(str(uri))
+    if match is None or match.group(2) not in TAGS:
+        return None
+    return match.group(2)
+
+def tagSet(elements) -> frozenset:
+    """
+    Return the set of tag codes of the GC/CCP element URIs in elements, others are ignored
+    """
+    return frozenset(code for code in map(tagCode, elements) if code is not None)
+
+def tagBit(tag : str) -> int:
+    """
+    Return the bit of a tag given its code or name (case insensitive)
+    """
+    for code, (kind, name) in TAGS.items():
+        if tag.lower() in (code.lower(), name.lower()):
+            return TAG_BITS[code]
+    raise ValueError(f"Unknown general capability/cross-curriculum priority {tag}")
+
+def tagsMask(tags) -> int:
+    mask = 0
+    for tag in tags:
+        mask |= tagBit(tag)
+    return mask
+
+def maskTags(mask : int) -> frozenset:
+    """
+    Return the set of tag codes whose bits are set in mask (the reverse of tagsMask)
+    """
+    return frozenset(code for code, bit in TAG_BITS.items() if mask & bit)
@@ -0,0 +1,296 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acTextIndex.py
+
+In-memory inverted index supporting text search over the title (and description) of
+every AC object held by an australianCurriculum object.
+
+    ac.search('algorithm')              # single term
+    ac.search('"digital systems" data') # phrase and term (all must match)
+    ac.search('algorithm*', k=5)        # prefix
+
+Design
+
+- the tokenizer is any function taking a string and returning a list of tokens
+- postings map each token to {docId: [positions]}, docId is the str of the node's subjectId
+- results are ranked using BM25 and the top k returned via heapq
+- addCurriculum() only walks the learning areas it's given (addRdfFile passes those of the
+  new file) and only tokenizes nodes that aren't already indexed with the same text
+"""
+
+import re
+import copy
+import heapq
+from bisect import bisect_left
+from math import log
+
+#-- BM25 parameters
+K1 = 1.2
+B = 0.75
+
+def defaultTokenizer(text : str) -> list:
+    """
+    Lower case alphanumeric tokens, any HTML tags are removed
+    """
+    text = re.sub(r"<[^>]+>", " ", text)
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+def nodeText(node) -> str:
+    """
+    Return the text to index for an AC object i.e. its title and any description
+    """
+    text = str(node.title) if getattr(node, "title", None) is not None else ""
+    description = getattr(node, "description", None)
+    if description is not None:
+        text += " " + str(description)
+
+    return text
+
+class acTextIndex:
+    """
+    Inverted index over the text of AC objects
+    """
+
+    def __init__(self, tokenizer=None):
+        self.tokenizer = tokenizer if tokenizer is not None else defaultTokenizer
+
+        #-- docId -> AC object
+        self.documents = {}
+        #-- docId -> number of tokens
+        self.lengths = {}
+        self.totalLength = 0
+        #-- token -> { docId : [positions] }
+        self.postings = {}
+        #-- sorted list of tokens for prefix queries, None when it needs rebuilding
+        self.tokens = None
+
+    def addCurriculum(self, ac, learningAreas = None) -> int:
+        """
+        Index the AC objects of learningAreas (default all) in the australianCurriculum
+        object ac that aren't already indexed with the same text. Return the number of
+        newly (re)indexed objects.
+        """
+        added = 0
+        for node, parents in ac.nodes(learningAreas):
+            docId = str(node.subjectId)
+            indexed = self.documents.get(docId)
+            if indexed is not None and (indexed is node or nodeText(indexed) == nodeText(node)):
+                #-- already tokenized, just keep the reference current
+                self.documents[docId] = node
+                continue
+            #-- replaces the postings of any different text
+            self.addNode(node)
+            added += 1
+
+        return added
+
+    def addNode(self, node) -> None:
+        """
+        Add (or replace) a single AC object in the index
+        """
+        docId = str(node.subjectId)
+        if docId in self.documents:
+            self.removeNode(docId)
+
+        tokens = self.tokenizer(nodeText(node))
+
+        self.documents[docId] = node
+        self.lengths[docId] = len(tokens)
+        self.totalLength += len(tokens)
+
+        for position, token in enumerate(tokens):
+            postings = self.postings.get(token)
+            if postings is None:
+                postings = self.postings[token] = {}
+                self.tokens = None
+            postings.setdefault(docId, []).append(position)
+
+    def removeNode(self, docId) -> None:
+        """
+        Remove the AC object with the given docId (str of subjectId) from the index
+        """
+        docId = str(docId)
+        if docId not in self.documents:
+            return
+
+        tokens = self.tokenizer(nodeText(self.documents[docId]))
+        for token in set(tokens):
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(docId, None)
+            if len(postings) == 0:
+                del self.postings[token]
+                self.tokens = None
+
+        self.totalLength -= self.lengths.pop(docId)
+        del self.documents[docId]
+
+    def replaced(self, removeDocIds, nodes) -> "acTextIndex":
+        """
+        Return a new index with removeDocIds removed and nodes added, leaving this one
+        unchanged (it may be searched meanwhile). Only the postings of the affected tokens
+        are copied, the rest are shared
+        """
+        index = copy.copy(self)
+        index.documents = dict(self.documents)
+        index.lengths = dict(self.lengths)
+        index.postings = dict(self.postings)
+
+        nodes = list(nodes)
+        affected = set()
+        for docId in removeDocIds:
+            if str(docId) in self.documents:
+                affected.update(self.tokenizer(nodeText(self.documents[str(docId)])))
+        for node in nodes:
+            affected.update(self.tokenizer(nodeText(node)))
+        for token in affected:
+            if token in index.postings:
+                index.postings[token] = dict(index.postings[token])
+
+        for docId in removeDocIds:
+            index.removeNode(docId)
+        for node in nodes:
+            index.addNode(node)
+
+        return index
+
+    def search(self, query : str, k : int = 10, nodeType=None) -> list:
+        """
+        Return a list of up to k (score, node) tuples, best first, for AC objects matching
+        every clause in query
+        - "quoted words" are a phrase
+        - word* is a prefix
+        - other words are single terms
+        Optionally limit the results to nodeType (AC class or class name)
+        """
+        if isinstance(nodeType, type):
+            nodeType = nodeType.__name__
+
+        clauses = self.parseQuery(query)
+        if len(clauses) == 0:
+            return []
+
+        scores = None
+        for kind, tokens in clauses:
+            clauseScores = self.scoreClause(kind, tokens)
+            if scores is None:
+                scores = clauseScores
+            else:
+                #-- all clauses must match
+                scores = { docId: score + clauseScores[docId]
+                           for docId, score in scores.items() if docId in clauseScores }
+            if len(scores) == 0:
+                return []
+
+        candidates = scores.items()
+        if nodeType is not None:
+            candidates = [ (docId, score) for docId, score in candidates
+                           if type(self.documents[docId]).__name__ == nodeType ]
+
+        best = heapq.nlargest(k, candidates, key=lambda item: item[1])
+        return [ (score, self.documents[docId]) for docId, score in best ]
+
+    def parseQuery(self, query : str) -> list:
+        """
+        Split query into a list of (kind, tokens) clauses, kind is "phrase", "prefix" or "term"
+        """
+        clauses = []
+        for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+            if phrase:
+                tokens = self.tokenizer(phrase)
+                if len(tokens) == 1:
+                    clauses.append(("term", tokens))
+                elif len(tokens) > 1:
+                    clauses.append(("phrase", tokens))
+            elif word.endswith("*"):
+                tokens = self.tokenizer(word[:-1])
+                if len(tokens) > 0:
+                    #-- only the last token is a prefix
+                    clauses.extend(("term", [token]) for token in tokens[:-1])
+                    clauses.append(("prefix", tokens[-1:]))
+            else:
+                clauses.extend(("term", [token]) for token in self.tokenizer(word))
+
+        return clauses
+
+    def scoreClause(self, kind : str, tokens : list) -> dict:
+        """
+        Return { docId: score } for all documents matching the clause
+        """
+        if kind == "term":
+            return self.scoreToken(tokens[0])
+
+        if kind == "prefix":
+            scores = {}
+            for token in self.expandPrefix(tokens[0]):
+                for docId, score in self.scoreToken(token).items():
+                    scores[docId] = max(score, scores.get(docId, 0))
+            return scores
+
+        #-- phrase, documents with all tokens in consecutive positions
+        postings = [ self.postings.get(token) for token in tokens ]
+        if any(posting is None for posting in postings):
+            return {}
+
+        docIds = set(postings[0].keys())
+        for posting in postings[1:]:
+            docIds &= posting.keys()
+
+        scores = {}
+        for docId in docIds:
+            positionSets = [ set(posting[docId]) for posting in postings[1:] ]
+            frequency = 0
+            for start in postings[0][docId]:
+                if all(start + offset + 1 in positions for offset, positions in enumerate(positionSets)):
+                    frequency += 1
+            if frequency > 0:
+                scores[docId] = sum(
+                    self.bm25(token, docId, frequency, len(postings[i])) for i, token in enumerate(tokens))
+
+        return scores
+
+    def scoreToken(self, token : str) -> dict:
+        postings = self.postings.get(token)
+        if postings is None:
+            return {}
+
+        return { docId: self.bm25(token, docId, len(positions), len(postings))
+                 for docId, positions in postings.items() }
+
+    def bm25(self, token : str, docId : str, frequency : int, documentFrequency : int) -> float:
+        count = len(self.documents)
+        averageLength = self.totalLength / count if count > 0 else 0
+        idf = log(1 + (count - documentFrequency + 0.5) / (documentFrequency + 0.5))
+        norm = 1 - B + B * (self.lengths[docId] / averageLength if averageLength > 0 else 0)
+
+        return idf * frequency * (K1 + 1) / (frequency + K1 * norm)
+
+    def expandPrefix(self, prefix : str) -> list:
+        """
+        Return all the indexed tokens starting with prefix
+        """
+        if self.tokens is None:
+            self.tokens = sorted(self.postings.keys())
+
+        matches = []
+        position = bisect_left(self.tokens, prefix)
+        while position < len(self.tokens) and self.tokens[position].startswith(prefix):
+            matches.append(self.tokens[position])
+            position += 1
+
+        return matches
@@ -0,0 +1,180 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acValidate.py
+
+Integrity checks of a loaded australianCurriculum object, reporting the malformed data
+the parser otherwise tolerates
+
+    report = ac.validate()
+    print(report)                 # human readable, one line per issue grouped by kind
+    report.toJson()               # machine readable
+    report.ok                     # True if there are no issues
+
+Issues (ISSUE_KINDS)
+
+- orphan - a node with a statementLabel in the graph that wasn't turned into an AC object
+  (its parent is missing, or it's a child the parser doesn't expect e.g. an achievement
+  standard of a learning area)
+- duplicateNotation - more than one node in the graph with the same statementNotation,
+  only one of them is kept in the dicts keyed on notation
+- missingAchievementStandard - a year level without an achievement standard
+- danglingHasLevel - a hasLevel target that isn't a node in the graph
+- unparseableDate - a dateModified that isn't in one of acNode.DATE_FORMATS
+
+Design
+
+- one sweep over the AC objects (ac.nodes()) and one over each of the graph's predicate
+  indexes used (statementLabel, isChildOf, statementNotation) and the hasLevel index,
+  so the cost is linear in the size of the curriculum
+- the graph checks are skipped for objects without a graph (e.g. snapshots)
+"""
+
+import json
+import time
+from dataclasses import dataclass, field, asdict
+
+from rdflib import URIRef
+
+from acNode import parseDate
+
+ISSUE_KINDS = [ "orphan", "duplicateNotation", "missingAchievementStandard",
+                "danglingHasLevel", "unparseableDate" ]
+
+STATEMENT_LABEL = URIRef("http://purl.org/ASN/schema/core/statementLabel")
+STATEMENT_NOTATION = URIRef("http://purl.org/ASN/schema/core/statementNotation")
+IS_CHILD_OF = URIRef("http://purl.org/gem/qualifiers/isChildOf")
+
+@dataclass
+class acIssue:
+    kind : str = None # one of ISSUE_KINDS
+    subjectId : str = None
+    notation : str = None
+    message : str = None
+
+@dataclass
+class acValidationReport:
+    issues : list = field(default_factory=list)
+    #-- number of AC objects checked and the time taken
+    nodeCount : int = 0
+    seconds : float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return len(self.issues) == 0
+
+    def add(self, kind : str, subjectId, notation, message : str) -> None:
+        self.issues.append(acIssue(kind, str(subjectId),
+                                   None if notation is None else str(notation), message))
+
+    def counts(self) -> dict:
+        """
+        Return a dict of issue kind -> number of issues
+        """
+        counts = { kind: 0 for kind in ISSUE_KINDS }
+        for issue in self.issues:
+            counts[issue.kind] += 1
+        return counts
+
+    def asDict(self) -> dict:
+        return {
+            "ok": self.ok,
+            "nodeCount": self.nodeCount,
+            "seconds": self.seconds,
+            "counts": self.counts(),
+            "issues": [ asdict(issue) for issue in self.issues ],
+        }
+
+    def toJson(self, indent=2) -> str:
+        return json.dumps(self.asDict(), indent=indent)
+
+    def __str__(self) -> str:
+        lines = [ f"{self.nodeCount} AC objects checked in {self.seconds * 1000:.1f} ms, "
+                  f"{len(self.issues)} issue(s)" ]
+        for kind, count in self.counts().items():
+            if count == 0:
+                continue
+            lines.append(f"{kind} ({count})")
+            for issue in self.issues:
+                if issue.kind == kind:
+                    lines.append(f"\t- {issue.notation or ''} {issue.subjectId}: {issue.message}")
+
+        return "\n".join(lines)
+
+def validateCurriculum(ac) -> acValidationReport:
+    """
+    Return an acValidationReport of the issues in the australianCurriculum object ac
+    """
+    start = time.perf_counter()
+    report = acValidationReport()
+
+    #-- sweep the AC objects
+    built = set(getattr(ac, "achievementStandardComponents", None) or {})
+    for node, parents in ac.nodes():
+        report.nodeCount += 1
+        built.add(node.subjectId)
+        notation = getattr(node, "abbreviation", None)
+
+        if type(node).__name__ == "acYearLevel" and node.achievementStandard is None:
+            report.add("missingAchievementStandard", node.subjectId, notation,
+                       f"year level {node.title} has no achievement standard")
+
+        value = node.dateModified
+        if value is None:
+            report.add("unparseableDate", node.subjectId, notation, "no dateModified")
+        elif parseDate(value) is None:
+            report.add("unparseableDate", node.subjectId, notation, f"dateModified {value!r}")
+
+    graph = getattr(ac, "graph", None)
+    if graph is None:
+        report.seconds = time.perf_counter() - start
+        return report
+
+    #-- sweep the graph's predicate indexes
+    labels = { subject: str(label) for subject, label in graph.subject_objects(STATEMENT_LABEL) }
+    parents = dict(graph.subject_objects(IS_CHILD_OF))
+    notations = {}
+    for subject, notation in graph.subject_objects(STATEMENT_NOTATION):
+        notations.setdefault(str(notation), []).append(subject)
+
+    for subject, label in labels.items():
+        if subject in built:
+            continue
+        parent = parents.get(subject)
+        if parent is None:
+            message = f"{label} has no parent"
+        elif parent not in labels:
+            message = f"{label} whose parent {parent} isn't in the graph"
+        elif parent in built:
+            message = f"{label} isn't expected as a child of {labels[parent]} {graph.value(parent, STATEMENT_NOTATION)}"
+        else:
+            message = f"{label} whose parent ({labels[parent]}) wasn't parsed"
+        report.add("orphan", subject, graph.value(subject, STATEMENT_NOTATION), message)
+
+    for notation, subjects in notations.items():
+        if len(subjects) > 1:
+            for subject in subjects:
+                report.add("duplicateNotation", subject, notation,
+                           f"{labels.get(subject)} shares its notation with {len(subjects) - 1} other node(s)")
+
+    for subject, levels in (getattr(ac, "hasLevel", None) or {}).items():
+        for level in levels:
+            if level not in labels:
+                report.add("danglingHasLevel", subject, graph.value(subject, STATEMENT_NOTATION),
+                           f"hasLevel target {level} isn't in the graph")
+
+    report.seconds = time.perf_counter() - start
+    return report
@@ -0,0 +1,265 @@
+# Copyright (C) 2023 David Jones
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as
+# published by the Free Software Foundation, either version 3 of the
+# License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+acWatch.py
+
+Hot reload of the learning areas of a live australianCurriculum object when their RDF
+files change
+
+    watcher = acWatcher(ac, "data/v9")              # folder (*.rdf, *.nt) or list of files
+    watcher.subscribe(lambda event: print(event))
+    watcher.start()                                 # polls every interval seconds
+    ...
+    watcher.stop()
+
+    reloadRdfFile(ac, "data/v9/MAT.rdf")            # reload a single file now
+
+Design
+
+- ac.fileLearningAreas records the learning areas each file added, so only the changed
+  file is parsed again (into its own australianCurriculum object) and only its learning
+  areas are replaced
+- everything new - learningAreas, achievementStandardComponents, hasLevel/isLevelOf, the
+  query index and the text index - is built alongside the live objects, then swapped in
+  by assigning the attributes. A reader sees either the old or the new objects, never a
+  half built learning area. The indexes are copied on write (acCurriculumIndex.replaced,
+  acTextIndex.replaced), only the entries and postings of the changed nodes are copied
+- the file's partition (see australianCurriculum.graphs) is replaced by the new one,
+  other files' triples are untouched
+- a file that fails to parse (e.g. still being written) leaves the live objects alone,
+  the error is passed to the subscribers and the file is tried again when it next changes
+- files are polled (os.stat modification time and size), nothing beyond the standard library
+"""
+
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+
+from acQuery import acCurriculumIndex, hierarchyNodes, subtreeNodes
+
+logger = logging.getLogger("australianCurriculum.watch")
+
+#-- files in a watched folder with these suffixes are watched
+WATCH_SUFFIXES = ( ".rdf", ".nt" )
+#-- default seconds between polls
+INTERVAL = 0.5
+
+@dataclass
+class acReloadEvent:
+    fileName : str = None
+    #-- titles of the learning areas removed and the (new) learning areas added
+    removed : list = field(default_factory=list)
+    added : dict = field(default_factory=dict, repr=False)
+    seconds : float = 0.0
+    #-- the exception if the file couldn't be loaded (nothing was changed)
+    error : Exception = None
+
+def parseFile(ac, fileName):
+    """
+    Return a new australianCurriculum object (same store as ac) with just fileName parsed,
+    indexes aren't built
+    """
+    from australianCurriculum import australianCurriculum
+
+    #-- a Store object already holds one of ac's partitions
+    store = ac.store if isinstance(ac.store, str) else type(ac.store)()
+    fresh = australianCurriculum(store=store)
+    fresh.generateGraphObject(fileName)
+    fresh.getRoot()
+    fresh.parseGraph()
+
+    return fresh
+
+def reloadRdfFile(ac, fileName) -> acReloadEvent:
+    """
+    Replace the learning areas ac loaded from fileName with those now in fileName (added
+    if ac hasn't loaded it, removed if it no longer exists). Return an acReloadEvent,
+    exceptions from parsing are raised and leave ac unchanged
+    """
+    start = time.perf_counter()
+    key = os.path.abspath(fileName)
+
+    fresh = None
+    if os.path.isfile(fileName):
+        fresh = parseFile(ac, fileName)
+
+    oldTitles = ac.fileLearningAreas.get(key, [])
+    newLearningAreas = {} if fresh is None else fresh.learningAreas
+
+    #-- keep the position of replaced learning areas, new ones go at the end
+    learningAreas = {}
+    for title, learningArea in ac.learningAreas.items():
+        if title not in oldTitles:
+            learningAreas[title] = learningArea
+        elif title in newLearningAreas:
+            learningAreas[title] = newLearningAreas[title]
+    for title, learningArea in newLearningAreas.items():
+        learningAreas.setdefault(title, learningArea)
+
+    oldSubjects = set(node.subjectId for node, parents in
+                      subtreeNodes(ac.learningAreas[title] for title in oldTitles if title in ac.learningAreas))
+
+    graphs = { fileKey: graph for fileKey, graph in ac.graphs.items() if fileKey != key }
+    if fresh is not None:
+        graphs[key] = fresh.graphs[key]
+
+    components = { id: component for id, component in (ac.achievementStandardComponents or {}).items()
+                   if id not in oldSubjects }
+    hasLevel = { node: levels for node, levels in (ac.hasLevel or {}).items() if node not in oldSubjects }
+    isLevelOf = { level: nodes for level, nodes in (ac.isLevelOf or {}).items() if level not in oldSubjects }
+    if fresh is not None:
+        components.update(fresh.achievementStandardComponents)
+        hasLevel.update(fresh.hasLevel)
+        isLevelOf.update(fresh.isLevelOf)
+
+    index = (ac.index or acCurriculumIndex()).replaced(oldSubjects, newLearningAreas.values(), learningAreas.keys())
+    textIndex = ac.textIndex.replaced(
+        [ str(subject) for subject in oldSubjects ],
+        [ node for node, parents in hierarchyNodes(newLearningAreas.values()) ])
+
+    #-- swap
+    ac.graphs = graphs
+    if ac.graph is None and fresh is not None:
+        ac.graph = fresh.graph
+    if ac.graph is not None:
+        ac.graph.store.partitions = list(graphs.values())
+        ac.graphVersion += 1
+    ac.achievementStandardComponents = components
+    ac.hasLevel = hasLevel
+    ac.isLevelOf = isLevelOf
+    ac.learningAreas = learningAreas
+    ac.index = index
+    ac.textIndex = textIndex
+    ac.tagIndex = None
+    if fresh is None:
+        ac.fileLearningAreas.pop(key, None)
+    else:
+        ac.fileLearningAreas[key] = list(newLearningAreas.keys())
+
+    return acReloadEvent(fileName, list(oldTitles), dict(newLearningAreas),
+                         time.perf_counter() - start)
+
+class acWatcher:
+    """
+    Poll RDF files (or the WATCH_SUFFIXES files in folders) and reload each changed file
+    into the australianCurriculum object ac, notifying the subscribers with an acReloadEvent
+    """
+
+    def __init__(self, ac, paths, interval : float = INTERVAL):
+        self.ac = ac
+        self.paths = [ paths ] if isinstance(paths, (str, os.PathLike)) else list(paths)
+        self.interval = interval
+        self.subscribers = []
+
+        #-- reloads (from the thread or check()) happen one at a time
+        self.lock = threading.Lock()
+        self.stopEvent = threading.Event()
+        self.thread = None
+
+        #-- file -> (modification time, size) as last seen
+        self.seen = { fileName: self.signature(fileName) for fileName in self.files() }
+
+    def subscribe(self, callback) -> None:
+        """
+        callback(acReloadEvent) is called after each reload (in the watcher's thread)
+        """
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback) -> None:
+        self.subscribers.remove(callback)
+
+    def files(self) -> list:
+        files = []
+        for path in self.paths:
+            if os.path.isdir(path):
+                files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                    if name.endswith(WATCH_SUFFIXES)))
+            else:
+                files.append(path)
+
+        return [ os.path.abspath(fileName) for fileName in files ]
+
+    def signature(self, fileName) -> tuple:
+        try:
+            status = os.stat(fileName)
+        except FileNotFoundError:
+            return None
+        return (status.st_mtime_ns, status.st_size)
+
+    def check(self) -> list:
+        """
+        Reload any file that changed since the last check, return the list of acReloadEvents
+        """
+        events = []
+        with self.lock:
+            files = set(self.files()) | set(self.seen.keys())
+            for fileName in sorted(files):
+                signature = self.signature(fileName)
+                if signature == self.seen.get(fileName):
+                    continue
+
+                #-- a file that fails is tried again when it next changes
+                if signature is None:
+                    self.seen.pop(fileName, None)
+                else:
+                    self.seen[fileName] = signature
+
+                try:
+                    event = reloadRdfFile(self.ac, fileName)
+                except Exception as error:
+                    logger.warning("reloading %s failed: %s", fileName, error)
+                    event = acReloadEvent(fileName, error=error)
+                events.append(event)
+                self.notify(event)
+
+        return events
+
+    def notify(self, event : acReloadEvent) -> None:
+        for callback in list(self.subscribers):
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("reload subscriber failed")
+
+    def run(self) -> None:
+        while not self.stopEvent.wait(self.interval):
+            self.check()
+
+    def start(self) -> None:
+        """
+        Start polling in a (daemon) background thread
+        """
+        if self.thread is not None:
+            return
+        self.stopEvent.clear()
+        self.thread = threading.Thread(target=self.run, name="acWatcher", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        if self.thread is None:
+            return
+        self.stopEvent.set()
+        self.thread.join()
+        self.thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
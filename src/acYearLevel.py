@@ -52,22 +52,30 @@ class acYearLevel(acNode):
 
         self.strands = {}
 
-    def __str__(self) -> str:
-        representation = f"""\tYearLevel - {self.title} ({self.abbreviation}) modified {self.dateModified}"""
-
-        representation += "\n\t\t--------- Description ---------"
-        representation += f"""\n\t\t{self.description}"""
-
-
-        representation += "\n\t\t--------- achievementStandard ---------"
-
-        representation += f"""\n\t\t{self.achievementStandard}"""
-
-        representation += "\n\t\t --------- Strands ---------"
-
-        for strand in self.strands.keys():
-            representation += f"\n\t\t{self.strands[strand]}"
-
-
-        return representation
+    def summary(self) -> str:
+        return f"""\tYearLevel - {self.title} ({self.abbreviation}) modified {self.dateModified}"""
+
+    def dumpParts(self) -> list:
+        parts = [ "\n\t\t--------- Description ---------", f"""\n\t\t{self.description}""",
+                  "\n\t\t--------- achievementStandard ---------" ]
+
+        if self.achievementStandard is None:
+            parts.append("\n\t\tNone")
+        else:
+            parts.append(("\n\t\t", self.achievementStandard))
+
+        parts.append("\n\t\t --------- Strands ---------")
+        parts.extend(("\n\t\t", strand) for strand in self.strands.values())
+
+        return parts
+
+    def children(self) -> list:
+        """
+        The achievement standard (if any) followed by the strands
+        """
+        children = []
+        if self.achievementStandard is not None:
+            children.append(self.achievementStandard)
+        children.extend(self.strands.values())
+        return children
  
\ No newline at end of file
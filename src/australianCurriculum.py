@@ -27,13 +27,41 @@ TODO
 
 - if and how to handle general capabilities and cross-curriculum priorities
 - provide methods to summarise the data in the object 
-- methods to allow more direct querying of the contents (learning areas, subjects, content descriptions)
+
+Querying
+
+- nodes() yields every AC object (with its parents) without nested loops
+- find() and explain() provide structured queries via the acCurriculumIndex (see acQuery.py)
+- search() provides ranked text search via the acTextIndex (see acTextIndex.py)
+- both indexes are updated incrementally, adding (removing) an RDF file only adds (removes)
+  the nodes of its learning areas
+
+Instrumentation
+
+- australianCurriculum(instrument=True) or enableStats() records per phase times, graph
+  lookups etc. available via stats() (see acStats.py), there's no cost when not enabled
+
+Graph store
+
+- australianCurriculum(store="acHierarchy") parses into the lean acHierarchyStore (see
+  acStore.py) rather than RDFLib's default Memory store. Any RDFLib store (plugin name
+  or Store object) can be used
+
+Per-file partitions
+
+- each RDF file is parsed into its own graph (graphs, keyed on the file's absolute path)
+  and only that partition is searched for learning areas, so adding N files costs linear
+  rather than quadratic time
+- graph is a read-only union of the partitions (acUnionStore) for SPARQL, walkTheGraph etc.
+- removeRdfFile drops a file's partition, its learning areas and their index entries
 """
 
 from dataclasses import dataclass
 from typing import Any
 
+import io
 import os
+import sys
 
 from rdflib import Graph, URIRef, Literal, Namespace
 
@@ -46,6 +74,15 @@ from acStrand import acStrand
 from acSubStrand import acSubStrand
 from acContentDescription import acContentDescription
 from acElaboration import acElaboration
+from acQuery import acCurriculumIndex, setYearRanges, hierarchyNodes, subtreeNodes
+from acTextIndex import acTextIndex
+from acGraphWalker import walkGraph, writeWalk, splitPos, formatNode
+from acStats import acLoadStats
+import acStore
+from acStore import acUnionStore
+from acNTriples import loadNTriples, NTRIPLES_SUFFIX
+from acTags import tagSet, TAG_PREDICATES
+from acValidate import validateCurriculum, acValidationReport
 
 from pprint import pprint
 
@@ -54,9 +91,15 @@ class australianCurriculum:
     # root node of graph, feels kludgy and may no longer work
     # - was originally used for walkTheGraph which is probably due to deprecated
     root : Any = None 
-    # the RDFLib graph object, all learning area RDF files are parsed into this
+    # the RDFLib graph object, read-only union of all the learning area RDF files
     # - this may not be useful if we want to add general capabilities etc.
     graph: Graph = None 
+    #-- absolute path of each RDF file -> the graph (partition) it was parsed into
+    graphs: dict = None
+    #-- the partition being parsed by addRdfFile
+    partition: Graph = None
+    #-- incremented each time the graph changes, used to memoise queries (e.g. acSparql)
+    graphVersion: int = 0
 
     #-- all the learning areas, keyed by human readable name
     #   - Each learning area acLearningArea object allows access to all info
@@ -72,10 +115,47 @@ class australianCurriculum:
     contentDescriptions: dict = None
     strands: dict = None 
 
-    def __init__(self, fileName = None):
-
+    #-- bidirectional hasLevel/isLevelOf index, built in one pass over the graph
+    # - hasLevel maps a node (e.g. content description) to the list of nodes it hasLevel
+    #   (e.g. achievement standard components), isLevelOf is the reverse
+    hasLevel: dict = None
+    isLevelOf: dict = None
+    #-- all acAchievementStandardComponent objects keyed on subjectId
+    achievementStandardComponents: dict = None
+
+    #-- acCurriculumIndex supporting find()/explain(), rebuilt by addRdfFile
+    index: acCurriculumIndex = None
+    #-- acTextIndex supporting search(), updated by addRdfFile
+    textIndex: acTextIndex = None
+    #-- acTagIndex (see acTagIndex.py) supporting findTagged(), built when first used
+    tagIndex: Any = None
+    #-- acLoadStats, None unless instrumentation has been enabled
+    loadStats: acLoadStats = None
+    #-- the RDFLib store (plugin name or Store object) used when the graph is created
+    store: Any = "default"
+    #-- absolute path of each RDF file added -> list of titles of the learning areas it added
+    fileLearningAreas: dict = None
+
+    def __init__(self, fileName = None, tokenizer = None, instrument = False, store = "default"):
+        """
+        Optionally parse fileName. tokenizer is an optional function used by the
+        text index to split text into a list of tokens. instrument enables the
+        load statistics (see enableStats). store is the RDFLib store used for the
+        graph e.g. "acHierarchy" (see acStore.py)
+        """
+
+        self.store = store
         self.learningAreas = {}
         self.subjects = {}
+        self.fileLearningAreas = {}
+        self.graphs = {}
+        self.hasLevel = {}
+        self.isLevelOf = {}
+        self.achievementStandardComponents = {}
+        self.textIndex = acTextIndex(tokenizer)
+
+        if instrument:
+            self.enableStats()
 
         #-- Configure some namespace shortcuts
         self.asnNameSpace = Namespace("http://purl.org/ASN/schema/core/")
@@ -90,7 +170,12 @@ class australianCurriculum:
         if not os.path.isfile(fileName):
             raise ValueError(f"File {fileName} does not exist or is not readable")
 
+        #-- adding a file again replaces it
+        if os.path.abspath(fileName) in self.graphs:
+            self.removeRdfFile(fileName)
+
 #        self.fileName = fileName
+        existing = set(learningArea.subjectId for learningArea in self.learningAreas.values())
         self.generateGraphObject( fileName)
 
         #-- walk the graph and generate matching objects
@@ -98,45 +183,241 @@ class australianCurriculum:
         #-- TODO should parseGraph do something else??
         self.parseGraph()
 
-    def __str__(self) -> None:
+        titles = [ title for title, learningArea in self.learningAreas.items()
+                   if learningArea.subjectId not in existing ]
+        self.buildIndexes([ self.learningAreas[title] for title in titles ])
+
+        self.fileLearningAreas[os.path.abspath(fileName)] = titles
+        self.partition = None
+
+        if self.loadStats is not None:
+            self.loadStats.logStats(self, fileName)
+
+    def removeRdfFile(self, fileName) -> list:
+        """
+        Remove the partition of an RDF file added by addRdfFile, along with its learning
+        areas and their index entries. Return the titles of the learning areas removed
+        """
+        key = os.path.abspath(fileName)
+        if key not in self.graphs:
+            raise ValueError(f"File {fileName} has not been added")
+
+        titles = self.fileLearningAreas.pop(key, [])
+        del self.graphs[key]
+        self.graph.store.partitions = list(self.graphs.values())
+        self.graphVersion += 1
+
+        subjects = set()
+        for title in titles:
+            learningArea = self.learningAreas.pop(title, None)
+            if learningArea is None:
+                continue
+            for node, parents in self.subtreeNodes(learningArea):
+                subjects.add(node.subjectId)
+
+        for subject in subjects:
+            self.achievementStandardComponents.pop(subject, None)
+            self.hasLevel.pop(subject, None)
+            self.isLevelOf.pop(subject, None)
+            self.textIndex.removeNode(subject)
+        if self.index is not None:
+            self.index.remove(subjects)
+        self.tagIndex = None
+
+        return titles
+
+    def subtreeNodes(self, learningArea):
+        """
+        Generator yielding (node, parents) for learningArea and all the AC objects below
+        it, including the achievement standard components
+        """
+        return subtreeNodes([ learningArea ])
+
+    def enableStats(self, memory : bool = False, log : bool = False) -> None:
         """
-        Dump out a simple representation to stdout of the object
+        Start gathering load statistics (see acStats.py) for subsequent addRdfFile calls,
+        if already started the options are changed (statistics so far are kept)
+        - memory - also track peak memory per phase (tracemalloc, slows loading)
+        - log - log the statistics (JSON) after each file is added
         """
+        if self.loadStats is not None:
+            self.loadStats.configure(memory, log)
+            return
 
-        representation = f"""
+        self.loadStats = acLoadStats(memory, log)
+        self.loadStats.instrument(self)
+
+    def disableStats(self) -> None:
+        """
+        Stop gathering load statistics, removing the instrumentation (and stopping
+        tracemalloc if enableStats started it). stats() is then None
+        """
+        if self.loadStats is None:
+            return
+
+        self.loadStats.uninstrument(self)
+        self.loadStats = None
+
+    def stats(self) -> dict:
+        """
+        Return a dict of the load statistics, None if they haven't been enabled
+        """
+        if self.loadStats is None:
+            return None
+
+        return self.loadStats.asDict(self)
+
+    def memoryReport(self) -> dict:
+        """
+        Return a dict of the memory (bytes) retained by the graph, the AC objects (by type),
+        their strings and the indexes (see acMemory.py, requires Pympler)
+        """
+        from acMemory import memoryReport
+
+        return memoryReport(self)
+
+    def validate(self) -> acValidationReport:
+        """
+        Return an acValidationReport of the orphans, duplicate notations, missing achievement
+        standards, dangling hasLevel targets and unparseable dates (see acValidate.py)
+        """
+        return validateCurriculum(self)
+
+    def buildIndexes(self, learningAreas = None) -> None:
+        """
+        Add the AC objects of learningAreas (default all, rebuilding the query index) to
+        the indexes used to query them
+        """
+        if learningAreas is None or self.index is None:
+            self.index = acCurriculumIndex(self)
+        else:
+            self.index.add(learningAreas)
+        self.textIndex.addCurriculum(self, learningAreas)
+        self.tagIndex = None
+
+    def findTagged(self, **filters) -> list:
+        """
+        Return the content descriptions with the general capability/cross-curriculum
+        priority tags in filters (allTags, anyTags, noTags) that are in learningArea,
+        subject and overlap yearFrom to yearTo (see acTagIndex.mask, requires NumPy)
+        """
+        if self.tagIndex is None:
+            from acTagIndex import acTagIndex
+
+            self.tagIndex = acTagIndex(self)
+
+        return self.tagIndex.select(**filters)
+
+    def nodes(self, learningAreas = None):
+        """
+        Generator yielding (node, parents) for every AC object, in hierarchy order
+        - node is the AC object (acLearningArea, acSubject ... acElaboration)
+        - parents is a tuple of the node's ancestors, learning area first
+        - learningAreas - only these learning areas (default all)
+        """
+        if learningAreas is None:
+            learningAreas = self.learningAreas.values()
+
+        return hierarchyNodes(learningAreas)
+
+    def find(self, **filters):
+        """
+        Lazily yield the AC objects matching all the filters, any of
+        - learningArea, subject, strand, subStrand - titles
+        - yearFrom, yearTo - integer years (Foundation is 0), matches overlapping year levels
+        - nodeType - AC class or class name e.g. "acContentDescription"
+        - notationPrefix - start of the statementNotation e.g. "AC9M8"
+        """
+        return self.index.find(**filters)
+
+    def explain(self, **filters) -> dict:
+        """
+        Return a description of the index find() would use for the given filters
+        """
+        return self.index.explain(**filters)
+
+    def search(self, query : str, k : int = 10, nodeType = None) -> list:
+        """
+        Return up to k (score, node) tuples, best first, for AC objects whose text
+        matches query (terms, "quoted phrases" and prefix* queries)
+        """
+        return self.textIndex.search(query, k, nodeType)
+
+    def dump(self, stream = None, depth : int = None, fields : list = None) -> None:
+        """
+        Write a simple representation of the object to stream (default sys.stdout),
+        incrementally (see acNode.dump)
+        - depth - how many levels below the learning areas to include (default all)
+        - fields - the attributes shown on each node's line (default each class's summary)
+        """
+        if stream is None:
+            stream = sys.stdout
+
+        stream.write(f"""
 Number of nodes: {len(self.graph)}
-Number of learning areas {len(self.learningAreas.keys())}"""
+Number of learning areas {len(self.learningAreas.keys())}""")
 
-        for learningAreaTitle in self.learningAreas.keys():
-            representation += f"\nLearning Area: {self.learningAreas[learningAreaTitle].__str__()}"
+        for learningArea in self.learningAreas.values():
+            stream.write("\nLearning Area: ")
+            learningArea.dump(stream, depth, fields)
 
-        for subjectTitle in self.subjects.keys():
-            representation += f"\n  - subject: {self.subjects[subjectTitle].__str__()}"
+        for subject in self.subjects.values():
+            stream.write("\n  - subject: ")
+            subject.dump(stream, depth, fields)
 
-        return representation
+    def __str__(self) -> str:
+        """
+        Return the dump of the object as a string
+        """
+        stream = io.StringIO()
+        self.dump(stream)
+        return stream.getvalue()
             
         
 
     def generateGraphObject(self, fileName):
         """
         Attempt to create a RDFLib graph based on contents of fileName
+        - RDF/XML, or N-Triples (parsed in parallel) if fileName ends with NTRIPLES_SUFFIX
         """
 
         if self.graph is None:
-            self.graph = Graph()
+            self.graph = Graph(store=acUnionStore())
+
+        #-- a Store object can only hold one partition, the others get a new one of its type
+        store = self.store
+        if not isinstance(store, str) and len(self.graphs) > 0:
+            store = type(store)()
+        self.partition = Graph(store=store)
+        if self.loadStats is not None:
+            self.loadStats.instrumentGraph(self.partition)
 
-        self.graph.parse(fileName, format="xml")
+        if str(fileName).endswith(NTRIPLES_SUFFIX):
+            loadNTriples(self.partition, fileName)
+        else:
+            self.partition.parse(fileName, format="xml")
 
         #-- did it work
-        if len(self.graph) == 0:
+        if len(self.partition) == 0:
             raise ValueError(f"No data in graph {fileName}")
 
+        self.graphs[os.path.abspath(fileName)] = self.partition
+        self.graph.store.partitions = list(self.graphs.values())
+        self.graphVersion += 1
+
+    def sourceGraph(self) -> Graph:
+        """
+        The graph the parse methods search - the partition being added, otherwise the
+        union of all the partitions
+        """
+        return self.graph if self.partition is None else self.partition
+
     def getRoot(self): 
         """ 
         Get the subject with property "root"
         """
 
-        subjects = self.graph.subjects(
+        subjects = self.sourceGraph().subjects(
             predicate=self.statementNotation, object=Literal("root", lang="en-au")) 
 
         #-- check we have the right number
@@ -147,7 +428,7 @@ Number of learning areas {len(self.learningAreas.keys())}"""
             self.root = s
 
         if count == 0:
-            return ValueError("No root found")
+            raise ValueError("No root found")
 #        elif count > 1:
 #            return ValueError("More than one root found")
 
@@ -162,15 +443,56 @@ Number of learning areas {len(self.learningAreas.keys())}"""
         2. add any top level stuff???? 
         """
 
+        self.buildLevelIndex()
+
+        existing = set(id(learningArea) for learningArea in self.learningAreas.values())
         self.parseLearningAreas()
+
+        #-- normalise the year levels and nominalYearLevels of the new learning areas
+        setYearRanges(self.nodes(learningArea for learningArea in self.learningAreas.values()
+                                 if id(learningArea) not in existing))
 #        self.parseSubjects()
 
+    def buildLevelIndex(self) -> None:
+        """
+        Add to the hasLevel and isLevelOf dicts in a single pass over the nodes with
+        hasLevel (and the isLevelOf) triples in the partition being parsed
+        """
+        graph = self.sourceGraph()
+        hasLevel = URIRef("http://purl.org/ASN/schema/core/hasLevel")
+
+        #-- each node's levels in the order objects(node, hasLevel) gives them (the order
+        #   of the file), subject_objects groups the triples by object
+        for node in dict.fromkeys(graph.subjects(predicate=hasLevel)):
+            for level in graph.objects(subject=node, predicate=hasLevel):
+                self.hasLevel.setdefault(node, []).append(level)
+                self.isLevelOf.setdefault(level, []).append(node)
+
+        #-- isLevelOf triples are the reverse, only add those not already seen
+        for level, node in graph.subject_objects(
+                predicate=URIRef("http://purl.org/ASN/schema/core/isLevelOf")):
+            if level not in self.hasLevel.get(node, []):
+                self.hasLevel.setdefault(node, []).append(level)
+                self.isLevelOf.setdefault(level, []).append(node)
+
+    def contentDescriptionsFor(self, component) -> list:
+        """
+        Return the list of acContentDescription objects that address the given
+        achievement standard component (acAchievementStandardComponent or its subjectId)
+        """
+        if not isinstance(component, acAchievementStandardComponent):
+            component = self.achievementStandardComponents.get(component)
+        if component is None:
+            return []
+
+        return list(component.contentDescriptions.values())
+
     def parseLearningAreas(self):
         """
         Extract all nodes for with statementLabel == "Learning Area" and 
         """
 
-        learningAreaNodes = self.graph.subjects(
+        learningAreaNodes = self.sourceGraph().subjects(
             predicate=self.statementLabel, object=Literal("Learning Area", lang="en-au"))
 
         found = 0
@@ -206,7 +528,7 @@ Number of learning areas {len(self.learningAreas.keys())}"""
 
         #-- get all the subject nodes that a children of the learning area
         #   - predicate isChildOf and object is the learning area
-        subjects = self.graph.subjects(
+        subjects = self.sourceGraph().subjects(
             predicate=URIRef("http://purl.org/gem/qualifiers/isChildOf"), object=learningArea.subjectId)
 #        subjects = self.graph.subjects(
 #            predicate=self.statementLabel, object=Literal("Subject", lang="en-au"))
@@ -237,7 +559,7 @@ Number of learning areas {len(self.learningAreas.keys())}"""
 
         #-- get all the year level nodes
         #   predicate isChildOf and object is the subject
-        yearLevelNodes = self.graph.subjects(
+        yearLevelNodes = self.sourceGraph().subjects(
             predicate=URIRef("http://purl.org/gem/qualifiers/isChildOf"), object=subject.subjectId)
 
         for yearLevelNode in yearLevelNodes:
@@ -264,7 +586,7 @@ Number of learning areas {len(self.learningAreas.keys())}"""
 
         #-- get all the "Strands" nodes with isChildOf of yearLevel.subjectId
         # - start with the children
-        strandNodes = self.graph.subjects(
+        strandNodes = self.sourceGraph().subjects(
             predicate=URIRef("http://purl.org/gem/qualifiers/isChildOf"), object=yearLevel.subjectId)
 
         for strandNode in strandNodes:
@@ -291,7 +613,7 @@ Number of learning areas {len(self.learningAreas.keys())}"""
         """
 
         #-- find all the children of strand node
-        children = self.graph.subjects(
+        children = self.sourceGraph().subjects(
             predicate=URIRef("http://purl.org/gem/qualifiers/isChildOf"), object=strandNode)
         
         #-- check if any of them are sub-Strands
@@ -310,7 +632,7 @@ Number of learning areas {len(self.learningAreas.keys())}"""
         """
 
         #-- sub-strands are children of the strand with "Sub-Strand" as the statementLabel
-        subStrandNodes = self.graph.subjects(
+        subStrandNodes = self.sourceGraph().subjects(
             predicate=URIRef("http://purl.org/gem/qualifiers/isChildOf"), object=strand.subjectId)
 
         for subStrandNode in subStrandNodes:
@@ -335,7 +657,7 @@ Number of learning areas {len(self.learningAreas.keys())}"""
 
         #-- content descriptions are children of the subStrand with 
         # "Content Description" as the statementLabel
-        cdNodes = self.graph.subjects(
+        cdNodes = self.sourceGraph().subjects(
             predicate=URIRef("http://purl.org/gem/qualifiers/isChildOf"), object=subStrand.subjectId)
 
         for cdNode in cdNodes:
@@ -360,7 +682,7 @@ Number of learning areas {len(self.learningAreas.keys())}"""
         - Achievement Standard Components
         """
 
-        cdExtraNodes = self.graph.subjects(
+        cdExtraNodes = self.sourceGraph().subjects(
             predicate=URIRef("http://purl.org/gem/qualifiers/isChildOf"), object=contentDescription.subjectId)
 
         for cdExtraNode in cdExtraNodes:
@@ -370,30 +692,48 @@ Number of learning areas {len(self.learningAreas.keys())}"""
                 elaboration = acElaboration(
                     cdExtraNode, info['title'], info['statementNotation'],
                     str(info['modified']), info['nominalYearLevel'])
+                elaboration.tags = self.parseTags(cdExtraNode)
 
                 contentDescription.elaborations[str(info['statementNotation'])] = elaboration
 
+        #-- the content description's tags include those of its elaborations
+        contentDescription.tags = self.parseTags(contentDescription.subjectId).union(
+            *(elaboration.tags for elaboration in contentDescription.elaborations.values()))
+
         #-- a content description may have an achievement standard component via
         #   the hasLevel predicate. Get the objects for hasLevel on contentDescription
-        #   then get that subject and... 
-        #   - check the statementLabel is "Achievement Standard Component"
-        #   - add it to the contentDescription object
-        asComponents = self.graph.objects(
-            subject=contentDescription.subjectId, predicate=URIRef("http://purl.org/ASN/schema/core/hasLevel"))
-
-        for asComponent in asComponents:
-            info = self.extractNodeInfo(asComponent)
+        #   (from the hasLevel index) and... 
+        #   - use the component object created by parseYearLevelAchievementStandards
+        #     or, if there isn't one, check the statementLabel is "Achievement Standard Component"
+        #   - add it to the contentDescription object, and the contentDescription to it
+        for asComponent in self.hasLevel.get(contentDescription.subjectId, []):
+            achievementStandardComponent = self.achievementStandardComponents.get(asComponent)
+
+            if achievementStandardComponent is None:
+                info = self.extractNodeInfo(asComponent)
+                if str(info['statementLabel']) != "Achievement Standard Component":
+                    continue
 
-            if str(info['statementLabel']) == "Achievement Standard Component":
                 achievementStandardComponent = acAchievementStandardComponent(
-                    cdExtraNode, info['title'], info['statementNotation'],
+                    asComponent, info['title'], info['statementNotation'],
                     str(info['modified']), info['nominalYearLevel'])
+                self.achievementStandardComponents[asComponent] = achievementStandardComponent
 
-                contentDescription.achievementStandardComponents[str(info['statementNotation'])] = achievementStandardComponent
+            contentDescription.achievementStandardComponents[str(achievementStandardComponent.abbreviation)] = achievementStandardComponent
+            achievementStandardComponent.contentDescriptions[str(contentDescription.abbreviation)] = contentDescription
 
 #                pprint(contentDescription)
 #                input("waiting")
             
+    def parseTags(self, subjectId) -> frozenset:
+        """
+        Return the codes (see acTags.TAGS) of the general capabilities and cross-curriculum
+        priorities the node subjectId refers to
+        """
+        graph = self.sourceGraph()
+        return tagSet(element for predicate in TAG_PREDICATES
+                      for element in graph.objects(subject=subjectId, predicate=URIRef(predicate)))
+
     def parseYearLevelAchievementStandards(self, yearLevel):
         """
         Given an acYearLevel object, parse the graph to set the achievement standards object for all the "Achievement Standard" and "Achievement Standard Component" nodes
@@ -403,7 +743,7 @@ Number of learning areas {len(self.learningAreas.keys())}"""
         """
 
         #-- get all the "Achievement Standard" nodes with isChildOf of yearLevel.subjectId
-        achievementStandardNodes = self.graph.subjects(
+        achievementStandardNodes = self.sourceGraph().subjects(
             predicate=URIRef("http://purl.org/gem/qualifiers/isChildOf"), object=yearLevel.subjectId)
 
         for achievementStandardNode in achievementStandardNodes:
@@ -420,7 +760,7 @@ Number of learning areas {len(self.learningAreas.keys())}"""
             #-- grab the achievement standard components
             # - statementLabel is "Achievement Standard Component" and 
             #   isChildOf is the achievementStandardNode
-            components = self.graph.subjects(
+            components = self.sourceGraph().subjects(
                 predicate=URIRef("http://purl.org/gem/qualifiers/isChildOf"), object=achievementStandardNode)
 
             for component in components:
@@ -434,103 +774,47 @@ Number of learning areas {len(self.learningAreas.keys())}"""
                     info['modified'], info['nominalYearLevel']) 
 
                 achievementStandard.components[str(info['statementNotation'])] = acComponent
+                self.achievementStandardComponents[component] = acComponent
             
 
-    def walkTheGraph(self, subjectId=None, depth=0):
+    def walkTheGraph(self, subjectId=None, maxDepth=None, stream=None):
         """
-        Walk (sort of recursively) the RDFLib graph from the given subjectId
+        Walk the RDFLib graph from the given subjectId (default is the root)
 
         Oz Curriuclum RDF files have a 
         - parent/child structure using <hasChild> and <isChildOf> predicates
         - but some also via <hasLevel> and <isLevelOf> predicates
 
-        For now, display some information about each node
-
-        TODO - actually generate data structures
+        For now, display some information about each node to stream (default stdout)
+        The walking (without recursion) and display is done by acGraphWalker
 
-        - g is the graph object
-        - subjectId is the @id of the current node to display and recurse down
-        - depth is the current depth of recursion/descent down the tree
+        - subjectId is the @id of the node to start from
+        - maxDepth optionally limits how far down the tree to go
         """
 
         if subjectId is None:
             subjectId = self.root
+        if stream is None:
+            stream = sys.stdout
 
-        #-- get the predicates/objects for this subjectId
-        pos = self.graph.predicate_objects(subject=URIRef(subjectId))
-
-        #-- split them out into information and children
-        ( nodeInfo, nodeChildren, nodeLevels) = self.splitPos(pos)
-        #-- display the information
-        self.displayNode(subjectId, nodeInfo, depth)
-
-        #-- recurse down
-        # - first the levels and then the children
-
-        for level in nodeLevels:
-            levelId = str(level)
-            self.walkTheGraph(levelId, depth+1)
-        for child in nodeChildren:
-            childId = str(child)
-            self.walkTheGraph(childId, depth+1)
+        writeWalk(walkGraph(self.graph, subjectId, maxDepth), stream)
 
     def splitPos(self,pos):
         """
         Given a generator of all predicate_objects split them into info to display and children
 
-        Some of the predicates/objects for the current node are information and some are children of the subject. Split them into two separate arrays returned as a tuple
-
-        (nodeInfo, nodeChilder)
+        Return a tuple (nodeInfo, nodeChildren, nodeLevels) - see acGraphWalker.splitPos
         """
 
-        nodeInfo = []
-        nodeChildren = []
-        nodeLevels = []
-
-        for p, o in pos:
-            """
-            An object has children if 
-            - it's predicate is hasChild, or
-            - it's predicate is `hasLevel`
-            """
-            if p == URIRef("http://purl.org/gem/qualifiers/hasChild"):
-                nodeChildren.append(o)
-            elif p == URIRef("http://purl.org/ASN/schema/core/hasLevel"):
-                nodeLevels.append(o)
-            else:
-                nodeInfo.append((p, o))
-
-        return ( nodeInfo, nodeChildren, nodeLevels)
+        return splitPos(pos)
 
 
     def displayNode(self, subjectId, nodeInfo, depth=0):
         """
-        Dump some info about the current node to stdout
-
-        - Indent it based on the depth
-        - Display statementNotation, statementLabel, title predicates first
-        - Display other predicates after that
+        Dump some info about the current node to stdout (see acGraphWalker.formatNode)
         """
 
-        ## remove http://vocabulary.curriculum.edu.au/MRAC/2023/07/ from subjectId
-        ##### id = subjectId.replace("http://vocabulary.curriculum.edu.au/MRAC/2023/07/", "")
-
-        print(f"{'  ' * depth}Node {id}")
-        for (p, o) in nodeInfo:
-            if p == URIRef("http://purl.org/ASN/schema/core/statementNotation"):
-                print(f"{'   ' * depth}- statementNotation {o}")
-            elif p == URIRef("http://purl.org/ASN/schema/core/statementLabel"):
-                print(f"{'   ' * depth}- statementLabel {o}")
-            elif p == URIRef("http://purl.org/dc/terms/title"):
-                print(f"{'   ' * depth}- title {o}")
-
-        exclude = [URIRef("http://purl.org/ASN/schema/core/statementNotation"), 
-               URIRef("http://purl.org/ASN/schema/core/statementLabel"),
-               URIRef("http://purl.org/dc/terms/title") ]
-        #-- show the other info nodes
-        for (p, o) in nodeInfo:
-            if p not in exclude:
-                print(f"{'   ' * depth} - other predicate {p} >>> {o}")
+        print("\n".join(formatNode(depth, subjectId, nodeInfo)))
 
 
     def extractNodeInfo(self, subjectId) -> dict:
@@ -538,22 +822,23 @@ Number of learning areas {len(self.learningAreas.keys())}"""
         Given a subjectId return a dict that contains common information from an AC node
         """
 
+        graph = self.sourceGraph()
         info = {}
 
-        info['title'] = self.graph.value(
+        info['title'] = graph.value(
             subject=subjectId, predicate=URIRef("http://purl.org/dc/terms/title"))
-        info['statementLabel'] = self.graph.value(
+        info['statementLabel'] = graph.value(
             subject=subjectId, predicate=self.statementLabel)
-        info['statementNotation'] = self.graph.value(
+        info['statementNotation'] = graph.value(
             subject=subjectId, predicate=self.statementNotation)
 
-        info['description'] = self.graph.value(
+        info['description'] = graph.value(
             subject=subjectId, predicate=URIRef("http://purl.org/dc/terms/description"))
-        info['modified'] = self.graph.value(
+        info['modified'] = graph.value(
             subject=subjectId, predicate=URIRef("http://purl.org/dc/terms/modified"))
         # abbreviation is in the statementNotation predicate
-        info['nominalYearLevel'] = self.graph.value(
-            subject=subjectId, predicate=URIRef("http://www.esa.edu.au/nominalYearLevel"))
+        info['nominalYearLevel'] = graph.value(
+            subject=subjectId, predicate=URIRef("https://www.esa.edu.au/nominalYearLevel"))
 
         return info
 